@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the scoring engine, stage by stage.
+
+Scores synthetic submissions (see benchmarks/synthetic.py) and times each
+stage on its own: feature extraction, the gap rules, the authenticity
+detector and a full score_submission. Results can be written as JSON and
+compared with an earlier run; the comparison exits with status 1 when a
+case got slower than the tolerance allows. Comparisons use the fastest of the timed runs,
+which is much less noisy than the median on a shared machine.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_scoring [--submissions 2000] [--repeat 5]
+    python -m benchmarks.bench_scoring --output baseline.json
+    python -m benchmarks.bench_scoring --baseline baseline.json [--tolerance 0.2]
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, TextIO
+
+import numpy as np
+
+from logic.concepts import ConceptIndex
+from logic.scoring import LearningGapScorer
+from benchmarks.synthetic import synthetic_questions, synthetic_submissions
+
+def time_case(func: Callable[[], Any], repeat: int) -> List[float]:
+    """Seconds taken by each of ``repeat`` runs of ``func`` (after one warm-up run).
+
+    The garbage collector is paused while timing, as timeit does.
+    """
+    func()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return timings
+
+
+def build_cases(count: int, seed: int) -> Dict[str, tuple]:
+    """case name -> (function, submissions it processes per run)."""
+    questions = synthetic_questions()
+    submissions = synthetic_submissions(count, seed, questions)
+    scorer = LearningGapScorer(ConceptIndex(questions))
+    extract = scorer.feature_extractor.extract_features
+    features = [extract(submission) for submission in submissions]
+    analyze = scorer.rules_engine.analyze_learning_gaps
+    detect = scorer.authenticity_detector.detect_ai_usage_probability
+
+    cases = {
+        "features": (lambda: [extract(submission) for submission in submissions], count),
+        "rules": (lambda: [analyze(f) for f in features], count),
+        "authenticity": (lambda: [detect(f) for f in features], count),
+        "score_submission": (lambda: [scorer.score_submission(submission) for submission in submissions], count),
+    }
+    return cases
+
+
+def run(count: int, seed: int, repeat: int) -> Dict[str, Any]:
+    """Run every case; returns the machine-readable result document."""
+    results = {}
+    for name, (func, processed) in build_cases(count, seed).items():
+        timings = time_case(func, repeat)
+        median = statistics.median(timings)
+        results[name] = {
+            "submissions": processed,
+            "median_s": median,
+            "min_s": min(timings),
+            # Best run, per submission: what comparisons use
+            "per_submission_us": min(timings) / processed * 1e6,
+            "submissions_per_s": processed / min(timings),
+        }
+    return {
+        "benchmark": "scoring",
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {"submissions": count, "seed": seed, "repeat": repeat},
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, out: TextIO = sys.stdout) -> List[str]:
+    """Print the comparison table; returns the names of the cases that regressed."""
+    if current["parameters"] != baseline.get("parameters"):
+        print(f"⚠️  Parameters differ from the baseline ({baseline.get('parameters')}); "
+              f"per-submission times are compared", file=out)
+
+    print(f"\n{'case':<20} {'baseline us':>12} {'current us':>12} {'change':>9}", file=out)
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<20} {'-':>12} {result['per_submission_us']:>12.1f} {'new':>9}", file=out)
+            continue
+        change = result["per_submission_us"] / before["per_submission_us"] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  ❌ slower"
+        print(f"{name:<20} {before['per_submission_us']:>12.1f} {result['per_submission_us']:>12.1f} "
+              f"{change:>+9.1%}{flag}", file=out)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=2000, help="Synthetic submissions to score")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic data")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--output", help="Write the results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown per case before it counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    document = run(args.submissions, args.seed, args.repeat)
+
+    if args.output == "-":
+        print(json.dumps(document, indent=2))
+    else:
+        print(f"Scoring {args.submissions} synthetic submissions (seed {args.seed}), best of {args.repeat} runs\n")
+        print(f"{'case':<20} {'median ms':>10} {'best ms':>10} {'us/submission':>14} {'submissions/s':>14}")
+        for name, result in document["results"].items():
+            print(f"{name:<20} {result['median_s'] * 1000:>10.1f} {result['min_s'] * 1000:>10.1f} "
+                  f"{result['per_submission_us']:>14.1f} {result['submissions_per_s']:>14,.0f}")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(document, f, indent=2)
+            print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        # Keep stdout clean when it carries the JSON
+        out = sys.stderr if args.output == "-" else sys.stdout
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(document, baseline, args.tolerance, out)
+        if regressions:
+            print(f"\n❌ Slower than the baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}", file=out)
+            sys.exit(1)
+        print(f"\n✅ No case slower than the baseline by more than {args.tolerance:.0%}", file=out)
+
+
+if __name__ == "__main__":
+    main()
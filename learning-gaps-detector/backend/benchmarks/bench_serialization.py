@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the JSON serialization paths.
+
+Compares the old path (FastAPI's jsonable_encoder + json.dumps, and
+indent=2 files on disk) with the fast one (orjson, compact files), and
+shows what gzip saves on a large student-detail payload.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization [--history 200] [--repeat 50]
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from models.quiz import StudentSubmission
+from logic.scoring import LearningGapScorer
+from utils.serialization import dumps_bytes, orjson
+
+
+def build_payload(history: int, seed: int = 7) -> dict:
+    """A student-detail response with ``history`` scored submissions."""
+    rng = random.Random(seed)
+    scorer = LearningGapScorer()
+    started = datetime(2024, 1, 1)
+    responses, scores = [], []
+    for i in range(history):
+        submission = StudentSubmission(
+            student_id="bench_student",
+            quiz_id=f"quiz_{i % 5}",
+            timestamp=started + timedelta(hours=i),
+            attempts=[
+                {
+                    "question_id": q,
+                    "selected_answer": rng.randint(0, 3),
+                    "time_taken": round(rng.uniform(2, 90), 2),
+                    "confidence": rng.randint(1, 5),
+                    "is_correct": rng.random() < 0.6
+                }
+                for q in range(1, 11)
+            ]
+        )
+        responses.append(submission.model_dump(mode="json"))
+        scores.append(scorer.score_submission(submission).model_dump(mode="json"))
+
+    return {
+        "student_id": "bench_student",
+        "latest_analysis": scores[-1],
+        "history": scores,
+        "raw_responses": responses
+    }
+
+
+def measure(func, repeat: int) -> tuple:
+    """Run ``func`` ``repeat`` times, returning (seconds per call, output size)."""
+    output = func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat, len(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=200, help="Scored submissions in the payload")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per case")
+    args = parser.parse_args()
+
+    payload = build_payload(args.history)
+    fast_body = dumps_bytes(payload)
+
+    cases = [
+        ("response: jsonable_encoder + json.dumps",
+         lambda: json.dumps(jsonable_encoder(payload), ensure_ascii=False,
+                            separators=(",", ":")).encode("utf-8")),
+        ("response: " + ("orjson" if orjson else "json (orjson not installed)"),
+         lambda: dumps_bytes(payload)),
+        ("disk: json.dumps indent=2", lambda: json.dumps(payload, indent=2, default=str).encode("utf-8")),
+        ("disk: compact", lambda: dumps_bytes(payload)),
+        ("gzip level 6 of the response", lambda: gzip.compress(fast_body, compresslevel=6)),
+    ]
+
+    print(f"Payload: {args.history} submissions, {len(fast_body) / 1024:.1f} KiB compact JSON\n")
+    print(f"{'case':<45} {'ms/call':>9} {'MB/s':>9} {'bytes':>10}")
+    results = {}
+    for name, func in cases:
+        seconds, size = measure(func, args.repeat)
+        results[name] = seconds
+        # Throughput relative to the compact JSON size, so cases compare directly
+        throughput = len(fast_body) / seconds / 1e6
+        print(f"{name:<45} {seconds * 1000:>9.3f} {throughput:>9.1f} {size:>10}")
+
+    names = [name for name, _ in cases]
+    print(f"\nResponse encoding speedup: {results[names[0]] / results[names[1]]:.1f}x")
+    print(f"Disk encoding speedup:     {results[names[2]] / results[names[3]]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+In-process load test of the API with an exam-day workload.
+
+Drives the FastAPI app through httpx's ASGI transport (no network, no
+server process) against a fresh data directory:
+
+1. setup: every student and teacher account is created (not measured)
+2. exam: all students log in at once (or over --ramp seconds), fetch the
+   questions, answer them and submit concurrently; a share of them retry
+   their submission with the same Idempotency-Key. Meanwhile teachers
+   log in and poll the dashboard with If-None-Match, as the UI does.
+
+Reports p50/p95/p99 latency, throughput and errors per endpoint. Then it
+shuts the app down, reopens the data directory and checks that every
+accepted submission was stored exactly once (lost or duplicated writes).
+
+Usage (from the backend directory; needs httpx, see requirements-dev.txt):
+    python -m benchmarks.loadtest [--students 500] [--teachers 10] [--concurrency 200]
+    python -m benchmarks.loadtest --storage sqlite --json results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+PASSWORD = "loadtest-password"
+# Accounts the load test signs up (seeded accounts use other addresses)
+EMAIL_DOMAIN = "@loadtest.example"
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: "httpx.AsyncClient", endpoint: str, method: str, url: str,
+                      **kwargs) -> Optional["httpx.Response"]:
+        """Send a request, recording its latency under ``endpoint``; None if it raised."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception as e:
+            self.latencies[endpoint].append(time.perf_counter() - started)
+            self.errors[endpoint] += 1
+            self.statuses[endpoint][0] += 1
+            print(f"❌ {endpoint}: {type(e).__name__}: {e}", file=sys.stderr)
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.statuses[endpoint][response.status_code] += 1
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+    def summary(self, duration: float) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint statistics (latencies in milliseconds)."""
+        result = {}
+        for endpoint, samples in self.latencies.items():
+            samples = sorted(samples)
+            result[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors[endpoint],
+                "statuses": dict(sorted(self.statuses[endpoint].items())),
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+                "max_ms": samples[-1] * 1000,
+                "requests_per_s": len(samples) / duration if duration else 0.0,
+            }
+        return result
+
+
+def percentile(sorted_samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+async def login(recorder: Recorder, client: "httpx.AsyncClient", email: str, role: str) -> Optional[Dict[str, Any]]:
+    response = await recorder.request(client, "POST /api/auth/login", "POST", "/api/auth/login",
+                                      json={"email": email, "password": PASSWORD, "role": role})
+    if response is None or response.status_code != 200:
+        return None
+    return response.json()["user"]
+
+
+async def student_session(recorder: Recorder, client: "httpx.AsyncClient", index: int,
+                          args: argparse.Namespace, rng: random.Random, accepted: set) -> None:
+    """One student: log in, fetch the questions, think, submit (maybe retry)."""
+    await asyncio.sleep(rng.uniform(0, args.ramp))
+    user = await login(recorder, client, f"student{index}{EMAIL_DOMAIN}", "student")
+    if user is None:
+        return
+
+    response = await recorder.request(client, "GET /api/questions", "GET", "/api/questions")
+    if response is None or response.status_code != 200:
+        return
+    questions = response.json()["questions"]
+
+    attempts = []
+    for question in questions:
+        correct = rng.random() < 0.7
+        answer = question["correct_answer"] if correct else (question["correct_answer"] + 1) % len(question["options"])
+        attempts.append({
+            "question_id": question["id"],
+            "selected_answer": answer,
+            "time_taken": round(rng.uniform(3, 90), 2),
+            "confidence": rng.randint(1, 5),
+            "is_correct": correct
+        })
+    await asyncio.sleep(rng.uniform(0, args.think))
+
+    submission = {"student_id": user["id"], "quiz_id": "loadtest_exam", "attempts": attempts}
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    tries = 2 if rng.random() < args.retry_rate else 1
+    for _ in range(tries):
+        response = await recorder.request(client, "POST /api/submit-quiz", "POST", "/api/submit-quiz",
+                                          json=submission, headers=headers)
+        if response is not None and response.status_code == 200:
+            accepted.add(headers["Idempotency-Key"])
+
+
+async def teacher_session(recorder: Recorder, client: "httpx.AsyncClient", index: int,
+                          args: argparse.Namespace, exam_over: asyncio.Event) -> None:
+    """One teacher: log in, then poll the dashboard until the exam is over."""
+    if await login(recorder, client, f"teacher{index}{EMAIL_DOMAIN}", "teacher") is None:
+        return
+    etag = None
+    while not exam_over.is_set():
+        headers = {"If-None-Match": etag} if etag else {}
+        response = await recorder.request(client, "GET /api/teacher-dashboard", "GET", "/api/teacher-dashboard",
+                                          headers=headers)
+        if response is not None and response.status_code in (200, 304):
+            etag = response.headers.get("etag", etag)
+        try:
+            await asyncio.wait_for(exam_over.wait(), args.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import main
+
+    rng = random.Random(args.seed)
+    setup = Recorder()
+    recorder = Recorder()
+    accepted: set = set()
+
+    await main.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits,
+                                     timeout=args.timeout) as client:
+            # Accounts
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def signup(name: str, email: str, role: str) -> None:
+                async with semaphore:
+                    await setup.request(client, "POST /api/auth/signup", "POST", "/api/auth/signup", json={
+                        "name": name, "email": email, "password": PASSWORD, "role": role,
+                        "subject": "Mathematics" if role == "teacher" else None
+                    })
+
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(signup(f"Student {i}", f"student{i}{EMAIL_DOMAIN}", "student") for i in range(args.students)),
+                *(signup(f"Teacher {i}", f"teacher{i}{EMAIL_DOMAIN}", "teacher") for i in range(args.teachers))
+            )
+            setup_duration = time.perf_counter() - started
+
+            # Exam
+            exam_over = asyncio.Event()
+
+            async def student(index: int) -> None:
+                async with semaphore:
+                    await student_session(recorder, client, index, args, random.Random(rng.random()), accepted)
+
+            started = time.perf_counter()
+            teachers = [asyncio.create_task(teacher_session(recorder, client, i, args, exam_over))
+                        for i in range(args.teachers)]
+            await asyncio.gather(*(student(i) for i in range(args.students)))
+            exam_over.set()
+            await asyncio.gather(*teachers)
+            duration = time.perf_counter() - started
+    finally:
+        # Flushes pending group-commit writes and closes storage
+        await main.app.router.shutdown()
+
+    return {
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("json", "keep")},
+        "setup": {"duration_s": setup_duration, "endpoints": setup.summary(setup_duration)},
+        "exam": {
+            "duration_s": duration,
+            "submissions_accepted": len(accepted),
+            "submissions_per_s": len(accepted) / duration if duration else 0.0,
+            "endpoints": recorder.summary(duration),
+        },
+        "accepted_keys": accepted,
+    }
+
+
+def check_writes(args: argparse.Namespace, accepted: set) -> Dict[str, Any]:
+    """Reopen the data directory and compare the stored records with what the API accepted.
+
+    Every accepted submission must be stored once as a response and once
+    as a score, found by its submission key ("key:<student>:<Idempotency-Key>").
+    Records already in the data directory (e.g. seeded with tools.seed_data)
+    are left out.
+    """
+    import config
+    from storage.factory import create_repository
+
+    repository = create_repository(config.STORAGE_BACKEND, config.DATA_DIR, config.SQLITE_PATH)
+    try:
+        report = {"users": {"expected": args.students + args.teachers,
+                            "stored": sum(1 for user in repository.iter_users()
+                                          if user["email"].endswith(EMAIL_DOMAIN))}}
+        for kind, records in (("responses", repository.iter_responses()), ("scores", repository.iter_scores())):
+            keys = [
+                record["submission_key"].rsplit(":", 1)[-1] for record in records
+                if (record.get("submission_key") or "").startswith("key:")
+            ]
+            stored = set(keys)
+            report[kind] = {
+                "expected": len(accepted),
+                "stored": len(keys),
+                "lost": len(accepted - stored),
+                "duplicates": len(keys) - len(stored),
+            }
+    finally:
+        repository.close()
+    return report
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    exam = results["exam"]
+    print(f"\nSetup: {results['parameters']['students']} students, {results['parameters']['teachers']} teachers "
+          f"signed up in {results['setup']['duration_s']:.1f}s")
+    print(f"Exam: {exam['duration_s']:.1f}s, {exam['submissions_accepted']} submissions accepted "
+          f"({exam['submissions_per_s']:.1f}/s)\n")
+    print(f"{'endpoint':<28} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, stats in exam["endpoints"].items():
+        print(f"{endpoint:<28} {stats['requests']:>9} {stats['errors']:>7} {stats['requests_per_s']:>8.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+        if stats["errors"]:
+            print(f"{'':<28} statuses: {stats['statuses']}")
+
+    print("\nStored records:")
+    for kind, counts in results["writes"].items():
+        print(f"  {kind:<10} " + ", ".join(f"{name} {value}" for name, value in counts.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=500, help="Students taking the exam")
+    parser.add_argument("--teachers", type=int, default=10, help="Teachers polling the dashboard")
+    parser.add_argument("--questions", type=int, default=20, help="Questions in the exam")
+    parser.add_argument("--concurrency", type=int, default=200, help="Most students active at once")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Spread logins over this many seconds (0 = burst)")
+    parser.add_argument("--think", type=float, default=0.0, help="Most seconds a student spends answering")
+    parser.add_argument("--retry-rate", type=float, default=0.05, help="Share of students who submit twice")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between dashboard polls")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--storage", choices=("json", "sqlite"), default="json", help="Storage backend")
+    parser.add_argument("--data-dir", help="Data directory to use (default: a new temporary one)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary data directory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if httpx is None:
+        print("❌ httpx is required: pip install -r requirements-dev.txt")
+        sys.exit(1)
+
+    # The app reads its settings when main is imported, so point it at the
+    # load-test data first (never at the real backend/data)
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="loadtest-")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["SQLITE_PATH"] = os.path.join(data_dir, "learning_gaps.db")
+    # Per-request logs and sampled profiling would flood the report and skew it
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("PROFILE_SAMPLE_RATE", "0")
+    if args.questions:
+        from benchmarks.synthetic import synthetic_questions
+        from storage.factory import create_repository
+        repository = create_repository(args.storage, data_dir, os.environ["SQLITE_PATH"])
+        repository.save_questions(synthetic_questions(args.questions))
+        repository.close()
+
+    try:
+        results = asyncio.run(run(args))
+        results["writes"] = check_writes(args, results.pop("accepted_keys"))
+        results["data_dir"] = data_dir
+        print_report(results)
+        if args.data_dir or args.keep:
+            print(f"\nData kept in {data_dir}")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"\nResults written to {args.json}")
+    finally:
+        if not args.data_dir and not args.keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    writes = results["writes"]
+    problems = [kind for kind in ("responses", "scores") if writes[kind]["lost"] or writes[kind]["duplicates"]]
+    if writes["users"]["stored"] != writes["users"]["expected"]:
+        problems.append("users")
+    if problems:
+        print(f"\n❌ Lost or duplicated writes: {', '.join(problems)}")
+        sys.exit(1)
+    print("\n✅ Every accepted submission was stored exactly once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Synthetic quiz data for benchmarks.
+
+Generates a question bank spread over several concepts and
+StudentSubmissions drawn from a few behavioral profiles (steady,
+struggling, strong, rushed), with varying question counts. The same seed
+always gives the same data.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from models.quiz import StudentSubmission
+
+CONCEPTS = [
+    "Linear Functions", "Functions", "Quadratic Functions",
+    "Exponents", "Polynomials", "Inequalities"
+]
+
+# accuracy: chance of a correct answer; time: median seconds per question
+# (log-normal, spread ``time_spread``); confidence: mean when right / wrong
+PROFILES: Dict[str, Dict[str, float]] = {
+    "steady": {"accuracy": 0.7, "time": 25.0, "time_spread": 0.5, "confidence_right": 3.8, "confidence_wrong": 2.4},
+    "struggling": {"accuracy": 0.35, "time": 45.0, "time_spread": 0.7, "confidence_right": 2.8, "confidence_wrong": 3.2},
+    "strong": {"accuracy": 0.9, "time": 15.0, "time_spread": 0.4, "confidence_right": 4.3, "confidence_wrong": 2.0},
+    "rushed": {"accuracy": 0.95, "time": 4.0, "time_spread": 0.3, "confidence_right": 4.8, "confidence_wrong": 4.5},
+}
+
+# How often each profile is drawn
+PROFILE_MIX = {"steady": 0.5, "struggling": 0.2, "strong": 0.2, "rushed": 0.1}
+
+QUESTION_COUNTS = (5, 10, 20, 40)
+
+
+def synthetic_questions(count: int = 60) -> List[Dict[str, Any]]:
+    """Question bank entries, assigned to CONCEPTS round-robin."""
+    return [
+        {
+            "id": question_id,
+            "text": f"Synthetic question {question_id}",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": question_id % 4,
+            "concept": CONCEPTS[question_id % len(CONCEPTS)]
+        }
+        for question_id in range(1, count + 1)
+    ]
+
+
+def _attempts(rng: random.Random, profile: Dict[str, float], question_ids: Sequence[int]) -> List[Dict[str, Any]]:
+    attempts = []
+    for question_id in question_ids:
+        correct = rng.random() < profile["accuracy"]
+        mean_confidence = profile["confidence_right" if correct else "confidence_wrong"]
+        answer = question_id % 4 if correct else (question_id + rng.randint(1, 3)) % 4
+        attempts.append({
+            "question_id": question_id,
+            "selected_answer": answer,
+            "time_taken": round(max(0.5, rng.lognormvariate(0, profile["time_spread"]) * profile["time"]), 2),
+            "confidence": min(5, max(1, round(rng.gauss(mean_confidence, 0.8)))),
+            "is_correct": correct
+        })
+    return attempts
+
+
+def iter_submission_dicts(count: int, seed: int = 42, questions: Optional[List[Dict[str, Any]]] = None,
+                          students: int = 0, start: datetime = datetime(2024, 1, 1),
+                          student_ids: Optional[Sequence[str]] = None,
+                          spacing: timedelta = timedelta(minutes=1)) -> Iterator[Dict[str, Any]]:
+    """Submissions as plain dicts (the stored form), one profile each.
+
+    ``students`` caps the number of distinct student ids (0 = one per
+    submission), or ``student_ids`` gives the ids to draw from; a student
+    keeps the same profile across submissions. Timestamps are ``spacing``
+    apart from ``start``.
+    """
+    if student_ids is not None:
+        students = len(student_ids)
+    rng = random.Random(seed)
+    question_ids = [question["id"] for question in questions or synthetic_questions()]
+    profile_names = list(PROFILE_MIX)
+    weights = list(PROFILE_MIX.values())
+    student_profiles: Dict[int, str] = {}
+
+    for index in range(count):
+        student = rng.randrange(students) if students else index
+        profile_name = student_profiles.get(student)
+        if profile_name is None:
+            profile_name = student_profiles[student] = rng.choices(profile_names, weights)[0]
+        size = min(rng.choice(QUESTION_COUNTS), len(question_ids))
+        yield {
+            "student_id": student_ids[student] if student_ids is not None else f"synthetic_{student}",
+            "quiz_id": f"quiz_{rng.randrange(20)}",
+            "attempts": _attempts(rng, PROFILES[profile_name], rng.sample(question_ids, size)),
+            "timestamp": (start + spacing * index).isoformat()
+        }
+
+
+def synthetic_submissions(count: int, seed: int = 42,
+                          questions: Optional[List[Dict[str, Any]]] = None) -> List[StudentSubmission]:
+    """``count`` validated StudentSubmissions (see iter_submission_dicts)."""
+    return [StudentSubmission(**record) for record in iter_submission_dicts(count, seed, questions)]
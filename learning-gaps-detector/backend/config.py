@@ -0,0 +1,90 @@
+"""Runtime settings, read once from environment variables."""
+import os
+
+
+# Directory holding the JSON data files (and the SQLite database by default)
+DATA_DIR = os.environ.get("DATA_DIR", "data")
+
+# "json" keeps the plain files under DATA_DIR (handy for development);
+# "sqlite" stores everything in an indexed database file.
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json").lower()
+SQLITE_PATH = os.environ.get("SQLITE_PATH", os.path.join(DATA_DIR, "learning_gaps.db"))
+
+# Directory holding the detection rule tables (learning_gaps.json,
+# authenticity.json); edit them, or point RULES_DIR at a copy, to change the
+# rules without touching code. Run tools/rescore.py afterwards.
+RULES_DIR = os.environ.get("RULES_DIR", "rules")
+
+# Blocking work is kept off the event loop: storage calls run in a thread
+# pool of IO_WORKERS, scoring in a pool of CPU_WORKERS that is either
+# threads or separate processes (CPU_EXECUTOR=process, parallel across cores).
+IO_WORKERS = int(os.environ.get("IO_WORKERS", "8"))
+CPU_WORKERS = int(os.environ.get("CPU_WORKERS", str(os.cpu_count() or 2)))
+CPU_EXECUTOR = os.environ.get("CPU_EXECUTOR", "thread").lower()
+# Event loop lag is sampled this often, in seconds (see /api/system/event-loop)
+LOOP_MONITOR_INTERVAL = float(os.environ.get("LOOP_MONITOR_INTERVAL", "0.5"))
+
+# Logs go to stderr as one JSON object per line (LOG_FORMAT=text for plain
+# lines); every request is logged at INFO with its duration, body sizes and
+# storage activity.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+# Requests slower than SLOW_REQUEST_MS are logged as warnings. PROFILE_SAMPLE_RATE
+# of requests (0-1) run under cProfile, and the slow ones among them are logged
+# with their top PROFILE_TOP functions (and saved as .prof files under
+# PROFILE_DIR if set). With PROFILE_HEADER on, a request sent with an
+# "X-Profile: 1" header and a teacher's bearer token gets its profile summary
+# back instead of its response. The request still runs for real (a profiled
+# submission is stored), so it is off by default.
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", "500"))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", "25"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+PROFILE_HEADER = os.environ.get("PROFILE_HEADER", "off").lower() in ("1", "on", "true", "yes")
+
+# Responses of at least GZIP_MINIMUM_SIZE bytes are gzip-compressed for
+# clients that accept it (level 1-9: higher is smaller but slower)
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+
+# Server-sent dashboard events: idle streams get a keepalive comment every
+# EVENTS_HEARTBEAT_SECONDS; a stream more than EVENTS_MAX_PENDING events
+# behind is closed (the browser reconnects and resyncs).
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_MAX_PENDING = int(os.environ.get("EVENTS_MAX_PENDING", "100"))
+
+# Background scoring used by POST /api/submit-quiz/async
+# (SCORING_WORKERS jobs are scored concurrently, in the CPU executor)
+SCORING_WORKERS = int(os.environ.get("SCORING_WORKERS", "2"))
+SCORING_QUEUE_SIZE = int(os.environ.get("SCORING_QUEUE_SIZE", "1000"))
+# Finished jobs kept in memory for status lookups
+SCORING_JOB_RETENTION = int(os.environ.get("SCORING_JOB_RETENTION", "10000"))
+
+# Recent submission results kept in memory to answer retried submissions
+# (older ones are found through the submission_key stored with each score)
+SUBMISSION_CACHE_SIZE = int(os.environ.get("SUBMISSION_CACHE_SIZE", "10000"))
+
+# Group commit: concurrent response/score writes are collected for up to
+# GROUP_COMMIT_WINDOW_MS milliseconds (or GROUP_COMMIT_MAX_BATCH records)
+# and persisted with a single durable write.
+GROUP_COMMIT_WINDOW_MS = float(os.environ.get("GROUP_COMMIT_WINDOW_MS", "10"))
+GROUP_COMMIT_MAX_BATCH = int(os.environ.get("GROUP_COMMIT_MAX_BATCH", "256"))
+
+# Sessions expire after this many seconds without use (sliding expiry)
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+# How often expired sessions are evicted and the session file compacted, in seconds
+SESSION_SWEEP_INTERVAL = float(os.environ.get("SESSION_SWEEP_INTERVAL", "300"))
+
+# "opaque" issues random tokens backed by the session store; "signed" issues
+# self-contained JWTs (verified without any storage access). Run one server
+# process per data directory either way: classrooms, the dashboard and the
+# submission cache are kept in memory per process, so several workers would
+# disagree with each other.
+TOKEN_MODE = os.environ.get("TOKEN_MODE", "opaque").lower()
+TOKEN_SECRET = os.environ.get("TOKEN_SECRET", "")
+TOKEN_ALGORITHM = os.environ.get("TOKEN_ALGORITHM", "HS256")
+# How often the revocation list (logouts) is reloaded from storage, in seconds
+TOKEN_REVOCATION_REFRESH_INTERVAL = float(os.environ.get("TOKEN_REVOCATION_REFRESH_INTERVAL", "30"))
+
+# How often batched user updates (last_login) are written to storage, in seconds
+AUTH_FLUSH_INTERVAL = float(os.environ.get("AUTH_FLUSH_INTERVAL", "30"))
@@ -1,29 +1,88 @@
-import json
-import os
 from datetime import datetime
 import hashlib
+import logging
+import threading
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
+from storage.base import Repository
+from logic.sessions import SessionStore
+from logic.tokens import SignedTokenManager
+
+logger = logging.getLogger(__name__)
 
 class AuthManager:
-    """Manages user authentication and storage"""
+    """Manages user authentication and storage
     
-    def __init__(self, data_dir: str = "data"):
-        self.data_dir = data_dir
-        self.users_file = os.path.join(data_dir, "users.json")
-        self.sessions_file = os.path.join(data_dir, "sessions.json")
-        
-        # Ensure data directory exists
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # Initialize files if they don't exist
-        if not os.path.exists(self.users_file):
-            with open(self.users_file, 'w') as f:
-                json.dump([], f)
-        
-        if not os.path.exists(self.sessions_file):
-            with open(self.sessions_file, 'w') as f:
-                json.dump({}, f)
+    Users are loaded once into memory and indexed by lowercased email and by
+    id, so login and token verification never scan the user store. Writes go
+    to storage immediately, except last_login stamps, which are batched and
+    persisted by flush(). Sessions live in a SessionStore with TTL expiry,
+    unless a SignedTokenManager is given: then tokens are self-contained
+    signed tokens and verification needs no session lookup at all.
+
+    The in-memory users are a snapshot: another server process sharing the
+    storage may register users later, so a user missing from memory is
+    looked up in storage before being treated as unknown.
+    
+    Methods that write may run on executor threads; a lock keeps the user
+    indexes and the dirty set consistent.
+    """
+    
+    def __init__(self, repository: Repository, sessions: SessionStore,
+                 signed_tokens: Optional[SignedTokenManager] = None):
+        self.repository = repository
+        self.sessions = sessions
+        self.signed_tokens = signed_tokens
+        self._users_by_id: Dict[str, Dict[str, Any]] = {}
+        self._users_by_email: Dict[str, Dict[str, Any]] = {}
+        self._dirty_user_ids: Set[str] = set()
+        self._lock = threading.RLock()
+        
+        for user in repository.iter_users():
+            self._index_user(user)
+    
+    def _index_user(self, user: Dict[str, Any]) -> None:
+        self._users_by_id[user['id']] = user
+        self._users_by_email[user['email'].lower()] = user
+    
+    def _user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        user = self._users_by_id.get(user_id)
+        if user is None:
+            user = self._load_user(self.repository.get_user_by_id(user_id))
+        return user
+    
+    def _user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        user = self._users_by_email.get(email.lower())
+        if user is None:
+            user = self._load_user(self.repository.get_user_by_email(email.lower()))
+        return user
+    
+    def _load_user(self, user: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Index a user found in storage (registered by another process)."""
+        if user is None:
+            return None
+        with self._lock:
+            # Another thread may have indexed it meanwhile
+            if user['id'] not in self._users_by_id:
+                self._index_user(user)
+            return self._users_by_id[user['id']]
+    
+    def flush(self) -> int:
+        """Persist batched last_login updates, returning how many users were written"""
+        if not self._dirty_user_ids:
+            return 0
+        
+        with self._lock:
+            dirty_ids, self._dirty_user_ids = self._dirty_user_ids, set()
+            users = [dict(self._users_by_id[user_id]) for user_id in dirty_ids]
+        try:
+            self.repository.update_users(users)
+        except Exception:
+            logger.exception("Error saving users")
+            with self._lock:
+                self._dirty_user_ids |= dirty_ids
+            return 0
+        return len(users)
     
     @staticmethod
     def hash_password(password: str) -> str:
@@ -40,48 +99,23 @@ class AuthManager:
         """Generate a unique session token"""
         return str(uuid.uuid4())
     
-    def load_users(self) -> list:
-        """Load all users from file"""
-        try:
-            with open(self.users_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading users: {e}")
-            return []
-    
-    def save_users(self, users: list) -> bool:
-        """Save users to file"""
-        try:
-            with open(self.users_file, 'w') as f:
-                json.dump(users, f, indent=2, default=str)
-            return True
-        except Exception as e:
-            print(f"Error saving users: {e}")
-            return False
-    
-    def load_sessions(self) -> dict:
-        """Load all sessions from file"""
-        try:
-            with open(self.sessions_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading sessions: {e}")
-            return {}
-    
-    def save_sessions(self, sessions: dict) -> bool:
-        """Save sessions to file"""
-        try:
-            with open(self.sessions_file, 'w') as f:
-                json.dump(sessions, f, indent=2, default=str)
-            return True
-        except Exception as e:
-            print(f"Error saving sessions: {e}")
-            return False
-    
     def email_exists(self, email: str) -> bool:
         """Check if email already exists"""
-        users = self.load_users()
-        return any(user['email'].lower() == email.lower() for user in users)
+        return self._user_by_email(email) is not None
+    
+    def start_session(self, user: Dict[str, Any]) -> str:
+        """Issue a token for a user, returning it"""
+        if self.signed_tokens:
+            return self.signed_tokens.issue(user)
+        
+        token = self.generate_token()
+        self.sessions.create(token, {
+            "user_id": user["id"],
+            "email": user["email"],
+            "role": user["role"],
+            "created_at": datetime.now().isoformat()
+        })
+        return token
     
     def register_user(self, name: str, email: str, password: str, role: str, subject: Optional[str] = None) -> Dict[str, Any]:
         """Register a new user"""
@@ -100,7 +134,6 @@ class AuthManager:
             return {"success": False, "message": "Password must be at least 6 characters"}
         
         # Create user
-        users = self.load_users()
         user = {
             "id": str(uuid.uuid4()),
             "name": name,
@@ -112,33 +145,31 @@ class AuthManager:
             "last_login": None
         }
         
-        users.append(user)
+        with self._lock:
+            # Checked again under the lock, registrations may run concurrently
+            if self.email_exists(email):
+                return {"success": False, "message": "Email already registered"}
+            try:
+                self.repository.add_user(user)
+            except Exception:
+                logger.exception("Error saving user")
+                return {"success": False, "message": "Error registering user"}
+            self._index_user(user)
         
-        if self.save_users(users):
-            # Generate session token
-            token = self.generate_token()
-            sessions = self.load_sessions()
-            sessions[token] = {
-                "user_id": user["id"],
-                "email": user["email"],
-                "role": user["role"],
-                "created_at": datetime.now().isoformat()
-            }
-            self.save_sessions(sessions)
-            
-            return {
-                "success": True,
-                "message": "User registered successfully",
-                "user": {
-                    "id": user["id"],
-                    "name": user["name"],
-                    "email": user["email"],
-                    "role": user["role"]
-                },
-                "token": token
-            }
+        # Generate session token
+        token = self.start_session(user)
         
-        return {"success": False, "message": "Error registering user"}
+        return {
+            "success": True,
+            "message": "User registered successfully",
+            "user": {
+                "id": user["id"],
+                "name": user["name"],
+                "email": user["email"],
+                "role": user["role"]
+            },
+            "token": token
+        }
     
     def login_user(self, email: str, password: str, role: Optional[str] = None) -> Dict[str, Any]:
         """Login a user with optional role verification"""
@@ -146,14 +177,8 @@ class AuthManager:
         if not email or not password:
             return {"success": False, "message": "Email and password required"}
         
-        users = self.load_users()
-        user = None
-        
         # Find user by email
-        for u in users:
-            if u['email'].lower() == email.lower():
-                user = u
-                break
+        user = self._user_by_email(email)
         
         if not user:
             return {"success": False, "message": "Invalid email or password"}
@@ -170,20 +195,13 @@ class AuthManager:
         if not self.verify_password(password, user['password_hash']):
             return {"success": False, "message": "Invalid email or password"}
         
-        # Update last login
-        user['last_login'] = datetime.now().isoformat()
-        self.save_users(users)
+        # Update last login (persisted by the next flush)
+        with self._lock:
+            user['last_login'] = datetime.now().isoformat()
+            self._dirty_user_ids.add(user['id'])
         
         # Generate session token
-        token = self.generate_token()
-        sessions = self.load_sessions()
-        sessions[token] = {
-            "user_id": user["id"],
-            "email": user["email"],
-            "role": user["role"],
-            "created_at": datetime.now().isoformat()
-        }
-        self.save_sessions(sessions)
+        token = self.start_session(user)
         
         return {
             "success": True,
@@ -199,27 +217,29 @@ class AuthManager:
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify if token is valid"""
-        sessions = self.load_sessions()
-        return sessions.get(token)
+        if self.signed_tokens:
+            return self.signed_tokens.verify(token)
+        return self.sessions.get(token)
     
     def logout_user(self, token: str) -> bool:
         """Logout a user by removing their token"""
-        sessions = self.load_sessions()
-        if token in sessions:
-            del sessions[token]
-            return self.save_sessions(sessions)
-        return False
+        try:
+            if self.signed_tokens:
+                return self.signed_tokens.revoke(token)
+            return self.sessions.delete(token)
+        except Exception:
+            logger.exception("Error deleting session")
+            return False
     
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
-        users = self.load_users()
-        for user in users:
-            if user['id'] == user_id:
-                return {
-                    "id": user["id"],
-                    "name": user["name"],
-                    "email": user["email"],
-                    "role": user["role"],
-                    "subject": user.get("subject")
-                }
+        user = self._user_by_id(user_id)
+        if user:
+            return {
+                "id": user["id"],
+                "name": user["name"],
+                "email": user["email"],
+                "role": user["role"],
+                "subject": user.get("subject")
+            }
         return None
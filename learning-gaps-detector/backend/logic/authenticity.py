@@ -1,27 +1,25 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
+
 import numpy as np
 
+from logic.rule_engine import CompiledRules, load_rule_table
+
 
 class AuthenticityDetector:
-    """Advanced detection of learning authenticity vs AI assistance."""
+    """Advanced detection of learning authenticity vs AI assistance.
     
-    def __init__(self):
-        self.ai_patterns = {
-            # Common AI response patterns
-            'response_speed_patterns': {
-                'too_consistent': {'min_variance': 0.5, 'weight': 0.3},
-                'too_fast': {'max_avg_time': 8.0, 'weight': 0.4},
-                'burst_pattern': {'consecutive_fast': 3, 'weight': 0.3}
-            },
-            'confidence_patterns': {
-                'overconfident_incorrect': {'threshold': 3.5, 'weight': 0.5},
-                'uniform_high_confidence': {'min_avg': 4.0, 'min_rate': 0.7, 'weight': 0.4}
-            },
-            'accuracy_patterns': {
-                'perfect_with_speed': {'min_accuracy': 0.9, 'max_avg_time': 15, 'weight': 0.6},
-                'no_learning_curve': {'consistency_threshold': 0.9, 'weight': 0.3}
-            }
-        }
+    Patterns are read from the authenticity table in ``rules_dir``
+    (backend/rules/ by default) and compiled once (see CompiledRules).
+    A category's score is the sum of the weights of its patterns that
+    fired; the AI probability weighs the categories by the table's
+    group_weights.
+    """
+    
+    def __init__(self, rules: Optional[Sequence[Dict[str, Any]]] = None, rules_dir: Optional[str] = None):
+        table = load_rule_table('authenticity', rules_dir)
+        # Weight of each pattern category in the AI probability
+        self.group_weights = table['group_weights']
+        self.rules = CompiledRules(table['rules'] if rules is None else rules)
     
     def detect_ai_usage_probability(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate probability of AI assistance based on behavioral patterns."""
@@ -34,27 +32,19 @@ class AuthenticityDetector:
             'recommendation': ''
         }
         
-        # Analyze different pattern categories
-        speed_score = self._analyze_speed_patterns(features)
-        confidence_score = self._analyze_confidence_authenticity(features)
-        accuracy_score = self._analyze_accuracy_patterns(features)
-        behavioral_score = self._analyze_behavioral_consistency(features)
-        
-        # Combine scores with weights
-        ai_probability = (
-            speed_score['score'] * 0.3 +
-            confidence_score['score'] * 0.25 +
-            accuracy_score['score'] * 0.25 +
-            behavioral_score['score'] * 0.2
-        )
-        
-        detection_result['ai_probability'] = min(ai_probability, 1.0)
-        detection_result['detected_patterns'] = (
-            speed_score['patterns'] +
-            confidence_score['patterns'] +
-            accuracy_score['patterns'] +
-            behavioral_score['patterns']
-        )
+        fired = self.rules.fired(features)
+        scores = dict.fromkeys(self.group_weights, 0.0)
+        for rule in fired:
+            scores[rule['group']] += rule['weight']
+        detection_result['ai_probability'] = min(self._combine(scores), 1.0)
+        detection_result['detected_patterns'] = [
+            {
+                'pattern': rule['name'],
+                'description': CompiledRules.message(rule, features),
+                'strength': rule['strength']
+            }
+            for rule in fired
+        ]
         
         # Calculate confidence in detection
         detection_result['confidence_level'] = self._calculate_detection_confidence(
@@ -69,147 +59,16 @@ class AuthenticityDetector:
         
         return detection_result
     
-    def _analyze_speed_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze response speed for AI usage indicators."""
-        result = {'score': 0.0, 'patterns': []}
-        
-        avg_time = features.get('avg_time', 30)
-        very_fast_rate = features.get('very_fast_responses', 0)
-        time_variance = features.get('time_variance', 10)
-        accuracy = features.get('accuracy', 0)
-        
-        # Pattern 1: Too fast with high accuracy
-        if avg_time < 10 and accuracy > 0.8:
-            result['score'] += 0.4
-            result['patterns'].append({
-                'pattern': 'fast_accurate_responses',
-                'description': f'Very fast responses ({avg_time:.1f}s avg) with high accuracy ({accuracy:.1%})',
-                'strength': 'strong'
-            })
-        
-        # Pattern 2: Consistent very fast responses
-        if very_fast_rate > 0.5:
-            result['score'] += 0.3
-            result['patterns'].append({
-                'pattern': 'consistent_speed',
-                'description': f'{very_fast_rate:.1%} of responses were very fast (<5s)',
-                'strength': 'medium'
-            })
-        
-        # Pattern 3: Unnaturally low time variance
-        if time_variance < 2 and avg_time < 15:
-            result['score'] += 0.3
-            result['patterns'].append({
-                'pattern': 'robotic_timing',
-                'description': f'Very low timing variance ({time_variance:.1f}s)',
-                'strength': 'medium'
-            })
-        
-        return result
+    def ai_probability_batch(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized AI probability over feature arrays."""
+        return np.minimum(self._combine(self.rules.group_scores(self.rules.evaluate(features))), 1.0)
     
-    def _analyze_confidence_authenticity(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze confidence patterns for authenticity."""
-        result = {'score': 0.0, 'patterns': []}
-        
-        avg_confidence = features.get('avg_confidence', 3)
-        confidence_when_incorrect = features.get('avg_confidence_when_incorrect', 2)
-        high_confidence_rate = features.get('high_confidence_rate', 0)
-        accuracy = features.get('accuracy', 0)
-        
-        # Pattern 1: High confidence on wrong answers
-        if confidence_when_incorrect > 3.5:
-            result['score'] += 0.5
-            result['patterns'].append({
-                'pattern': 'overconfident_errors',
-                'description': f'High confidence ({confidence_when_incorrect:.1f}) on incorrect answers',
-                'strength': 'strong'
-            })
-        
-        # Pattern 2: Uniformly high confidence with mixed accuracy
-        if high_confidence_rate > 0.7 and accuracy < 0.9:
-            result['score'] += 0.3
-            result['patterns'].append({
-                'pattern': 'uniform_overconfidence',
-                'description': f'{high_confidence_rate:.1%} high confidence responses despite {accuracy:.1%} accuracy',
-                'strength': 'medium'
-            })
-        
-        # Pattern 3: Perfect confidence-accuracy mismatch
-        confidence_accuracy_gap = avg_confidence / 5.0 - accuracy
-        if confidence_accuracy_gap > 0.3:
-            result['score'] += 0.2
-            result['patterns'].append({
-                'pattern': 'confidence_accuracy_mismatch',
-                'description': f'Large gap between confidence and actual performance',
-                'strength': 'weak'
-            })
-        
-        return result
-    
-    def _analyze_accuracy_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze accuracy patterns for AI indicators."""
-        result = {'score': 0.0, 'patterns': []}
-        
-        accuracy = features.get('accuracy', 0)
-        avg_time = features.get('avg_time', 30)
-        concept_gap = features.get('concept_gap', 0)
-        
-        # Pattern 1: High accuracy with very fast responses
-        if accuracy > 0.85 and avg_time < 12:
-            result['score'] += 0.6
-            result['patterns'].append({
-                'pattern': 'superhuman_performance',
-                'description': f'{accuracy:.1%} accuracy with {avg_time:.1f}s average time',
-                'strength': 'strong'
-            })
-        
-        # Pattern 2: Suspiciously uniform performance across concepts
-        if concept_gap < 0.1 and accuracy > 0.8:
-            result['score'] += 0.3
-            result['patterns'].append({
-                'pattern': 'uniform_concept_mastery',
-                'description': f'Extremely consistent performance across all concepts',
-                'strength': 'medium'
-            })
-        
-        # Pattern 3: Perfect or near-perfect scores
-        if accuracy >= 0.95:
-            result['score'] += 0.2
-            result['patterns'].append({
-                'pattern': 'near_perfect_accuracy',
-                'description': f'Near-perfect accuracy ({accuracy:.1%}) is statistically rare',
-                'strength': 'weak'
-            })
-        
-        return result
-    
-    def _analyze_behavioral_consistency(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze behavioral consistency for human-like patterns."""
-        result = {'score': 0.0, 'patterns': []}
-        
-        concept_consistency = features.get('concept_consistency', 0)
-        time_variance = features.get('time_variance', 10)
-        confidence_std = features.get('confidence_std', 1)
-        
-        # Pattern 1: Too perfect consistency
-        if concept_consistency > 0.95 and time_variance < 3:
-            result['score'] += 0.4
-            result['patterns'].append({
-                'pattern': 'perfect_consistency',
-                'description': 'Unnaturally consistent performance patterns',
-                'strength': 'medium'
-            })
-        
-        # Pattern 2: No natural learning variations
-        if confidence_std < 0.5:
-            result['score'] += 0.2
-            result['patterns'].append({
-                'pattern': 'no_confidence_variation',
-                'description': 'Extremely stable confidence levels throughout quiz',
-                'strength': 'weak'
-            })
-        
-        return result
+    def _combine(self, scores: Dict[str, Any]) -> Any:
+        """Weighted sum of the category scores (scalars or arrays), in table order."""
+        total = 0.0
+        for group, weight in self.group_weights.items():
+            total = total + scores.get(group, 0.0) * weight
+        return total
     
     def _calculate_detection_confidence(self, patterns: List[Dict]) -> float:
         """Calculate confidence in AI detection based on pattern strength."""
@@ -0,0 +1,136 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from storage.base import Repository
+
+
+class ClassroomDirectory:
+    """In-memory classroom registry with lookup indexes.
+
+    Built once from storage at startup and kept in step with every mutation,
+    which is also written through to storage. Indexes:
+
+    - join_code -> classroom_id
+    - teacher_id -> classroom_ids
+    - student_id -> classroom_ids
+    - classroom_id -> {student_id: member} (for O(1) membership checks)
+
+    Classroom ID collections are dicts used as insertion-ordered sets.
+    Mutations may run on executor threads and are serialized by a lock;
+    lookups stay lock-free. A check done before calling a mutation can be
+    stale by the time it runs, so mutations re-check under the lock.
+    """
+
+    def __init__(self, repository: Repository):
+        self.repository = repository
+        self._lock = threading.RLock()
+        self.reload()
+
+    def reload(self) -> None:
+        """Rebuild every index from storage."""
+        self.classrooms: Dict[str, Dict[str, Any]] = {}
+        self._by_join_code: Dict[str, str] = {}
+        self._by_teacher: Dict[str, Dict[str, None]] = {}
+        self._by_student: Dict[str, Dict[str, None]] = {}
+        self._members: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+        for classroom in self.repository.list_classrooms().values():
+            self._index(classroom)
+
+    def _index(self, classroom: Dict[str, Any]) -> None:
+        classroom_id = classroom['classroom_id']
+        self.classrooms[classroom_id] = classroom
+        self._by_join_code[classroom['join_code']] = classroom_id
+        self._by_teacher.setdefault(classroom['teacher_id'], {})[classroom_id] = None
+        self._members[classroom_id] = {}
+        for member in classroom['members']:
+            self._members[classroom_id][member['student_id']] = member
+            self._by_student.setdefault(member['student_id'], {})[classroom_id] = None
+
+    # ---------- lookups ----------
+
+    def get(self, classroom_id: str) -> Optional[Dict[str, Any]]:
+        """Get a classroom by ID."""
+        return self.classrooms.get(classroom_id)
+
+    def find_by_join_code(self, join_code: str) -> Optional[Dict[str, Any]]:
+        """Get the classroom that owns a join code."""
+        classroom_id = self._by_join_code.get(join_code)
+        return self.classrooms[classroom_id] if classroom_id else None
+
+    def join_code_exists(self, join_code: str) -> bool:
+        """Check if a join code is already taken."""
+        return join_code in self._by_join_code
+
+    def for_teacher(self, teacher_id: str) -> List[Dict[str, Any]]:
+        """Get all classrooms created by a teacher."""
+        return [self.classrooms[cid] for cid in self._by_teacher.get(teacher_id, {})]
+
+    def for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        """Get all classrooms a student is a member of."""
+        return [self.classrooms[cid] for cid in self._by_student.get(student_id, {})]
+
+    def classroom_ids_for_student(self, student_id: str) -> List[str]:
+        """Get the IDs of all classrooms a student is a member of."""
+        return list(self._by_student.get(student_id, {}))
+
+    def get_member(self, classroom_id: str, student_id: str) -> Optional[Dict[str, Any]]:
+        """Get a student's membership record in a classroom."""
+        return self._members.get(classroom_id, {}).get(student_id)
+
+    def is_member(self, classroom_id: str, student_id: str) -> bool:
+        """Check if a student is enrolled in a classroom."""
+        return student_id in self._members.get(classroom_id, {})
+
+    # ---------- mutations ----------
+
+    def create(self, classroom: Dict[str, Any]) -> bool:
+        """Store a new classroom and index it.
+
+        Returns False, storing nothing, if its join code is already taken.
+        """
+        with self._lock:
+            if self.join_code_exists(classroom['join_code']):
+                return False
+            self.repository.save_classroom(classroom)
+            self._index(classroom)
+            return True
+
+    def add_member(self, classroom_id: str, member: Dict[str, Any]) -> bool:
+        """Enroll a student in a classroom, returning False if they already are."""
+        with self._lock:
+            if self.is_member(classroom_id, member['student_id']):
+                return False
+            classroom = self.classrooms[classroom_id]
+            classroom['members'].append(member)
+            try:
+                self.repository.save_classroom(classroom)
+            except Exception:
+                classroom['members'].pop()
+                raise
+
+            self._members[classroom_id][member['student_id']] = member
+            self._by_student.setdefault(member['student_id'], {})[classroom_id] = None
+            return True
+
+    def remove_member(self, classroom_id: str, student_id: str) -> bool:
+        """Remove a student from a classroom, returning whether they were enrolled."""
+        with self._lock:
+            if not self.is_member(classroom_id, student_id):
+                return False
+
+            classroom = self.classrooms[classroom_id]
+            previous_members = classroom['members']
+            classroom['members'] = [m for m in previous_members if m['student_id'] != student_id]
+            try:
+                self.repository.save_classroom(classroom)
+            except Exception:
+                classroom['members'] = previous_members
+                raise
+
+            del self._members[classroom_id][student_id]
+            student_classrooms = self._by_student.get(student_id, {})
+            student_classrooms.pop(classroom_id, None)
+            if not student_classrooms:
+                self._by_student.pop(student_id, None)
+            return True
@@ -0,0 +1,56 @@
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Concept for questions the bank doesn't know (deleted, or no concept set)
+UNKNOWN_CONCEPT = "General"
+
+
+class ConceptIndex:
+    """question_id -> concept lookup built from the question bank.
+
+    The question bank rebuilds it whenever questions are loaded or saved;
+    scoring only reads it. A rebuild swaps in new tables in one assignment,
+    so readers on other threads always see a consistent index.
+    """
+
+    def __init__(self, questions: Iterable[Dict[str, Any]] = ()):
+        self.rebuild(questions)
+
+    def rebuild(self, questions: Iterable[Dict[str, Any]]) -> None:
+        """Replace the index with the concepts of ``questions``."""
+        by_question: Dict[int, str] = {}
+        for question in questions:
+            try:
+                question_id = int(question['id'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            by_question[question_id] = question.get('concept') or UNKNOWN_CONCEPT
+
+        names = list(dict.fromkeys(by_question.values()))
+        if UNKNOWN_CONCEPT not in names:
+            names.append(UNKNOWN_CONCEPT)
+        codes = {name: code for code, name in enumerate(names)}
+
+        question_ids = np.array(sorted(by_question), dtype=np.int64)
+        question_codes = np.array([codes[by_question[qid]] for qid in question_ids.tolist()], dtype=np.int64)
+        self._tables: Tuple[Dict[int, str], List[str], np.ndarray, np.ndarray, int] = (
+            by_question, names, question_ids, question_codes, codes[UNKNOWN_CONCEPT]
+        )
+
+    def __len__(self) -> int:
+        return len(self._tables[0])
+
+    def concept_for(self, question_id: int) -> str:
+        """Get the concept a question belongs to."""
+        return self._tables[0].get(question_id, UNKNOWN_CONCEPT)
+
+    def codes_for(self, question_ids: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        """Vectorized concept_for: an integer code per question and the code -> name list."""
+        _, names, known_ids, known_codes, unknown = self._tables
+        if not len(known_ids):
+            return np.full(len(question_ids), unknown, dtype=np.int64), names
+
+        position = np.minimum(np.searchsorted(known_ids, question_ids), len(known_ids) - 1)
+        found = known_ids[position] == question_ids
+        return np.where(found, known_codes[position], unknown), names
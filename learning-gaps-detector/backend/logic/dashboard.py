@@ -0,0 +1,194 @@
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+
+# Sort order for the student list (at_risk first)
+RISK_PRIORITY = {'at_risk': 0, 'watch': 1, 'safe': 2}
+
+
+class DashboardState:
+    """Teacher dashboard aggregates maintained incrementally as scores arrive.
+
+    Only each student's latest score counts towards the dashboard, so applying
+    a newer score first retracts the student's previous contribution and then
+    adds the new one. That keeps every update O(concepts in the score) and the
+    dashboard payload is rebuilt only when something actually changed.
+
+    Every score write (and reset) also bumps a data version. ``cursor`` is
+    that version prefixed with a per-process epoch, so cursors handed out
+    before a restart never match; it serves as ETag and ``since`` value.
+    """
+
+    def __init__(self):
+        self.latest_scores: Dict[str, Dict[str, Any]] = {}
+        self.risk_counts = {"at_risk": 0, "watch": 0, "safe": 0}
+        self.concepts: Dict[str, Dict[str, float]] = {}
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        # Version at which each student last got a score
+        self._student_versions: Dict[str, int] = {}
+        # Deltas cannot span a reset
+        self._reset_version = 0
+
+    @classmethod
+    def from_scores(cls, scores: Iterable[Dict[str, Any]]) -> "DashboardState":
+        """Build the state by replaying stored scores."""
+        state = cls()
+        for score in scores:
+            state.apply_score(score)
+        return state
+
+    def reset(self) -> None:
+        """Forget all aggregates (used when data is wiped)."""
+        self.latest_scores = {}
+        self.risk_counts = {"at_risk": 0, "watch": 0, "safe": 0}
+        self.concepts = {}
+        self._snapshot = None
+        self.version += 1
+        self._reset_version = self.version
+        self._student_versions = {}
+
+    @property
+    def cursor(self) -> str:
+        """Current data version, as handed to clients."""
+        return f"{self.epoch}.{self.version}"
+
+    def student_cursor(self, student_id: str) -> str:
+        """Data version of one student's scores."""
+        return f"{self.epoch}.{self._student_versions.get(student_id, 0)}"
+
+    def apply_score(self, score: Dict[str, Any]) -> bool:
+        """Fold a new score into the aggregates.
+
+        Returns False if the student already has a newer score, in which case
+        nothing changes.
+        """
+        student_id = score['student_id']
+        self.version += 1
+        self._student_versions[student_id] = self.version
+
+        previous = self.latest_scores.get(student_id)
+        if previous is not None and score['timestamp'] <= previous['timestamp']:
+            return False
+
+        if previous is not None:
+            self._retract(previous)
+
+        entry = {
+            'student_id': student_id,
+            'overall_risk': score.get('overall_risk', 'safe'),
+            'overall_score': score.get('overall_score', 0),
+            'timestamp': score.get('timestamp'),
+            'top_concerns': score.get('recommendations', [])[:2],
+            'concept_gaps': [
+                (gap['concept'], gap['gap_score'], gap['risk_level'])
+                for gap in score.get('concept_gaps', [])
+            ]
+        }
+        self._add(entry)
+        self.latest_scores[student_id] = entry
+        self._snapshot = None
+        return True
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        if entry['overall_risk'] in self.risk_counts:
+            self.risk_counts[entry['overall_risk']] += 1
+
+        for concept_name, gap_score, risk_level in entry['concept_gaps']:
+            concept = self.concepts.setdefault(concept_name, {
+                'total_students': 0,
+                'gap_score_sum': 0.0,
+                'at_risk_count': 0
+            })
+            concept['total_students'] += 1
+            concept['gap_score_sum'] += gap_score
+            if risk_level == 'at_risk':
+                concept['at_risk_count'] += 1
+
+    def _retract(self, entry: Dict[str, Any]) -> None:
+        if entry['overall_risk'] in self.risk_counts:
+            self.risk_counts[entry['overall_risk']] -= 1
+
+        for concept_name, gap_score, risk_level in entry['concept_gaps']:
+            concept = self.concepts[concept_name]
+            concept['total_students'] -= 1
+            concept['gap_score_sum'] -= gap_score
+            if risk_level == 'at_risk':
+                concept['at_risk_count'] -= 1
+            if concept['total_students'] == 0:
+                del self.concepts[concept_name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the dashboard payload, rebuilding it only after changes."""
+        if self._snapshot is None:
+            self._snapshot = self._build_snapshot()
+        return self._snapshot
+
+    def changes_since(self, cursor: str) -> Optional[Dict[str, Any]]:
+        """Get what changed after ``cursor``: summary, concepts and changed students.
+
+        Returns None when the cursor is unknown (other epoch, malformed, or
+        from before a reset) and a full snapshot is needed instead.
+        """
+        epoch, _, version = cursor.partition(".")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        since = int(version)
+        if since < self._reset_version or since > self.version:
+            return None
+
+        snapshot = self.snapshot()
+        return {
+            "delta": True,
+            "summary": snapshot["summary"],
+            "students": [
+                student for student in snapshot["students"]
+                if self._student_versions.get(student['student_id'], 0) > since
+            ],
+            "concept_analysis": snapshot["concept_analysis"]
+        }
+
+    def summary(self) -> Dict[str, int]:
+        """Student counts by risk level."""
+        return {
+            "total_students": len(self.latest_scores),
+            "at_risk_students": self.risk_counts['at_risk'],
+            "watch_students": self.risk_counts['watch'],
+            "safe_students": self.risk_counts['safe']
+        }
+
+    def concept_analysis(self) -> Dict[str, Dict[str, Any]]:
+        """Per-concept averages over each student's latest score."""
+        return {
+            name: {
+                'total_students': concept['total_students'],
+                'avg_gap_score': concept['gap_score_sum'] / concept['total_students'],
+                'at_risk_count': concept['at_risk_count']
+            }
+            for name, concept in self.concepts.items()
+        }
+
+    def student(self, student_id: str) -> Optional[Dict[str, Any]]:
+        """A student's row in the dashboard list."""
+        entry = self.latest_scores.get(student_id)
+        if entry is None:
+            return None
+        return {
+            'student_id': entry['student_id'],
+            'overall_risk': entry['overall_risk'],
+            'overall_score': entry['overall_score'],
+            'timestamp': entry['timestamp'],
+            'top_concerns': entry['top_concerns']
+        }
+
+    def _build_snapshot(self) -> Dict[str, Any]:
+        students = [self.student(student_id) for student_id in self.latest_scores]
+        students.sort(key=lambda x: (RISK_PRIORITY.get(x['overall_risk'], 2), -x['overall_score']))
+
+        return {
+            "summary": self.summary(),
+            "students": students,
+            "concept_analysis": self.concept_analysis()
+        }
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from models.quiz import StudentSubmission
+from storage.base import Repository
+from utils.executors import BlockingExecutors
+from utils.serialization import dumps_bytes
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused for a different submission."""
+
+
+def submission_hash(submission: StudentSubmission) -> str:
+    """Hash of what a submission contains (student, quiz and attempts, not the timestamp)."""
+    content = dumps_bytes([
+        submission.student_id,
+        submission.quiz_id,
+        [attempt.model_dump(mode="json") for attempt in submission.attempts]
+    ])
+    return hashlib.sha256(content).hexdigest()
+
+
+def submission_key(submission_hash: str, student_id: str, idempotency_key: Optional[str] = None) -> str:
+    """Key a submission is deduplicated under: the client's key if given, else its content."""
+    if idempotency_key:
+        return f"key:{student_id}:{idempotency_key}"
+    return f"sha256:{submission_hash}"
+
+
+class SubmissionCache:
+    """Answers repeated submissions with the result of the first one.
+
+    Results are found by submission key: first in a bounded LRU of recent
+    submissions, then in storage, where every score is written with its
+    key. Concurrent duplicates (a retry racing the original) wait for the
+    first request instead of scoring again.
+    """
+
+    def __init__(self, repository: Repository, executors: BlockingExecutors, max_entries: int = 10000):
+        self.repository = repository
+        self.executors = executors
+        self.max_entries = max_entries
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def remember(self, key: str, result: Dict[str, Any]) -> None:
+        """Add a result to the LRU, evicting the least recently used one if full."""
+        self._recent[key] = result
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached result (storage was cleared)."""
+        self._recent.clear()
+
+    async def _find(self, key: str) -> Optional[Dict[str, Any]]:
+        result = self._recent.get(key)
+        if result is not None:
+            self._recent.move_to_end(key)
+            return result
+
+        result = await self.executors.run_io(self.repository.get_score_by_submission_key, key)
+        if result is not None:
+            self.remember(key, result)
+        return result
+
+    async def find(self, key: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the result stored for ``key`` without scoring, or None.
+
+        Waits for a submission with the same key that is being scored.
+        """
+        while True:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            result = await asyncio.shield(pending)
+            if result is not None:
+                return self._check(result, content_hash)
+
+        result = await self._find(key)
+        return self._check(result, content_hash) if result is not None else None
+
+    async def get_or_score(self, key: str, content_hash: str,
+                           score: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """Return the stored result for ``key``, or run ``score`` to produce it.
+
+        Returns ``(result, replayed)``; ``replayed`` is True when the result
+        came from an earlier submission.
+        """
+        while True:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            # The original failed if it resolves to None; then try ourselves
+            result = await asyncio.shield(pending)
+            if result is not None:
+                return self._check(result, content_hash), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        result = None
+        try:
+            result = await self._find(key)
+            if result is not None:
+                return self._check(result, content_hash), True
+
+            result = await score()
+            self.remember(key, result)
+            return result, False
+        finally:
+            del self._in_flight[key]
+            future.set_result(result)
+
+    @staticmethod
+    def _check(result: Dict[str, Any], content_hash: str) -> Dict[str, Any]:
+        stored_hash = result.get('submission_hash')
+        if stored_hash and stored_hash != content_hash:
+            raise IdempotencyConflictError("Idempotency-Key was already used for a different submission")
+        return result
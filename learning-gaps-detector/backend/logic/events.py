@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+from utils.serialization import dumps
+
+# Group for subscribers that want events for every student
+ALL = "*"
+
+
+class Subscriber:
+    """One open event stream: a bounded queue of encoded events."""
+
+    def __init__(self, groups: Set[str], max_pending: int):
+        self.groups = groups
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=max_pending)
+        self.closed = False
+
+
+class EventHub:
+    """Fans dashboard events out to server-sent event streams.
+
+    Subscribers join groups (classroom IDs, or ``ALL``). Each published
+    event is encoded once and the same bytes are queued for every subscriber
+    in its groups, so the cost per subscriber is one queue put. An idle
+    stream is just a parked coroutine and gets a comment line every
+    ``heartbeat`` seconds to keep proxies from closing it. A subscriber that
+    falls ``max_pending`` events behind is disconnected; the client
+    reconnects and resyncs.
+    """
+
+    def __init__(self, heartbeat: float = 15.0, max_pending: int = 100):
+        self.heartbeat = heartbeat
+        self.max_pending = max_pending
+        self._groups: Dict[str, Set[Subscriber]] = {}
+        self._subscribers: Set[Subscriber] = set()
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def has_subscribers(self, groups: Iterable[str]) -> bool:
+        """Check if publishing to ``groups`` would reach anyone."""
+        return any(group in self._groups for group in groups)
+
+    def subscribe(self, groups: Iterable[str] = (ALL,)) -> Subscriber:
+        """Register a subscriber for the given groups."""
+        subscriber = Subscriber(set(groups) or {ALL}, self.max_pending)
+        self._subscribers.add(subscriber)
+        for group in subscriber.groups:
+            self._groups.setdefault(group, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber from all of its groups."""
+        subscriber.closed = True
+        self._subscribers.discard(subscriber)
+        for group in subscriber.groups:
+            members = self._groups.get(group)
+            if members is not None:
+                members.discard(subscriber)
+                if not members:
+                    del self._groups[group]
+
+    @staticmethod
+    def encode(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+        """Encode one server-sent event."""
+        lines = []
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"event: {event}")
+        lines.append("data: " + dumps(data))
+        return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+    def publish(self, event: str, data: Dict[str, Any], groups: Optional[Iterable[str]] = None) -> int:
+        """Send an event to every subscriber of ``groups`` (everyone if None).
+
+        Returns how many subscribers got it. Must be called from the event
+        loop thread.
+        """
+        if groups is None:
+            targets = set(self._subscribers)
+        else:
+            targets = set()
+            for group in groups:
+                targets |= self._groups.get(group, set())
+        if not targets:
+            return 0
+
+        payload = self.encode(event, data, next(self._ids))
+        delivered = 0
+        for subscriber in targets:
+            try:
+                subscriber.queue.put_nowait(payload)
+                delivered += 1
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+        return delivered
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        self.unsubscribe(subscriber)
+        # Make room for the sentinel so the stream ends promptly
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def close(self) -> None:
+        """End every open stream (used on shutdown)."""
+        for subscriber in list(self._subscribers):
+            self._drop(subscriber)
+
+    async def stream(self, subscriber: Subscriber, first: Optional[bytes] = None) -> AsyncIterator[bytes]:
+        """Yield encoded events for a subscriber until it is dropped or disconnects."""
+        try:
+            if first is not None:
+                yield first
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if payload is None:
+                    return
+                yield payload
+        finally:
+            if not subscriber.closed:
+                self.unsubscribe(subscriber)
@@ -1,145 +1,156 @@
-from typing import List, Dict, Any
-import statistics
-from models.quiz import StudentSubmission, QuizAttempt
-from utils.time_utils import calculate_time_stats
+from typing import List, Dict, Any, Optional
+import math
+from models.quiz import StudentSubmission
+from logic.concepts import ConceptIndex
+
+
+def _sample_stdev(values: List[float]) -> float:
+    """Sample standard deviation (Welford's method), 0 for fewer than two values."""
+    if len(values) < 2:
+        return 0
+    mean = m2 = 0.0
+    for count, value in enumerate(values, start=1):
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+    return math.sqrt(m2 / (len(values) - 1))
 
 
 class FeatureExtractor:
-    """Extract behavioral features from student quiz attempts."""
+    """Extract behavioral features from student quiz attempts.
+    
+    Every feature is accumulated in a single pass over the attempts: running
+    counts and sums for rates and means, and Welford's method for the time
+    and confidence variance (numerically stable, no second pass needed).
+    The same pass groups attempts by concept (from the question bank's
+    ConceptIndex); the per-concept totals are returned under ``concepts``
+    so scoring doesn't group them again.
+    """
+    
+    def __init__(self, concepts: Optional[ConceptIndex] = None):
+        self.concepts = concepts if concepts is not None else ConceptIndex()
     
     def extract_features(self, submission: StudentSubmission) -> Dict[str, Any]:
         """Extract all behavioral features from a submission."""
         attempts = submission.attempts
+        total = len(attempts)
+        if total == 0:
+            raise ValueError("Cannot extract features from a submission without attempts")
+        
+        times = []
+        time_sum = 0.0
+        time_mean = time_m2 = 0.0
+        confidence_sum = 0
+        confidence_mean = confidence_m2 = 0.0
+        very_fast = very_slow = 0
+        high_confidence = low_confidence = 0
+        correct = 0
+        correct_time_sum = incorrect_time_sum = 0.0
+        correct_confidence_sum = incorrect_confidence_sum = 0
+        # concept -> totals, in order of first appearance
+        concept_totals: Dict[str, Dict[str, float]] = {}
+        concept_for = self.concepts.concept_for
+        
+        for count, attempt in enumerate(attempts, start=1):
+            time_taken = attempt.time_taken
+            confidence = attempt.confidence
+            
+            # Time
+            times.append(time_taken)
+            time_sum += time_taken
+            delta = time_taken - time_mean
+            time_mean += delta / count
+            time_m2 += delta * (time_taken - time_mean)
+            if time_taken < 5:
+                very_fast += 1
+            elif time_taken > 60:
+                very_slow += 1
+            
+            # Confidence
+            confidence_sum += confidence
+            delta = confidence - confidence_mean
+            confidence_mean += delta / count
+            confidence_m2 += delta * (confidence - confidence_mean)
+            if confidence >= 4:
+                high_confidence += 1
+            elif confidence <= 2:
+                low_confidence += 1
+            
+            # Concept grouping
+            concept = concept_for(attempt.question_id)
+            totals = concept_totals.get(concept)
+            if totals is None:
+                totals = concept_totals[concept] = {
+                    'attempted': 0, 'correct': 0, 'time_sum': 0.0, 'confidence_sum': 0,
+                    'correct_time_sum': 0.0, 'incorrect_time_sum': 0.0, 'incorrect_confidence_sum': 0
+                }
+            totals['attempted'] += 1
+            totals['time_sum'] += time_taken
+            totals['confidence_sum'] += confidence
+            
+            # Accuracy
+            if attempt.is_correct:
+                correct += 1
+                correct_time_sum += time_taken
+                correct_confidence_sum += confidence
+                totals['correct'] += 1
+                totals['correct_time_sum'] += time_taken
+            else:
+                incorrect_time_sum += time_taken
+                incorrect_confidence_sum += confidence
+                totals['incorrect_time_sum'] += time_taken
+                totals['incorrect_confidence_sum'] += confidence
+        
+        incorrect = total - correct
+        time_variance = time_m2 / (total - 1) if total > 1 else 0
+        
+        times.sort()
+        middle = total // 2
+        median_time = times[middle] if total % 2 else (times[middle - 1] + times[middle]) / 2
+        
+        avg_confidence_when_correct = correct_confidence_sum / correct if correct else 0
+        avg_confidence_when_incorrect = incorrect_confidence_sum / incorrect if incorrect else 0
+        accuracy = correct / total
         
         features = {
             'student_id': submission.student_id,
             'quiz_id': submission.quiz_id,
             'timestamp': submission.timestamp,
-        }
-        
-        # Time-based features
-        features.update(self._extract_time_features(attempts))
-        
-        # Confidence features  
-        features.update(self._extract_confidence_features(attempts))
-        
-        # Accuracy features
-        features.update(self._extract_accuracy_features(attempts))
-        
-        # Consistency features
-        features.update(self._extract_consistency_features(attempts))
-        
-        return features
-    
-    def _extract_time_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
-        """Extract timing-related features."""
-        times = [attempt.time_taken for attempt in attempts]
-        correct_times = [attempt.time_taken for attempt in attempts if attempt.is_correct]
-        incorrect_times = [attempt.time_taken for attempt in attempts if not attempt.is_correct]
-        
-        features = {}
-        
-        # Basic time stats
-        time_stats = calculate_time_stats(times)
-        features['avg_time'] = time_stats['avg']
-        features['median_time'] = time_stats['median']
-        features['time_std'] = time_stats['std']
-        
-        # Speed patterns
-        features['very_fast_responses'] = sum(1 for t in times if t < 5) / len(times)
-        features['very_slow_responses'] = sum(1 for t in times if t > 60) / len(times)
-        
-        # Correct vs incorrect timing
-        if correct_times:
-            features['avg_correct_time'] = statistics.mean(correct_times)
-        else:
-            features['avg_correct_time'] = 0
             
-        if incorrect_times:
-            features['avg_incorrect_time'] = statistics.mean(incorrect_times)
-        else:
-            features['avg_incorrect_time'] = 0
-        
-        # Time consistency
-        features['time_variance'] = statistics.variance(times) if len(times) > 1 else 0
-        
-        return features
-    
-    def _extract_confidence_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
-        """Extract confidence-related features."""
-        confidences = [attempt.confidence for attempt in attempts]
-        correct_confidences = [attempt.confidence for attempt in attempts if attempt.is_correct]
-        incorrect_confidences = [attempt.confidence for attempt in attempts if not attempt.is_correct]
-        
-        features = {}
-        
-        # Basic confidence stats
-        features['avg_confidence'] = statistics.mean(confidences)
-        features['confidence_std'] = statistics.stdev(confidences) if len(confidences) > 1 else 0
-        
-        # High confidence patterns
-        features['high_confidence_rate'] = sum(1 for c in confidences if c >= 4) / len(confidences)
-        features['low_confidence_rate'] = sum(1 for c in confidences if c <= 2) / len(confidences)
-        
-        # Confidence accuracy alignment
-        if correct_confidences:
-            features['avg_confidence_when_correct'] = statistics.mean(correct_confidences)
-        else:
-            features['avg_confidence_when_correct'] = 0
+            # Time-based features
+            'avg_time': time_sum / total,
+            'median_time': median_time,
+            'time_std': math.sqrt(time_variance),
+            'very_fast_responses': very_fast / total,
+            'very_slow_responses': very_slow / total,
+            'avg_correct_time': correct_time_sum / correct if correct else 0,
+            'avg_incorrect_time': incorrect_time_sum / incorrect if incorrect else 0,
+            'time_variance': time_variance,
             
-        if incorrect_confidences:
-            features['avg_confidence_when_incorrect'] = statistics.mean(incorrect_confidences)
-        else:
-            features['avg_confidence_when_incorrect'] = 0
+            # Confidence features
+            'avg_confidence': confidence_sum / total,
+            'confidence_std': math.sqrt(confidence_m2 / (total - 1)) if total > 1 else 0,
+            'high_confidence_rate': high_confidence / total,
+            'low_confidence_rate': low_confidence / total,
+            'avg_confidence_when_correct': avg_confidence_when_correct,
+            'avg_confidence_when_incorrect': avg_confidence_when_incorrect,
+            'overconfidence_score': avg_confidence_when_incorrect - 2.5,
+            'confidence_calibration_gap': avg_confidence_when_correct - avg_confidence_when_incorrect,
+            'confidence_accuracy_gap': confidence_sum / total / 5.0 - accuracy,
             
-        # Overconfidence indicator
-        features['overconfidence_score'] = features['avg_confidence_when_incorrect'] - 2.5
-        
-        return features
-    
-    def _extract_accuracy_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
-        """Extract accuracy-related features."""
-        features = {}
-        
-        total_attempts = len(attempts)
-        correct_attempts = sum(1 for attempt in attempts if attempt.is_correct)
-        
-        features['accuracy'] = correct_attempts / total_attempts if total_attempts > 0 else 0
-        features['total_questions'] = total_attempts
-        features['correct_answers'] = correct_attempts
-        features['incorrect_answers'] = total_attempts - correct_attempts
-        
-        return features
-    
-    def _extract_consistency_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
-        """Extract consistency-related features."""
-        features = {}
-        
-        # Group by concept for consistency analysis
-        concept_attempts = {}
-        for attempt in attempts:
-            # We'll need to map questions to concepts - for now use question_id
-            concept = f"concept_{attempt.question_id % 3}"  # Simple grouping
-            if concept not in concept_attempts:
-                concept_attempts[concept] = []
-            concept_attempts[concept].append(attempt)
-        
-        # Calculate concept-level consistency
-        concept_accuracies = []
-        for concept, concept_attempts_list in concept_attempts.items():
-            if len(concept_attempts_list) > 0:
-                accuracy = sum(1 for a in concept_attempts_list if a.is_correct) / len(concept_attempts_list)
-                concept_accuracies.append(accuracy)
+            # Accuracy features
+            'accuracy': accuracy,
+            'total_questions': total,
+            'correct_answers': correct,
+            'incorrect_answers': incorrect,
+        }
         
-        if concept_accuracies:
-            features['concept_consistency'] = 1 - statistics.stdev(concept_accuracies) if len(concept_accuracies) > 1 else 1
-            features['weakest_concept_score'] = min(concept_accuracies)
-            features['strongest_concept_score'] = max(concept_accuracies)
-            features['concept_gap'] = max(concept_accuracies) - min(concept_accuracies)
-        else:
-            features['concept_consistency'] = 0
-            features['weakest_concept_score'] = 0
-            features['strongest_concept_score'] = 0
-            features['concept_gap'] = 0
+        # Consistency features
+        features['concepts'] = concept_totals
+        concept_accuracies = [totals['correct'] / totals['attempted'] for totals in concept_totals.values()]
+        features['concept_consistency'] = 1 - _sample_stdev(concept_accuracies) if len(concept_accuracies) > 1 else 1
+        features['weakest_concept_score'] = min(concept_accuracies)
+        features['strongest_concept_score'] = max(concept_accuracies)
+        features['concept_gap'] = features['strongest_concept_score'] - features['weakest_concept_score']
         
         return features
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models.quiz import StudentSubmission
+from logic.dedup import IdempotencyConflictError
+from logic.scoring import LearningGapScorer
+from storage.base import Repository
+from storage.group_commit import GroupCommitWriter
+from utils.executors import BlockingExecutors
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the scoring queue cannot accept more submissions."""
+
+
+class ScoringQueue:
+    """Scores submissions in the background with a bounded number of workers.
+
+    A submission is written to storage (tagged with its job_id) before it is
+    acknowledged, so nothing is lost if the process stops while the job is
+    still queued: on startup every stored submission whose job_id has no
+    matching score is queued again. Scoring itself runs in the shared CPU
+    executor.
+
+    Jobs enqueued with a submission key can be found by it until they
+    finish, so a duplicate submission gets the job already queued.
+    """
+
+    def __init__(self, scorer: LearningGapScorer, repository: Repository,
+                 writer: GroupCommitWriter, executors: BlockingExecutors,
+                 on_scored: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 workers: int = 2, max_pending: int = 1000, retention: int = 10000):
+        self.scorer = scorer
+        self.repository = repository
+        self.writer = writer
+        self.executors = executors
+        self.on_scored = on_scored
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention = retention
+
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # submission_key -> (job_id, submission_hash) of unfinished jobs
+        self._keys: Dict[str, Tuple[str, str]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        # Stored jobs that found the queue full after passing the check in
+        # enqueue (at most one per concurrent enqueue); moved to the queue
+        # as workers free up room
+        self._overflow: deque = deque()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the workers and re-queue submissions left unscored."""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._overflow.clear()
+        self._keys.clear()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+        for record in await self.executors.run_io(self._find_unscored):
+            self._track(record['job_id'], record)
+            await self._queue.put((record['job_id'], record))
+
+    async def stop(self) -> None:
+        """Stop the workers; queued jobs are recovered on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _find_unscored(self) -> List[Dict[str, Any]]:
+        scored = {score['job_id'] for score in self.repository.iter_scores() if score.get('job_id')}
+        return [
+            record for record in self.repository.iter_responses()
+            if record.get('job_id') and record['job_id'] not in scored
+        ]
+
+    def _track(self, job_id: str, record: Dict[str, Any]) -> None:
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "student_id": record['student_id'],
+            "quiz_id": record['quiz_id'],
+            "submitted_at": record['timestamp'],
+        }
+        if record.get('submission_key'):
+            self._keys[record['submission_key']] = (job_id, record.get('submission_hash'))
+        # Forget the oldest jobs once the retention limit is reached
+        while len(self.jobs) > self.retention:
+            self.jobs.popitem(last=False)
+
+    def job_for_key(self, key: str, content_hash: str) -> Optional[str]:
+        """Return the job_id of an unfinished job queued under ``key``, if any."""
+        found = self._keys.get(key)
+        if found is None:
+            return None
+        job_id, stored_hash = found
+        if stored_hash and stored_hash != content_hash:
+            raise IdempotencyConflictError("Idempotency-Key was already used for a different submission")
+        return job_id
+
+    async def enqueue(self, submission: StudentSubmission, content_hash: Optional[str] = None,
+                      key: Optional[str] = None) -> str:
+        """Persist a submission and queue it for scoring, returning its job_id.
+
+        With a submission key, a job already queued under it is returned
+        instead of queueing the submission again.
+        """
+        if self._queue is None:
+            raise RuntimeError("Scoring queue has not been started")
+        if self._queue.full():
+            raise QueueFullError("Scoring queue is full, try again shortly")
+
+        if key:
+            job_id = self.job_for_key(key, content_hash)
+            if job_id is not None:
+                return job_id
+
+        job_id = str(uuid.uuid4())
+        record = submission.model_dump(mode="json")
+        record['job_id'] = job_id
+        if key:
+            record['submission_hash'] = content_hash
+            record['submission_key'] = key
+
+        # Tracked before the write so a duplicate arriving meanwhile finds it
+        self._track(job_id, record)
+
+        # Durable before acknowledging
+        try:
+            await self.writer.append_response(record)
+        except Exception:
+            self._forget(job_id, record)
+            raise
+
+        try:
+            self._queue.put_nowait((job_id, record))
+        except asyncio.QueueFull:
+            # Filled up while the record was written; it is stored already,
+            # so park it rather than make the request wait for room
+            self._overflow.append((job_id, record))
+        return job_id
+
+    def _forget(self, job_id: str, record: Dict[str, Any]) -> None:
+        self.jobs.pop(job_id, None)
+        self._keys.pop(record.get('submission_key'), None)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status (and analysis, once done) of a job."""
+        return self.jobs.get(job_id)
+
+    def pending(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return (self._queue.qsize() if self._queue else 0) + len(self._overflow)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, record = await self._queue.get()
+            job = self.jobs.get(job_id, {})
+            job['status'] = "running"
+            try:
+                submission = StudentSubmission(**record)
+                result, timings = await self.executors.run_cpu(self.scorer.score_submission_timed, submission)
+                self.scorer.record_stage_timings(timings)
+
+                result_dict = result.model_dump(mode="json")
+                result_dict['job_id'] = job_id
+                if record.get('submission_key'):
+                    result_dict['submission_hash'] = record['submission_hash']
+                    result_dict['submission_key'] = record['submission_key']
+                await self.writer.append_score(result_dict)
+
+                if self.on_scored:
+                    self.on_scored(result_dict)
+
+                job['status'] = "done"
+                job['completed_at'] = datetime.now().isoformat()
+                job['analysis'] = result_dict
+            except Exception as e:
+                logger.exception("Error scoring job %s", job_id)
+                job['status'] = "failed"
+                job['error'] = str(e)
+            finally:
+                self._keys.pop(record.get('submission_key'), None)
+                self._queue.task_done()
+                while self._overflow and not self._queue.full():
+                    self._queue.put_nowait(self._overflow.popleft())
@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from logic.concepts import ConceptIndex
+from storage.base import Repository
+from utils.serialization import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+# Sample questions for demo
+SAMPLE_QUESTIONS = [
+    {
+        "id": 1,
+        "text": "What is the slope of the line y = 3x + 2?",
+        "options": ["2", "3", "5", "Cannot be determined"],
+        "correct_answer": 1,
+        "concept": "Linear Functions"
+    },
+    {
+        "id": 2,
+        "text": "If f(x) = x², what is f(4)?",
+        "options": ["8", "16", "4", "2"],
+        "correct_answer": 1,
+        "concept": "Functions"
+    },
+    {
+        "id": 3,
+        "text": "What is the y-intercept of y = 2x - 7?",
+        "options": ["2", "-7", "7", "0"],
+        "correct_answer": 1,
+        "concept": "Linear Functions"
+    },
+    {
+        "id": 4,
+        "text": "If g(x) = 2x + 1, what is g(3)?",
+        "options": ["6", "7", "5", "9"],
+        "correct_answer": 1,
+        "concept": "Functions"
+    },
+    {
+        "id": 5,
+        "text": "Which of these represents a quadratic function?",
+        "options": ["y = 3x + 1", "y = x² + 2x", "y = 1/x", "y = 2ˣ"],
+        "correct_answer": 1,
+        "concept": "Quadratic Functions"
+    }
+]
+
+
+class QuestionBank:
+    """In-memory question bank with a pre-serialized response body.
+
+    The ``{"questions": [...]}`` payload is encoded once and tagged with a
+    hash of its bytes, so serving questions is a lookup and clients that
+    send the ETag back get a 304. ``save()`` writes through to storage and
+    rebuilds the cached body and the question -> concept index.
+    """
+
+    def __init__(self, repository: Repository, fallback: List[Dict[str, Any]] = SAMPLE_QUESTIONS,
+                 concepts: Optional[ConceptIndex] = None):
+        self.repository = repository
+        self.fallback = fallback
+        self.concepts = concepts if concepts is not None else ConceptIndex()
+        self._lock = threading.Lock()
+        # (questions, body, etag), replaced as a whole
+        self._cached: Optional[Tuple[List[Dict[str, Any]], bytes, str]] = None
+
+    @staticmethod
+    def _encode(questions: List[Dict[str, Any]]) -> Tuple[bytes, str]:
+        body = dumps_bytes({"questions": questions})
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return body, etag
+
+    def _set(self, questions: List[Dict[str, Any]]) -> None:
+        body, etag = self._encode(questions)
+        self._cached = (questions, body, etag)
+        self.concepts.rebuild(questions)
+
+    def load(self) -> None:
+        """(Re)load questions from storage, falling back to the sample set."""
+        questions = None
+        try:
+            questions = self.repository.load_questions()
+        except Exception:
+            logger.exception("Error loading questions")
+        self._set(questions if questions else self.fallback)
+
+    @property
+    def loaded(self) -> bool:
+        return self._cached is not None
+
+    def get(self) -> Tuple[bytes, str]:
+        """Get the serialized response body and its ETag."""
+        if self._cached is None:
+            self.load()
+        _, body, etag = self._cached
+        return body, etag
+
+    def questions(self) -> List[Dict[str, Any]]:
+        """Get the current questions."""
+        if self._cached is None:
+            self.load()
+        return self._cached[0]
+
+    def save(self, questions: List[Dict[str, Any]]) -> None:
+        """Persist new questions and refresh the cached body."""
+        with self._lock:
+            self.repository.save_questions(questions)
+            self._set(questions)
@@ -0,0 +1,146 @@
+import json
+import os
+import string
+from typing import Any, Dict, List, Optional, Sequence
+
+# Comparators a rule condition may use
+COMPARATORS = ('<', '<=', '>', '>=', '==', '!=')
+
+# The rule tables shipped with the backend (backend/rules/)
+DEFAULT_RULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rules")
+
+
+def load_rule_table(name: str, rules_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Read the rule table ``<rules_dir>/<name>.json``.
+
+    Besides its ``rules`` (see CompiledRules) a table file holds the
+    settings the rules are evaluated with, such as thresholds. Without a
+    ``rules_dir`` the tables shipped in backend/rules/ are used.
+    """
+    path = os.path.join(rules_dir or DEFAULT_RULES_DIR, f"{name}.json")
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    table['rules'] = [
+        dict(rule, when=[tuple(condition) for condition in rule['when']])
+        for rule in table['rules']
+    ]
+    return table
+
+
+def _check_message(rule: Dict[str, Any], features: set) -> None:
+    """Reject a message template that is malformed or refers to features the rule doesn't compare."""
+    message = rule.get('message', '')
+    try:
+        fields = [field for _, field, _, _ in string.Formatter().parse(message) if field is not None]
+        unknown = [field for field in fields if field not in features]
+        if unknown:
+            raise ValueError(f"refers to {', '.join(map(repr, unknown))}, which the rule does not compare")
+        # Format specs are checked by filling the template in once
+        message.format_map(dict.fromkeys(features, 0.0))
+    except (ValueError, KeyError, IndexError) as e:
+        raise ValueError(f"Rule {rule['name']!r}: bad message {message!r}: {e}") from None
+
+
+class CompiledRules:
+    """A declarative rule table compiled into generated evaluator functions.
+
+    Each rule is a dict::
+
+        {
+            'name': 'speed_anomaly',        # indicator / pattern type
+            'group': 'speed',               # category the rule belongs to
+            'when': [('very_fast_responses', '>', 0.3), ...],  # all must hold
+            'weight': 0.5,                  # added to the group's score when the rule fires
+            'message': 'High rate of very fast responses ({very_fast_responses:.1%})',
+            ...                             # anything else is kept for the caller
+        }
+
+    A threshold given as a string is looked up in ``thresholds`` at compile
+    time, and every entry of ``thresholds`` must be used by some rule. A
+    message may only refer to features its rule compares, so it can always
+    be filled in when the rule fires. Tables breaking these checks are
+    rejected with ValueError. The table is compiled once into plain Python functions, so an
+    evaluation is a run of comparisons with no per-rule interpretation:
+
+    - ``fired(features)``: the rules that fire for one submission's
+      features, in table order (conditions short-circuit with ``and``).
+    - ``evaluate(features)``: a flag per rule for a dict of NumPy feature
+      arrays, one entry per submission (conditions joined with ``&``).
+    - ``group_scores(flags)``: per group, the weights of the rules that
+      fired added in table order.
+
+    Rules of a group are expected to be listed together.
+    """
+
+    def __init__(self, rules: Sequence[Dict[str, Any]], thresholds: Optional[Dict[str, float]] = None):
+        thresholds = thresholds or {}
+        self.rules: List[Dict[str, Any]] = []
+        # group -> indexes of its rules, groups in order of first appearance
+        self.groups: Dict[str, List[int]] = {}
+        single, vectorized = [], []
+        used = set()
+
+        for index, rule in enumerate(rules):
+            conditions = []
+            for feature, comparator, threshold in rule['when']:
+                if comparator not in COMPARATORS:
+                    raise ValueError(f"Rule {rule['name']!r}: unknown comparator {comparator!r}")
+                if isinstance(threshold, str):
+                    if threshold not in thresholds:
+                        raise ValueError(f"Rule {rule['name']!r}: unknown threshold {threshold!r}")
+                    used.add(threshold)
+                    threshold = thresholds[threshold]
+                conditions.append((feature, comparator, float(threshold)))
+            if not conditions:
+                raise ValueError(f"Rule {rule['name']!r} has no conditions")
+            _check_message(rule, {feature for feature, _, _ in conditions})
+
+            self.rules.append(dict(rule, when=conditions))
+            self.groups.setdefault(rule.get('group', ''), []).append(index)
+            comparisons = [f"f[{feature!r}] {comparator} {threshold!r}" for feature, comparator, threshold in conditions]
+            single.append(" and ".join(comparisons))
+            vectorized.append(" & ".join(f"({comparison})" for comparison in comparisons))
+
+        unused = [name for name in thresholds if name not in used]
+        if unused:
+            raise ValueError(f"Thresholds not used by any rule: {', '.join(unused)}")
+
+        sums = {
+            group: " + ".join(["0.0"] + [f"flags[{i}] * {float(self.rules[i].get('weight', 0.0))!r}" for i in indexes])
+            for group, indexes in self.groups.items()
+        }
+        source = "\n".join([
+            "def fired(f):",
+            "    fired = []",
+            *(f"    if {condition}:\n        fired.append(rules[{index}])" for index, condition in enumerate(single)),
+            "    return fired",
+            "",
+            "def evaluate(f):",
+            "    return (",
+            *(f"        {condition}," for condition in vectorized),
+            "    )",
+            "",
+            "def group_scores(flags):",
+            "    return {",
+            *(f"        {group!r}: {total}," for group, total in sums.items()),
+            "    }",
+            "",
+        ])
+        namespace: Dict[str, Any] = {'rules': self.rules}
+        exec(compile(source, "<rule table>", "exec"), namespace)
+        self.fired = namespace['fired']
+        self.evaluate = namespace['evaluate']
+        self.group_scores = namespace['group_scores']
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __reduce__(self):
+        # The generated functions can't be pickled; scoring processes
+        # recompile them from the resolved table instead
+        return (CompiledRules, (self.rules,))
+
+    @staticmethod
+    def message(rule: Dict[str, Any], features: Dict[str, Any]) -> str:
+        """Fill in a rule's message template from the features."""
+        return rule['message'].format_map(features)
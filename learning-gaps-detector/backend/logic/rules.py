@@ -1,25 +1,33 @@
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from logic.rule_engine import CompiledRules, load_rule_table
+
+# Weight of an indicator's severity in the gap severity score
+SEVERITY_WEIGHTS = {'low': 0.2, 'medium': 0.5, 'high': 1.0}
 
 
 class LearningGapRules:
-    """Rule-based system for detecting learning gaps."""
-    
-    def __init__(self):
+    """Rule-based system for detecting learning gaps.
+
+    The rules and thresholds are read from the learning_gaps table in
+    ``rules_dir`` (backend/rules/ by default) and compiled once (see
+    CompiledRules) into evaluators for one submission's features and for
+    the feature arrays of a whole batch. A threshold given by name is
+    taken from ``self.thresholds``. Each rule's ``group`` is its pattern
+    category and ``output`` the analysis list it adds to.
+    """
+
+    def __init__(self, rules: Optional[Sequence[Dict[str, Any]]] = None, rules_dir: Optional[str] = None):
+        table = load_rule_table('learning_gaps', rules_dir)
         # Thresholds for different indicators
-        self.thresholds = {
-            'very_fast_threshold': 5.0,  # seconds
-            'high_confidence_threshold': 4,
-            'low_confidence_threshold': 2,
-            'overconfidence_threshold': 1.0,
-            'time_inconsistency_threshold': 0.7,
-            'concept_gap_threshold': 0.3,
-            'accuracy_threshold_high': 0.8,
-            'accuracy_threshold_low': 0.6
-        }
-    
+        self.thresholds = table['thresholds']
+        self.rules = CompiledRules(table['rules'] if rules is None else rules, self.thresholds)
+
     def analyze_learning_gaps(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """Apply rule-based analysis to detect learning gaps."""
-        
+
         analysis = {
             'gap_indicators': [],
             'strengths': [],
@@ -27,188 +35,105 @@ class LearningGapRules:
             'authenticity_score': 0.0,
             'gap_severity': 0.0
         }
-        
-        # Analyze different aspects
-        analysis.update(self._analyze_speed_patterns(features))
-        analysis.update(self._analyze_confidence_patterns(features))
-        analysis.update(self._analyze_consistency_patterns(features))
-        analysis.update(self._analyze_ai_usage_indicators(features))
-        
+
+        for group in self.rules.groups:
+            analysis[f'{group}_analysis'] = {}
+
+        # Each category replaces the lists the previous ones filled in, so
+        # the last category with any gap indicator (or strength) wins
+        found: Dict[str, Dict[str, List]] = {}
+        for rule in self.rules.fired(features):
+            found.setdefault(rule['output'], {}).setdefault(rule['group'], []).append(self._describe(rule, features))
+        for output, by_group in found.items():
+            analysis[output] = by_group[next(reversed(by_group))]
+
         # Calculate final scores
         analysis['gap_severity'] = self._calculate_gap_severity(analysis['gap_indicators'])
         analysis['authenticity_score'] = self._calculate_authenticity_score(features, analysis)
         analysis['risk_level'] = self._determine_risk_level(analysis['gap_severity'])
-        
+
         return analysis
-    
-    def _analyze_speed_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze timing patterns for learning gaps."""
-        patterns = {'speed_analysis': {}}
-        
-        avg_time = features.get('avg_time', 0)
-        very_fast_rate = features.get('very_fast_responses', 0)
-        time_variance = features.get('time_variance', 0)
-        
-        # Suspiciously fast responses
-        if very_fast_rate > 0.3:  # More than 30% very fast
-            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
-            patterns['gap_indicators'].append({
-                'type': 'speed_anomaly',
-                'description': f'High rate of very fast responses ({very_fast_rate:.1%})',
-                'severity': 'medium' if very_fast_rate < 0.5 else 'high'
-            })
-        
-        # Extremely consistent timing (might indicate copy-paste)
-        if time_variance < 2.0 and avg_time < 10:
-            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
-            patterns['gap_indicators'].append({
-                'type': 'timing_consistency',
-                'description': 'Unusually consistent response times',
-                'severity': 'medium'
-            })
-        
-        # Good pacing
-        if 10 <= avg_time <= 30 and very_fast_rate < 0.1:
-            patterns['strengths'] = patterns.get('strengths', [])
-            patterns['strengths'].append('Thoughtful pacing on questions')
-        
-        return patterns
-    
-    def _analyze_confidence_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze confidence patterns for learning gaps."""
-        patterns = {'confidence_analysis': {}}
-        
-        avg_confidence = features.get('avg_confidence', 0)
-        overconfidence_score = features.get('overconfidence_score', 0)
-        confidence_when_correct = features.get('avg_confidence_when_correct', 0)
-        confidence_when_incorrect = features.get('avg_confidence_when_incorrect', 0)
-        accuracy = features.get('accuracy', 0)
-        
-        # Overconfidence on wrong answers
-        if overconfidence_score > self.thresholds['overconfidence_threshold']:
-            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
-            patterns['gap_indicators'].append({
-                'type': 'overconfidence',
-                'description': f'High confidence on incorrect answers (score: {overconfidence_score:.1f})',
-                'severity': 'high'
-            })
-        
-        # High confidence with low accuracy
-        if avg_confidence > 4.0 and accuracy < 0.6:
-            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
-            patterns['gap_indicators'].append({
-                'type': 'confidence_accuracy_mismatch',
-                'description': f'High confidence ({avg_confidence:.1f}) but low accuracy ({accuracy:.1%})',
-                'severity': 'high'
-            })
-        
-        # Appropriate confidence calibration
-        confidence_gap = abs(confidence_when_correct - confidence_when_incorrect)
-        if confidence_gap > 1.0 and confidence_when_correct > confidence_when_incorrect:
-            patterns['strengths'] = patterns.get('strengths', [])
-            patterns['strengths'].append('Well-calibrated confidence levels')
-        
-        return patterns
-    
-    def _analyze_consistency_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze consistency across concepts."""
-        patterns = {'consistency_analysis': {}}
-        
-        concept_gap = features.get('concept_gap', 0)
-        concept_consistency = features.get('concept_consistency', 0)
-        weakest_score = features.get('weakest_concept_score', 0)
-        
-        # Large gaps between concepts
-        if concept_gap > self.thresholds['concept_gap_threshold']:
-            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
-            patterns['gap_indicators'].append({
-                'type': 'concept_inconsistency',
-                'description': f'Large performance gap across concepts ({concept_gap:.1%})',
-                'severity': 'medium'
-            })
-        
-        # Very weak performance on some concepts
-        if weakest_score < 0.3:
-            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
-            patterns['gap_indicators'].append({
-                'type': 'concept_weakness',
-                'description': f'Very poor performance on some concepts ({weakest_score:.1%})',
-                'severity': 'high'
-            })
-        
-        # Good consistency
-        if concept_consistency > 0.8 and weakest_score > 0.6:
-            patterns['strengths'] = patterns.get('strengths', [])
-            patterns['strengths'].append('Consistent understanding across concepts')
-        
-        return patterns
-    
-    def _analyze_ai_usage_indicators(self, features: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze patterns that might indicate AI assistance."""
-        patterns = {'ai_analysis': {}}
-        
-        very_fast_rate = features.get('very_fast_responses', 0)
-        accuracy = features.get('accuracy', 0)
-        avg_confidence = features.get('avg_confidence', 0)
-        time_variance = features.get('time_variance', 0)
-        
-        # High accuracy with fast responses and high confidence (classic AI pattern)
-        if accuracy > 0.85 and very_fast_rate > 0.4 and avg_confidence > 4.0:
-            patterns['risk_factors'] = patterns.get('risk_factors', [])
-            patterns['risk_factors'].append({
-                'type': 'potential_ai_assistance',
-                'description': 'Pattern suggests possible AI assistance (high accuracy + speed + confidence)',
-                'severity': 'high',
-                'confidence': 0.8
-            })
-        
-        # Unnatural timing consistency
-        if time_variance < 1.0 and len(features.get('attempts', [])) > 5:
-            patterns['risk_factors'] = patterns.get('risk_factors', [])
-            patterns['risk_factors'].append({
-                'type': 'unnatural_timing',
-                'description': 'Unusually consistent response times across questions',
-                'severity': 'medium',
-                'confidence': 0.6
-            })
-        
-        return patterns
-    
+
+    def analyze_batch(self, features: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Vectorized analyze_learning_gaps over feature arrays, reduced to what scoring uses.
+
+        Returns the gap severity and, per gap indicator type, whether it is
+        among the submission's final gap indicators.
+        """
+        flags = self.rules.evaluate(features)
+        rules = self.rules.rules
+        size = len(features['avg_time'])
+
+        gap_severity = np.zeros(size)
+        decided = np.zeros(size, dtype=bool)
+        indicators: Dict[str, np.ndarray] = {}
+        # Walk the categories last to first; the first one with an indicator is final
+        for indexes in reversed(list(self.rules.groups.values())):
+            indexes = [index for index in indexes if rules[index]['output'] == 'gap_indicators']
+            if not indexes:
+                continue
+            total = np.zeros(size)
+            count = np.zeros(size)
+            for index in indexes:
+                # Same summation order as _calculate_gap_severity
+                total = total + flags[index] * SEVERITY_WEIGHTS.get(rules[index].get('severity', 'low'), 0.2)
+                count = count + flags[index]
+            wins = (count > 0) & ~decided
+            severity = np.zeros(size)
+            np.divide(total, count, out=severity, where=count > 0)
+            gap_severity = np.where(wins, np.minimum(severity, 1.0), gap_severity)
+            for index in indexes:
+                name = rules[index]['name']
+                indicators[name] = indicators.get(name, np.zeros(size, dtype=bool)) | (wins & flags[index])
+            decided |= wins
+
+        return {'gap_severity': gap_severity, 'indicators': indicators}
+
+    @staticmethod
+    def _describe(rule: Dict[str, Any], features: Dict[str, Any]) -> Any:
+        """The entry a fired rule adds to its output list."""
+        description = CompiledRules.message(rule, features)
+        if rule['output'] == 'strengths':
+            return description
+        entry = {'type': rule['name'], 'description': description, 'severity': rule.get('severity', 'low')}
+        if 'confidence' in rule:
+            entry['confidence'] = rule['confidence']
+        return entry
+
     def _calculate_gap_severity(self, gap_indicators: List[Dict]) -> float:
         """Calculate overall gap severity score."""
         if not gap_indicators:
             return 0.0
-        
-        severity_weights = {'low': 0.2, 'medium': 0.5, 'high': 1.0}
-        total_score = sum(severity_weights.get(indicator.get('severity', 'low'), 0.2) 
+
+        total_score = sum(SEVERITY_WEIGHTS.get(indicator.get('severity', 'low'), 0.2)
                          for indicator in gap_indicators)
-        
+
         # Normalize to 0-1 scale
         max_possible = len(gap_indicators) * 1.0
         return min(total_score / max_possible, 1.0) if max_possible > 0 else 0.0
-    
+
     def _calculate_authenticity_score(self, features: Dict[str, Any], analysis: Dict[str, Any]) -> float:
         """Calculate how authentic the learning appears to be."""
         risk_factors = analysis.get('risk_factors', [])
-        
+
         if not risk_factors:
             return 1.0  # Highly authentic if no risk factors
-        
+
         # Reduce authenticity based on risk factors
         authenticity = 1.0
         for factor in risk_factors:
             severity = factor.get('severity', 'low')
             confidence = factor.get('confidence', 0.5)
-            
+
             if severity == 'high':
                 authenticity -= 0.3 * confidence
             elif severity == 'medium':
                 authenticity -= 0.2 * confidence
             else:
                 authenticity -= 0.1 * confidence
-        
+
         return max(authenticity, 0.0)
-    
+
     def _determine_risk_level(self, gap_severity: float) -> str:
         """Determine risk level based on gap severity."""
         if gap_severity < 0.3:
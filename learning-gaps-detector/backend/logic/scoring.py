@@ -1,34 +1,60 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from models.quiz import StudentSubmission
 from models.result import LearningGapResult, ConceptGap
 from logic.features import FeatureExtractor
 from logic.rules import LearningGapRules  
 from logic.authenticity import AuthenticityDetector
+from logic.concepts import ConceptIndex
+from utils.metrics import Histogram
 from datetime import datetime
+from time import perf_counter
 
 
 class LearningGapScorer:
     """Main scoring engine that combines all analysis components."""
     
-    def __init__(self):
-        self.feature_extractor = FeatureExtractor()
-        self.rules_engine = LearningGapRules()
-        self.authenticity_detector = AuthenticityDetector()
+    # Stages of score_submission, as labelled in stage_seconds
+    STAGES = ('features', 'rules', 'authenticity', 'concept_gaps', 'recommendations')
+    
+    def __init__(self, concepts: Optional[ConceptIndex] = None, stage_seconds: Optional[Histogram] = None,
+                 rules_dir: Optional[str] = None):
+        self.concepts = concepts if concepts is not None else ConceptIndex()
+        # Optional histogram (labelled by stage) that score_submission times its stages into
+        self.stage_seconds = stage_seconds
+        self.feature_extractor = FeatureExtractor(self.concepts)
+        # Rule tables are read from rules_dir (the shipped backend/rules/ by default)
+        self.rules_engine = LearningGapRules(rules_dir=rules_dir)
+        self.authenticity_detector = AuthenticityDetector(rules_dir=rules_dir)
     
     def score_submission(self, submission: StudentSubmission) -> LearningGapResult:
         """Generate complete learning gap analysis for a submission."""
+        result, timings = self.score_submission_timed(submission)
+        self.record_stage_timings(timings)
+        return result
+    
+    def score_submission_timed(self, submission: StudentSubmission) -> Tuple[LearningGapResult, Tuple[float, ...]]:
+        """score_submission, returning the seconds spent in each of STAGES with the result.
+        
+        Nothing is recorded here: a scoring process has no histogram, so its
+        caller passes the timings to record_stage_timings in the server.
+        """
+        started = perf_counter()
         
         # Extract features
         features = self.feature_extractor.extract_features(submission)
+        extracted = perf_counter()
         
         # Apply rule-based analysis
         gap_analysis = self.rules_engine.analyze_learning_gaps(features)
+        analyzed = perf_counter()
         
         # Detect AI usage patterns
         authenticity_analysis = self.authenticity_detector.detect_ai_usage_probability(features)
+        detected = perf_counter()
         
         # Generate concept-level gaps
         concept_gaps = self._generate_concept_gaps(features, gap_analysis, submission)
+        gapped = perf_counter()
         
         # Calculate overall scores
         overall_score = self._calculate_overall_score(gap_analysis, authenticity_analysis)
@@ -39,7 +65,10 @@ class LearningGapScorer:
             gap_analysis, authenticity_analysis, concept_gaps
         )
         
-        return LearningGapResult(
+        timings = (extracted - started, analyzed - extracted, detected - analyzed,
+                   gapped - detected, perf_counter() - gapped)
+        
+        result = LearningGapResult(
             student_id=submission.student_id,
             quiz_id=submission.quiz_id,
             overall_score=overall_score,
@@ -48,31 +77,39 @@ class LearningGapScorer:
             timestamp=datetime.now(),
             recommendations=recommendations
         )
+        return result, timings
+    
+    def record_stage_timings(self, timings: Tuple[float, ...]) -> None:
+        """Observe the stage timings returned by score_submission_timed."""
+        if self.stage_seconds is not None:
+            for stage, seconds in zip(self.STAGES, timings):
+                self.stage_seconds.observe(seconds, stage)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Sent to scoring processes without the histogram (it holds a lock,
+        # and observations made in another process would be lost); callers
+        # use score_submission_timed there and record the timings here
+        state = self.__dict__.copy()
+        state['stage_seconds'] = None
+        return state
     
     def _generate_concept_gaps(self, features: Dict[str, Any], 
                               gap_analysis: Dict[str, Any], 
                               submission: StudentSubmission) -> List[ConceptGap]:
         """Generate concept-level gap analysis."""
         
-        # Group attempts by concept (simplified mapping)
-        concept_attempts = {}
-        for attempt in submission.attempts:
-            concept = f"concept_{attempt.question_id % 3}"  # Simple concept mapping
-            if concept not in concept_attempts:
-                concept_attempts[concept] = []
-            concept_attempts[concept].append(attempt)
-        
+        # Attempts were already grouped by concept during feature extraction
         concept_gaps = []
         
-        for concept, attempts in concept_attempts.items():
+        for concept, totals in features['concepts'].items():
             # Calculate concept-specific metrics
-            accuracy = sum(1 for a in attempts if a.is_correct) / len(attempts)
-            avg_time = sum(a.time_taken for a in attempts) / len(attempts)
-            avg_confidence = sum(a.confidence for a in attempts) / len(attempts)
+            accuracy = totals['correct'] / totals['attempted']
+            avg_time = totals['time_sum'] / totals['attempted']
+            avg_confidence = totals['confidence_sum'] / totals['attempted']
             
             # Determine gap score for this concept
             gap_score = self._calculate_concept_gap_score(
-                accuracy, avg_time, avg_confidence, attempts
+                accuracy, avg_time, avg_confidence, totals
             )
             
             # Determine risk level
@@ -85,11 +122,11 @@ class LearningGapScorer:
             
             # Generate indicators
             indicators = self._generate_concept_indicators(
-                accuracy, avg_time, avg_confidence, attempts
+                accuracy, avg_time, avg_confidence, totals
             )
             
             concept_gaps.append(ConceptGap(
-                concept=concept.replace('_', ' ').title(),
+                concept=concept,
                 gap_score=gap_score,
                 risk_level=risk_level,
                 indicators=indicators
@@ -98,7 +135,7 @@ class LearningGapScorer:
         return concept_gaps
     
     def _calculate_concept_gap_score(self, accuracy: float, avg_time: float, 
-                                   avg_confidence: float, attempts: List) -> float:
+                                   avg_confidence: float, totals: Dict[str, float]) -> float:
         """Calculate gap score for a specific concept."""
         gap_score = 0.0
         
@@ -107,9 +144,9 @@ class LearningGapScorer:
             gap_score += (0.6 - accuracy) * 1.5
         
         # Overconfidence on incorrect answers
-        incorrect_attempts = [a for a in attempts if not a.is_correct]
-        if incorrect_attempts:
-            incorrect_confidence = sum(a.confidence for a in incorrect_attempts) / len(incorrect_attempts)
+        incorrect_count = totals['attempted'] - totals['correct']
+        if incorrect_count:
+            incorrect_confidence = totals['incorrect_confidence_sum'] / incorrect_count
             if incorrect_confidence > 3.5:
                 gap_score += 0.3
         
@@ -124,7 +161,7 @@ class LearningGapScorer:
         return min(gap_score, 1.0)
     
     def _generate_concept_indicators(self, accuracy: float, avg_time: float,
-                                   avg_confidence: float, attempts: List) -> List[str]:
+                                   avg_confidence: float, totals: Dict[str, float]) -> List[str]:
         """Generate specific indicators for concept gaps."""
         indicators = []
         
@@ -138,11 +175,13 @@ class LearningGapScorer:
             indicators.append("Overconfident despite poor performance")
         
         # Check for consistency within concept
-        correct_times = [a.time_taken for a in attempts if a.is_correct]
-        incorrect_times = [a.time_taken for a in attempts if not a.is_correct]
+        correct_count = totals['correct']
+        incorrect_count = totals['attempted'] - correct_count
         
-        if correct_times and incorrect_times:
-            if abs(sum(correct_times)/len(correct_times) - sum(incorrect_times)/len(incorrect_times)) < 2:
+        if correct_count and incorrect_count:
+            avg_correct_time = totals['correct_time_sum'] / correct_count
+            avg_incorrect_time = totals['incorrect_time_sum'] / incorrect_count
+            if abs(avg_correct_time - avg_incorrect_time) < 2:
                 indicators.append("Similar response times for correct/incorrect answers")
         
         if not indicators:
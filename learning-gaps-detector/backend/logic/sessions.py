@@ -0,0 +1,141 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from storage.base import Repository
+
+
+class SessionStore:
+    """In-memory session table with sliding TTL expiry.
+
+    A session expires ``ttl_seconds`` after it was last used. Lookups are a
+    dict access; creating or deleting a session is written through to
+    storage, while ``sweep()`` (run periodically) evicts expired sessions and
+    rewrites the persisted copy so it only ever holds live sessions.
+
+    Safe to call from executor threads: the table is guarded by a lock that
+    is never held during storage I/O, so lookups on the event loop never
+    wait on a disk write. Creates and deletes are serialized with flushes
+    so a rewrite from an older snapshot can't undo them.
+
+    Lookups only mark the table for rewriting once a session's stored
+    ``last_seen`` is more than PERSIST_STEP of the TTL behind, so a sweep
+    after ordinary traffic doesn't rewrite every session.
+    """
+
+    # Share of the TTL a session's stored last_seen may lag behind
+    PERSIST_STEP = 0.01
+
+    def __init__(self, repository: Repository, ttl_seconds: float,
+                 clock: Callable[[], float] = time.time):
+        self.repository = repository
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._last_seen: Dict[str, float] = {}
+        # last_seen as of the persisted copy
+        self._persisted: Dict[str, float] = {}
+        self._persist_step = ttl_seconds * self.PERSIST_STEP
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Serializes full rewrites so an older snapshot never lands last
+        self._flush_lock = threading.Lock()
+
+        for token, session in repository.load_sessions().items():
+            self._sessions[token] = session
+            self._last_seen[token] = self._persisted[token] = self._stored_last_seen(session)
+
+        # Drop whatever expired while the server was down
+        self.sweep()
+
+    def _stored_last_seen(self, session: Dict[str, Any]) -> float:
+        # Sessions written before expiry existed only carry created_at
+        stamp = session.get('last_seen') or session.get('created_at')
+        try:
+            return datetime.fromisoformat(stamp).timestamp()
+        except (TypeError, ValueError):
+            return self.clock()
+
+    def _is_expired(self, token: str, now: float) -> bool:
+        return now - self._last_seen[token] > self.ttl_seconds
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, token: str, session: Dict[str, Any]) -> None:
+        """Start a new session."""
+        now = self.clock()
+        session = dict(session, last_seen=datetime.fromtimestamp(now).isoformat())
+        with self._flush_lock:
+            with self._lock:
+                self._sessions[token] = session
+                self._last_seen[token] = self._persisted[token] = now
+            self.repository.save_session(token, session)
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get a live session and extend its expiry; expired sessions return None."""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+
+            now = self.clock()
+            if self._is_expired(token, now):
+                self._evict(token)
+                return None
+
+            self._last_seen[token] = now
+            if now - self._persisted[token] > self._persist_step:
+                self._dirty = True
+            return session
+
+    def delete(self, token: str) -> bool:
+        """End a session, returning whether it existed."""
+        with self._flush_lock:
+            with self._lock:
+                if token not in self._sessions:
+                    return False
+                self._forget(token)
+            self.repository.delete_session(token)
+        return True
+
+    def _forget(self, token: str) -> None:
+        del self._sessions[token]
+        del self._last_seen[token]
+        del self._persisted[token]
+
+    def _evict(self, token: str) -> None:
+        self._forget(token)
+        self._dirty = True
+
+    def sweep(self) -> int:
+        """Evict expired sessions and compact the persisted copy.
+
+        Returns the number of sessions evicted.
+        """
+        now = self.clock()
+        with self._lock:
+            expired = [token for token in self._sessions if self._is_expired(token, now)]
+            for token in expired:
+                self._evict(token)
+            dirty = self._dirty
+
+        if dirty:
+            self.flush()
+        return len(expired)
+
+    def flush(self) -> None:
+        """Persist exactly the live sessions, with their latest activity time."""
+        with self._flush_lock:
+            with self._lock:
+                for token, session in self._sessions.items():
+                    session['last_seen'] = datetime.fromtimestamp(self._last_seen[token]).isoformat()
+                    self._persisted[token] = self._last_seen[token]
+                snapshot = {token: dict(session) for token, session in self._sessions.items()}
+                self._dirty = False
+            try:
+                self.repository.replace_sessions(snapshot)
+            except Exception:
+                self._dirty = True
+                raise
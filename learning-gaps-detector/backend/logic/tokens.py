@@ -0,0 +1,108 @@
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from jose import jwt, JWTError
+
+from storage.base import Repository
+
+
+class RevocationList:
+    """IDs (jti) of signed tokens that were logged out before they expired.
+
+    Kept in memory for lookups and persisted, so a logout survives restarts
+    and other processes sharing the storage pick it up on their next
+    refresh. Entries are dropped once the token would have expired anyway,
+    which keeps the list small.
+    """
+
+    def __init__(self, repository: Repository, clock: Callable[[], float] = time.time):
+        self.repository = repository
+        self.clock = clock
+        self._revoked: Dict[str, float] = {}
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke a token until its expiry time."""
+        self.repository.add_revoked_token(jti, expires_at)
+        self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check if a token ID has been revoked."""
+        return jti in self._revoked
+
+    def refresh(self) -> int:
+        """Reload revocations from storage and prune expired ones.
+
+        Returns the number of entries pruned.
+        """
+        now = self.clock()
+        stored = self.repository.load_revoked_tokens()
+        live = {jti: expires_at for jti, expires_at in stored.items() if expires_at > now}
+        if len(live) != len(stored):
+            # Deleted in storage rather than rewritten, so revocations
+            # another process adds meanwhile are kept
+            self.repository.prune_revoked_tokens(now)
+        self._revoked = live
+        return len(stored) - len(live)
+
+
+class SignedTokenManager:
+    """Issues and verifies signed (JWT) session tokens.
+
+    The token carries user_id, email, role and expiry, so verification needs
+    no storage access; only logout touches the revocation list.
+    """
+
+    def __init__(self, secret: str, ttl_seconds: float, revocations: RevocationList,
+                 algorithm: str = "HS256", clock: Callable[[], float] = time.time):
+        self.secret = secret
+        self.ttl_seconds = ttl_seconds
+        self.revocations = revocations
+        self.algorithm = algorithm
+        self.clock = clock
+
+    def issue(self, user: Dict[str, Any]) -> str:
+        """Create a signed token for a user."""
+        now = int(self.clock())
+        claims = {
+            "sub": user["id"],
+            "email": user["email"],
+            "role": user["role"],
+            "iat": now,
+            "exp": now + int(self.ttl_seconds),
+            "jti": uuid.uuid4().hex
+        }
+        return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def _decode(self, token: str) -> Optional[Dict[str, Any]]:
+        try:
+            return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        except JWTError:
+            return None
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Validate a token and return its session data, or None."""
+        claims = self._decode(token)
+        if not claims or self.revocations.is_revoked(claims.get("jti", "")):
+            return None
+
+        return {
+            "user_id": claims["sub"],
+            "email": claims["email"],
+            "role": claims["role"],
+            "created_at": datetime.fromtimestamp(claims["iat"]).isoformat()
+        }
+
+    def revoke(self, token: str) -> bool:
+        """Revoke a valid token, returning whether it was valid."""
+        claims = self._decode(token)
+        if not claims or self.revocations.is_revoked(claims.get("jti", "")):
+            return False
+
+        self.revocations.revoke(claims["jti"], float(claims["exp"]))
+        return True
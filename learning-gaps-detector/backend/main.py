@@ -1,8 +1,9 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Optional
+import asyncio
 import os
 from datetime import datetime
 
@@ -12,8 +13,43 @@ from models.classroom import Classroom, ClassroomCreate, JoinClassroomRequest, C
 from models.auth import LoginRequest, SignupRequest, AuthResponse
 from logic.scoring import LearningGapScorer
 from logic.auth import AuthManager
+from logic.sessions import SessionStore
+from logic.tokens import SignedTokenManager, RevocationList
+from logic.dashboard import DashboardState
+from logic.classrooms import ClassroomDirectory
+from logic.question_bank import QuestionBank
+from logic.concepts import ConceptIndex
+from logic.events import EventHub, ALL
+from logic.jobs import ScoringQueue, QueueFullError
+from logic.dedup import SubmissionCache, IdempotencyConflictError, submission_hash, submission_key
+from storage.factory import create_repository
+from storage.group_commit import GroupCommitWriter
+from storage.maintenance_lock import MaintenanceLock
+from utils.background import run_periodically
+from utils.executors import BlockingExecutors
+from utils.http import etag_matches, SelectiveGZipMiddleware
+from utils.serialization import FastJSONResponse
+from utils.loop_monitor import EventLoopMonitor
+from utils.metrics import registry as metrics, MetricsMiddleware, BYTE_BUCKETS, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from utils.logs import configure_logging
+from utils.profiling import RequestLogMiddleware
+import config
+
+configure_logging(config.LOG_LEVEL, config.LOG_FORMAT)
+
+app = FastAPI(
+    title="AI-Resilient Learning Gaps Detector",
+    version="1.0.0",
+    default_response_class=FastJSONResponse
+)
 
-app = FastAPI(title="AI-Resilient Learning Gaps Detector", version="1.0.0")
+# Compress large responses (event streams are left alone so events aren't buffered)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=config.GZIP_MINIMUM_SIZE,
+    compresslevel=config.GZIP_LEVEL,
+    exclude_paths=("/api/events/",)
+)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -24,71 +60,201 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Structured request log with sampled / on-demand profiling (X-Profile is
+# limited to teachers, see is_teacher_request below)
+app.add_middleware(
+    RequestLogMiddleware,
+    slow_ms=config.SLOW_REQUEST_MS,
+    sample_rate=config.PROFILE_SAMPLE_RATE,
+    profile_header=config.PROFILE_HEADER,
+    profile_dir=config.PROFILE_DIR,
+    top=config.PROFILE_TOP,
+    exclude_paths=("/api/events/",),
+    may_profile=lambda scope: is_teacher_request(scope)
+)
+
+# Prometheus metrics, served on /metrics
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request", ("method", "route", "status")
+)
+REQUEST_STORAGE_BYTES = metrics.histogram(
+    "http_request_storage_bytes", "Storage bytes read or written while handling a request",
+    ("route", "direction"), buckets=BYTE_BUCKETS
+)
+SCORING_STAGE_SECONDS = metrics.histogram(
+    "scoring_stage_duration_seconds", "Time spent in each stage of scoring one submission", ("stage",)
+)
+SUBMISSIONS_SCORED = metrics.counter("submissions_scored_total", "Submissions scored and stored")
+STORAGE_WRITE_SECONDS = metrics.histogram(
+    "storage_batch_write_seconds", "Time to durably write one group commit batch of responses and scores"
+)
+
+# Outermost, so the timing includes compression and the request log sees
+# the storage activity it collects
+app.add_middleware(
+    MetricsMiddleware,
+    duration=REQUEST_SECONDS,
+    storage_bytes=REQUEST_STORAGE_BYTES,
+    exclude_paths=("/api/events/",)
+)
+
 # Mount static files for frontend - AFTER route handlers (routes defined below)
 import os
 frontend_dir = os.path.join(os.path.dirname(__file__), "..", "frontend")
 
-# Data storage paths
-DATA_DIR = "data"
-RESPONSES_FILE = os.path.join(DATA_DIR, "responses.json")
-SCORES_FILE = os.path.join(DATA_DIR, "scores.json")
-QUESTIONS_FILE = os.path.join(DATA_DIR, "questions.json")
-CLASSROOMS_FILE = os.path.join(DATA_DIR, "classrooms.json")
+# Thread/process pools for blocking storage calls and scoring
+executors = BlockingExecutors(
+    io_workers=config.IO_WORKERS,
+    cpu_workers=config.CPU_WORKERS,
+    cpu_mode=config.CPU_EXECUTOR
+)
+loop_monitor = EventLoopMonitor(interval=config.LOOP_MONITOR_INTERVAL)
+
+# Storage backend (JSON files for dev, SQLite for larger deployments)
+repository = create_repository(config.STORAGE_BACKEND, config.DATA_DIR, config.SQLITE_PATH)
+# Held while serving, so tools/rescore.py can't swap the scores underneath us
+maintenance_lock = MaintenanceLock(config.DATA_DIR)
+
+# Single writer that batches concurrent response/score writes
+writer = GroupCommitWriter(
+    repository,
+    executors,
+    window_ms=config.GROUP_COMMIT_WINDOW_MS,
+    max_batch=config.GROUP_COMMIT_MAX_BATCH,
+    write_seconds=STORAGE_WRITE_SECONDS
+)
 
-# Ensure data directory exists
-os.makedirs(DATA_DIR, exist_ok=True)
+# question_id -> concept, kept current by the question bank
+concept_index = ConceptIndex()
 
 # Initialize the scoring system
-scorer = LearningGapScorer()
-
-# Initialize auth manager
-auth_manager = AuthManager(DATA_DIR)
-
-# Initialize data files if they don't exist
-for file_path in [RESPONSES_FILE, SCORES_FILE, QUESTIONS_FILE, CLASSROOMS_FILE]:
-    if not os.path.exists(file_path):
-        with open(file_path, 'w') as f:
-            json.dump([] if file_path != CLASSROOMS_FILE else {}, f)
-
-
-# Sample questions for demo
-SAMPLE_QUESTIONS = [
-    {
-        "id": 1,
-        "text": "What is the slope of the line y = 3x + 2?",
-        "options": ["2", "3", "5", "Cannot be determined"],
-        "correct_answer": 1,
-        "concept": "Linear Functions"
-    },
-    {
-        "id": 2,
-        "text": "If f(x) = x², what is f(4)?",
-        "options": ["8", "16", "4", "2"],
-        "correct_answer": 1,
-        "concept": "Functions"
-    },
-    {
-        "id": 3,
-        "text": "What is the y-intercept of y = 2x - 7?",
-        "options": ["2", "-7", "7", "0"],
-        "correct_answer": 1,
-        "concept": "Linear Functions"
-    },
-    {
-        "id": 4,
-        "text": "If g(x) = 2x + 1, what is g(3)?",
-        "options": ["6", "7", "5", "9"],
-        "correct_answer": 1,
-        "concept": "Functions"
-    },
-    {
-        "id": 5,
-        "text": "Which of these represents a quadratic function?",
-        "options": ["y = 3x + 1", "y = x² + 2x", "y = 1/x", "y = 2ˣ"],
-        "correct_answer": 1,
-        "concept": "Quadratic Functions"
-    }
-]
+scorer = LearningGapScorer(concept_index, stage_seconds=SCORING_STAGE_SECONDS, rules_dir=config.RULES_DIR)
+
+# Initialize auth manager with an in-memory, expiring session store
+session_store = SessionStore(repository, ttl_seconds=config.SESSION_TTL_SECONDS)
+
+# Optional stateless signed tokens
+signed_tokens = None
+if config.TOKEN_MODE == "signed":
+    if not config.TOKEN_SECRET:
+        raise RuntimeError("TOKEN_SECRET must be set when TOKEN_MODE=signed")
+    signed_tokens = SignedTokenManager(
+        config.TOKEN_SECRET,
+        ttl_seconds=config.SESSION_TTL_SECONDS,
+        revocations=RevocationList(repository),
+        algorithm=config.TOKEN_ALGORITHM
+    )
+
+auth_manager = AuthManager(repository, session_store, signed_tokens)
+
+
+def is_teacher_request(scope: Dict[str, Any]) -> bool:
+    """Whether the request carries a valid teacher token ("Authorization: Bearer <token>")."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token.strip():
+                return False
+            session = auth_manager.verify_token(token.strip())
+            return bool(session) and session.get("role") == "teacher"
+    return False
+
+# Classroom registry with join code / teacher / student indexes
+classroom_directory = ClassroomDirectory(repository)
+
+# Teacher dashboard aggregates, replayed once from stored scores
+dashboard_state = DashboardState.from_scores(repository.iter_scores())
+
+# Live dashboard updates (server-sent events)
+event_hub = EventHub(heartbeat=config.EVENTS_HEARTBEAT_SECONDS, max_pending=config.EVENTS_MAX_PENDING)
+
+
+def record_score(result_dict: Dict[str, Any]) -> None:
+    """Fold a stored score into the dashboard and push it to live dashboards."""
+    SUBMISSIONS_SCORED.inc()
+    student_id = result_dict['student_id']
+    previous = dashboard_state.latest_scores.get(student_id)
+    if not dashboard_state.apply_score(result_dict):
+        return
+    
+    groups = [ALL] + classroom_directory.classroom_ids_for_student(student_id)
+    if not event_hub.has_subscribers(groups):
+        return
+    
+    student = dashboard_state.student(student_id)
+    previous_risk = previous['overall_risk'] if previous else None
+    event_hub.publish("score", {
+        "version": dashboard_state.cursor,
+        "student": student,
+        "previous_risk": previous_risk,
+        "risk_changed": previous_risk != student['overall_risk'],
+        "summary": dashboard_state.summary(),
+        "concept_analysis": dashboard_state.concept_analysis()
+    }, groups)
+
+
+# Background scoring for the asynchronous submit endpoint
+scoring_queue = ScoringQueue(
+    scorer,
+    repository,
+    writer,
+    executors,
+    on_scored=record_score,
+    workers=config.SCORING_WORKERS,
+    max_pending=config.SCORING_QUEUE_SIZE,
+    retention=config.SCORING_JOB_RETENTION
+)
+
+
+# Results of recent submissions, so retried submissions are not scored twice
+submission_cache = SubmissionCache(repository, executors, max_entries=config.SUBMISSION_CACHE_SIZE)
+
+
+# Questions served from memory as pre-encoded bytes with an ETag
+question_bank = QuestionBank(repository, concepts=concept_index)
+
+
+background_tasks = []
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    maintenance_lock.acquire()
+    executors.start()
+    await executors.run_io(question_bank.load)
+    await writer.start()
+    await scoring_queue.start()
+    background_tasks.append(asyncio.create_task(loop_monitor.run()))
+    background_tasks.append(asyncio.create_task(
+        run_periodically(config.AUTH_FLUSH_INTERVAL,
+                         lambda: executors.run_io(auth_manager.flush), "auth-flush")
+    ))
+    background_tasks.append(asyncio.create_task(
+        run_periodically(config.SESSION_SWEEP_INTERVAL,
+                         lambda: executors.run_io(session_store.sweep), "session-sweep")
+    ))
+    if signed_tokens:
+        background_tasks.append(asyncio.create_task(
+            run_periodically(config.TOKEN_REVOCATION_REFRESH_INTERVAL,
+                             lambda: executors.run_io(signed_tokens.revocations.refresh),
+                             "token-revocations")
+        ))
+
+
+@app.on_event("shutdown")
+async def close_storage():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    event_hub.close()
+    auth_manager.flush()
+    session_store.sweep()
+    await scoring_queue.stop()
+    await writer.stop()
+    executors.shutdown()
+    repository.close()
+    maintenance_lock.release()
 
 
 @app.get("/")
@@ -102,7 +268,8 @@ async def root():
 async def signup(request: SignupRequest):
     """Register a new user (Student or Teacher)."""
     try:
-        result = auth_manager.register_user(
+        result = await executors.run_io(
+            auth_manager.register_user,
             name=request.name,
             email=request.email,
             password=request.password,
@@ -128,7 +295,8 @@ async def signup(request: SignupRequest):
 async def login(request: LoginRequest):
     """Login a user (Student or Teacher) with role validation."""
     try:
-        result = auth_manager.login_user(
+        result = await executors.run_io(
+            auth_manager.login_user,
             email=request.email,
             password=request.password,
             role=request.role
@@ -164,7 +332,8 @@ async def verify_token(token: str):
         session = auth_manager.verify_token(token)
         
         if session:
-            user = auth_manager.get_user_by_id(session["user_id"])
+            # May read storage: the user can come from another worker
+            user = await executors.run_io(auth_manager.get_user_by_id, session["user_id"])
             return {
                 "valid": True,
                 "user": user,
@@ -181,7 +350,7 @@ async def verify_token(token: str):
 async def logout(token: str):
     """Logout a user by invalidating their token."""
     try:
-        if auth_manager.logout_user(token):
+        if await executors.run_io(auth_manager.logout_user, token):
             return {"success": True, "message": "Logged out successfully"}
         else:
             raise HTTPException(status_code=400, detail="Logout failed")
@@ -193,19 +362,18 @@ async def logout(token: str):
 # ==================== QUIZ ENDPOINTS ====================
 
 @app.get("/api/questions")
-async def get_questions():
+async def get_questions(request: Request):
     """Get quiz questions for students."""
-    # Try to load from file first, fall back to SAMPLE_QUESTIONS
-    try:
-        if os.path.exists(QUESTIONS_FILE):
-            with open(QUESTIONS_FILE, 'r') as f:
-                questions = json.load(f)
-                if questions and len(questions) > 0:
-                    return {"questions": questions}
-    except Exception as e:
-        print(f"Error loading questions: {e}")
+    # Served from memory; stored questions, or the sample questions if none
+    if not question_bank.loaded:
+        await executors.run_io(question_bank.load)
+    body, etag = question_bank.get()
     
-    return {"questions": SAMPLE_QUESTIONS}
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/api/save-questions")
@@ -217,9 +385,8 @@ async def save_questions(data: Dict[str, Any]):
         if not questions:
             raise HTTPException(status_code=400, detail="No questions provided")
         
-        # Save to file
-        with open(QUESTIONS_FILE, 'w') as f:
-            json.dump(questions, f, indent=2)
+        # Save to storage
+        await executors.run_io(question_bank.save, questions)
         
         return {
             "message": "Questions saved successfully",
@@ -231,45 +398,48 @@ async def save_questions(data: Dict[str, Any]):
 
 
 @app.post("/api/submit-quiz")
-async def submit_quiz(submission: StudentSubmission):
-    """Submit a completed quiz for analysis."""
+async def submit_quiz(submission: StudentSubmission, response: Response,
+                      idempotency_key: Optional[str] = Header(None)):
+    """Submit a completed quiz for analysis.
+
+    Resubmitting the same attempts (or reusing an Idempotency-Key) returns
+    the original analysis without storing or scoring it again.
+    """
     try:
         # Validate submission
         if not submission.attempts:
             raise HTTPException(status_code=400, detail="No attempts provided")
         
-        # Load existing responses
-        with open(RESPONSES_FILE, 'r') as f:
-            responses = json.load(f)
-        
-        # Convert submission to dict for storage
-        submission_dict = submission.dict()
-        submission_dict['timestamp'] = submission.timestamp.isoformat()
-        
-        # Add to responses
-        responses.append(submission_dict)
-        
-        # Save responses
-        with open(RESPONSES_FILE, 'w') as f:
-            json.dump(responses, f, indent=2)
-        
-        # Generate learning gap analysis
-        result = scorer.score_submission(submission)
+        content_hash = submission_hash(submission)
+        key = submission_key(content_hash, submission.student_id, idempotency_key)
         
-        # Load existing scores
-        with open(SCORES_FILE, 'r') as f:
-            scores = json.load(f)
-        
-        # Convert result to dict for storage
-        result_dict = result.dict()
-        result_dict['timestamp'] = result.timestamp.isoformat()
-        
-        # Add to scores
-        scores.append(result_dict)
+        async def score() -> Dict[str, Any]:
+            # Convert submission to dict for storage
+            submission_dict = submission.model_dump(mode="json")
+            submission_dict['submission_hash'] = content_hash
+            submission_dict['submission_key'] = key
+            
+            # Store the submission
+            await writer.append_response(submission_dict)
+            
+            # Generate learning gap analysis (stage timings come back from
+            # the CPU pool and are recorded here, even from a worker process)
+            result, timings = await executors.run_cpu(scorer.score_submission_timed, submission)
+            scorer.record_stage_timings(timings)
+            
+            # Convert result to dict for storage
+            result_dict = result.model_dump(mode="json")
+            result_dict['submission_hash'] = content_hash
+            result_dict['submission_key'] = key
+            
+            # Store the analysis
+            await writer.append_score(result_dict)
+            record_score(result_dict)
+            return result_dict
         
-        # Save scores
-        with open(SCORES_FILE, 'w') as f:
-            json.dump(scores, f, indent=2)
+        result_dict, replayed = await submission_cache.get_or_score(key, content_hash, score)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
         
         return {
             "message": "Quiz submitted successfully",
@@ -277,18 +447,77 @@ async def submit_quiz(submission: StudentSubmission):
             "analysis": result_dict
         }
         
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing submission: {str(e)}")
 
 
+@app.post("/api/submit-quiz/async", status_code=202)
+async def submit_quiz_async(submission: StudentSubmission, response: Response,
+                            idempotency_key: Optional[str] = Header(None)):
+    """Submit a quiz and score it in the background.
+
+    The submission is stored before responding; poll /api/scoring-jobs/{job_id}
+    for the analysis. Resubmitting the same attempts (or reusing an
+    Idempotency-Key) returns the job already queued for them, or the stored
+    analysis once it is scored, without queueing it again.
+    """
+    if not submission.attempts:
+        raise HTTPException(status_code=400, detail="No attempts provided")
+    
+    content_hash = submission_hash(submission)
+    key = submission_key(content_hash, submission.student_id, idempotency_key)
+    
+    try:
+        job_id = scoring_queue.job_for_key(key, content_hash)
+        if job_id is None:
+            result_dict = await submission_cache.find(key, content_hash)
+            if result_dict is not None:
+                response.status_code = 200
+                response.headers["Idempotent-Replayed"] = "true"
+                return {
+                    "message": "Quiz submitted successfully",
+                    "student_id": submission.student_id,
+                    "analysis": result_dict
+                }
+            # Checked again: a duplicate may have been queued during the lookup
+            job_id = scoring_queue.job_for_key(key, content_hash)
+        if job_id is None:
+            job_id = await scoring_queue.enqueue(submission, content_hash, key)
+        else:
+            response.headers["Idempotent-Replayed"] = "true"
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing submission: {str(e)}")
+    
+    return {
+        "message": "Quiz accepted for scoring",
+        "student_id": submission.student_id,
+        "job_id": job_id,
+        "status_url": f"/api/scoring-jobs/{job_id}"
+    }
+
+
+@app.get("/api/scoring-jobs/{job_id}")
+async def get_scoring_job(job_id: str):
+    """Get the status of a background scoring job and its analysis when done."""
+    job = scoring_queue.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Scoring job not found")
+    
+    return job
+
+
 @app.get("/api/student-results/{student_id}")
 async def get_student_results(student_id: str):
     """Get learning gap analysis for a specific student."""
     try:
-        with open(SCORES_FILE, 'r') as f:
-            scores = json.load(f)
-        
-        student_scores = [score for score in scores if score['student_id'] == student_id]
+        student_scores = await executors.run_io(repository.get_scores_for_student, student_id)
         
         if not student_scores:
             raise HTTPException(status_code=404, detail="No results found for student")
@@ -300,114 +529,54 @@ async def get_student_results(student_id: str):
 
 
 @app.get("/api/teacher-dashboard")
-async def get_teacher_dashboard():
-    """Get dashboard data for teachers."""
-    try:
-        with open(SCORES_FILE, 'r') as f:
-            scores = json.load(f)
-        
-        if not scores:
-            return {
-                "summary": {
-                    "total_students": 0,
-                    "at_risk_students": 0,
-                    "safe_students": 0,
-                    "watch_students": 0
-                },
-                "students": [],
-                "concept_analysis": {}
-            }
-        
-        # Calculate summary statistics
-        total_students = len(set(score['student_id'] for score in scores))
-        risk_counts = {"at_risk": 0, "watch": 0, "safe": 0}
-        
-        # Get latest score for each student
-        latest_scores = {}
-        for score in scores:
-            student_id = score['student_id']
-            if student_id not in latest_scores or score['timestamp'] > latest_scores[student_id]['timestamp']:
-                latest_scores[student_id] = score
-        
-        # Count risk levels
-        for score in latest_scores.values():
-            risk_level = score.get('overall_risk', 'safe')
-            if risk_level in risk_counts:
-                risk_counts[risk_level] += 1
-        
-        # Analyze concepts
-        concept_analysis = {}
-        for score in latest_scores.values():
-            for concept_gap in score.get('concept_gaps', []):
-                concept_name = concept_gap['concept']
-                if concept_name not in concept_analysis:
-                    concept_analysis[concept_name] = {
-                        'total_students': 0,
-                        'avg_gap_score': 0,
-                        'at_risk_count': 0
-                    }
-                
-                concept_analysis[concept_name]['total_students'] += 1
-                concept_analysis[concept_name]['avg_gap_score'] += concept_gap['gap_score']
-                if concept_gap['risk_level'] == 'at_risk':
-                    concept_analysis[concept_name]['at_risk_count'] += 1
-        
-        # Calculate averages
-        for concept_data in concept_analysis.values():
-            if concept_data['total_students'] > 0:
-                concept_data['avg_gap_score'] /= concept_data['total_students']
-        
-        # Prepare student list with risk indicators
-        students = []
-        for student_id, score in latest_scores.items():
-            students.append({
-                'student_id': student_id,
-                'overall_risk': score.get('overall_risk', 'safe'),
-                'overall_score': score.get('overall_score', 0),
-                'timestamp': score.get('timestamp'),
-                'top_concerns': score.get('recommendations', [])[:2]
-            })
-        
-        # Sort students by risk level (at_risk first)
-        risk_priority = {'at_risk': 0, 'watch': 1, 'safe': 2}
-        students.sort(key=lambda x: (risk_priority.get(x['overall_risk'], 2), -x['overall_score']))
-        
-        return {
-            "summary": {
-                "total_students": total_students,
-                "at_risk_students": risk_counts['at_risk'],
-                "watch_students": risk_counts['watch'],
-                "safe_students": risk_counts['safe']
-            },
-            "students": students,
-            "concept_analysis": concept_analysis
-        }
-        
-    except FileNotFoundError:
-        return {
-            "summary": {
-                "total_students": 0,
-                "at_risk_students": 0,
-                "watch_students": 0,
-                "safe_students": 0
-            },
-            "students": [],
-            "concept_analysis": {}
-        }
+async def get_teacher_dashboard(request: Request, since: Optional[str] = None):
+    """Get dashboard data for teachers.
+
+    The ETag is the data version. A matching If-None-Match (or ``since``
+    equal to the current version) gets 304; an older ``since`` gets only the
+    students that changed after it.
+    """
+    version = dashboard_state.cursor
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if since == version or etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    if since:
+        delta = dashboard_state.changes_since(since)
+        if delta is not None:
+            return FastJSONResponse(dict(delta, version=version), headers=headers)
+    
+    return FastJSONResponse(dict(dashboard_state.snapshot(), version=version), headers=headers)
+
+
+@app.get("/api/events/dashboard")
+async def dashboard_events(classroom_id: Optional[List[str]] = Query(None)):
+    """Stream live dashboard updates as server-sent events.
+
+    Sends a ``hello`` event with the current data version, then a ``score``
+    event for every new score (only for students in ``classroom_id`` if
+    given) and a ``reset`` event when data is wiped.
+    """
+    subscriber = event_hub.subscribe(classroom_id or [ALL])
+    hello = EventHub.encode("hello", {"version": dashboard_state.cursor})
+    return StreamingResponse(
+        event_hub.stream(subscriber, first=hello),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/api/student-detail/{student_id}")
-async def get_student_detail(student_id: str):
+async def get_student_detail(student_id: str, request: Request):
     """Get detailed analysis for a specific student."""
+    # Unchanged since the client's copy: skip storage entirely
+    etag = f'"{dashboard_state.student_cursor(student_id)}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
     try:
-        with open(SCORES_FILE, 'r') as f:
-            scores = json.load(f)
-        
-        with open(RESPONSES_FILE, 'r') as f:
-            responses = json.load(f)
-        
-        student_scores = [score for score in scores if score['student_id'] == student_id]
-        student_responses = [resp for resp in responses if resp['student_id'] == student_id]
+        student_scores = await executors.run_io(repository.get_scores_for_student, student_id)
+        student_responses = await executors.run_io(repository.get_responses_for_student, student_id)
         
         if not student_scores:
             raise HTTPException(status_code=404, detail="Student not found")
@@ -415,12 +584,12 @@ async def get_student_detail(student_id: str):
         # Get latest analysis
         latest_score = max(student_scores, key=lambda x: x['timestamp'])
         
-        return {
+        return FastJSONResponse({
             "student_id": student_id,
             "latest_analysis": latest_score,
             "history": student_scores,
             "raw_responses": student_responses
-        }
+        }, headers={"ETag": etag, "Cache-Control": "no-cache"})
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="No data available")
@@ -430,9 +599,10 @@ async def get_student_detail(student_id: str):
 async def reset_data():
     """Reset all data (for demo purposes)."""
     try:
-        for file_path in [RESPONSES_FILE, SCORES_FILE]:
-            with open(file_path, 'w') as f:
-                json.dump([], f)
+        await executors.run_io(repository.clear_results)
+        dashboard_state.reset()
+        submission_cache.clear()
+        event_hub.publish("reset", {"version": dashboard_state.cursor})
         
         return {"message": "All data reset successfully"}
         
@@ -440,22 +610,34 @@ async def reset_data():
         raise HTTPException(status_code=500, detail=f"Error resetting data: {str(e)}")
 
 
+@app.get("/api/system/event-loop")
+async def get_event_loop_stats():
+    """Event loop lag and executor settings, to check the loop stays responsive."""
+    return {
+        "lag": loop_monitor.stats(),
+        "executors": executors.stats(),
+        "scoring_queue_pending": scoring_queue.pending()
+    }
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Request latency, storage traffic and scoring metrics in the Prometheus text format."""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # ============ CLASSROOM MANAGEMENT ENDPOINTS ============
 
 @app.post("/api/classrooms")
 async def create_classroom(classroom: ClassroomCreate, teacher_id: str = Query(...), teacher_name: str = Query(...)):
     """Create a new classroom (teacher only)."""
     try:
-        # Load existing classrooms
-        with open(CLASSROOMS_FILE, 'r') as f:
-            classrooms = json.load(f)
-        
         # Generate unique classroom ID and join code
         classroom_id = str(datetime.now().timestamp()).replace('.', '')
         join_code = Classroom.generate_join_code()
         
         # Ensure join code is unique
-        while any(c['join_code'] == join_code for c in classrooms.values()):
+        while classroom_directory.join_code_exists(join_code):
             join_code = Classroom.generate_join_code()
         
         # Create new classroom object
@@ -472,10 +654,9 @@ async def create_classroom(classroom: ClassroomCreate, teacher_id: str = Query(.
             "quiz_ids": []
         }
         
-        # Save classroom
-        classrooms[classroom_id] = new_classroom
-        with open(CLASSROOMS_FILE, 'w') as f:
-            json.dump(classrooms, f, indent=2)
+        # Save classroom (the join code may have been taken meanwhile)
+        while not await executors.run_io(classroom_directory.create, new_classroom):
+            join_code = new_classroom["join_code"] = Classroom.generate_join_code()
         
         return {
             "message": "Classroom created successfully",
@@ -492,14 +673,11 @@ async def create_classroom(classroom: ClassroomCreate, teacher_id: str = Query(.
 async def get_classroom(classroom_id: str):
     """Get classroom details."""
     try:
-        with open(CLASSROOMS_FILE, 'r') as f:
-            classrooms = json.load(f)
+        classroom = classroom_directory.get(classroom_id)
         
-        if classroom_id not in classrooms:
+        if not classroom:
             raise HTTPException(status_code=404, detail="Classroom not found")
         
-        classroom = classrooms[classroom_id]
-        
         return {
             "classroom_id": classroom["classroom_id"],
             "teacher_id": classroom["teacher_id"],
@@ -522,10 +700,7 @@ async def get_classroom(classroom_id: str):
 async def get_teacher_classrooms(teacher_id: str):
     """Get all classrooms for a teacher."""
     try:
-        with open(CLASSROOMS_FILE, 'r') as f:
-            classrooms = json.load(f)
-        
-        teacher_classrooms = [c for c in classrooms.values() if c["teacher_id"] == teacher_id]
+        teacher_classrooms = classroom_directory.for_teacher(teacher_id)
         
         return {
             "classrooms": [
@@ -551,26 +726,21 @@ async def get_teacher_classrooms(teacher_id: str):
 async def get_student_classrooms(student_id: str):
     """Get all classrooms that a student is enrolled in."""
     try:
-        with open(CLASSROOMS_FILE, 'r') as f:
-            classrooms = json.load(f)
-        
         student_classrooms = []
-        for classroom in classrooms.values():
-            for member in classroom["members"]:
-                if member["student_id"] == student_id:
-                    student_classrooms.append({
-                        "classroom_id": classroom["classroom_id"],
-                        "teacher_id": classroom["teacher_id"],
-                        "teacher_name": classroom["teacher_name"],
-                        "name": classroom["name"],
-                        "description": classroom["description"],
-                        "subject": classroom["subject"],
-                        "created_at": classroom["created_at"],
-                        "member_count": len(classroom["members"]),
-                        "quiz_count": len(classroom["quiz_ids"]),
-                        "joined_at": member["joined_at"]
-                    })
-                    break
+        for classroom in classroom_directory.for_student(student_id):
+            member = classroom_directory.get_member(classroom["classroom_id"], student_id)
+            student_classrooms.append({
+                "classroom_id": classroom["classroom_id"],
+                "teacher_id": classroom["teacher_id"],
+                "teacher_name": classroom["teacher_name"],
+                "name": classroom["name"],
+                "description": classroom["description"],
+                "subject": classroom["subject"],
+                "created_at": classroom["created_at"],
+                "member_count": len(classroom["members"]),
+                "quiz_count": len(classroom["quiz_ids"]),
+                "joined_at": member["joined_at"]
+            })
         
         return {"classrooms": student_classrooms}
         
@@ -582,23 +752,15 @@ async def get_student_classrooms(student_id: str):
 async def join_classroom(request: JoinClassroomRequest):
     """Join a classroom using a join code."""
     try:
-        with open(CLASSROOMS_FILE, 'r') as f:
-            classrooms = json.load(f)
-        
         # Find classroom by join code
-        target_classroom = None
-        for classroom in classrooms.values():
-            if classroom["join_code"] == request.join_code:
-                target_classroom = classroom
-                break
+        target_classroom = classroom_directory.find_by_join_code(request.join_code)
         
         if not target_classroom:
             raise HTTPException(status_code=404, detail="Invalid join code")
         
         # Check if student is already a member
-        for member in target_classroom["members"]:
-            if member["student_id"] == request.student_id:
-                raise HTTPException(status_code=400, detail="Student already enrolled in this classroom")
+        if classroom_directory.is_member(target_classroom["classroom_id"], request.student_id):
+            raise HTTPException(status_code=400, detail="Student already enrolled in this classroom")
         
         # Add student to classroom
         new_member = {
@@ -606,11 +768,9 @@ async def join_classroom(request: JoinClassroomRequest):
             "student_name": request.student_name,
             "joined_at": datetime.now().isoformat()
         }
-        target_classroom["members"].append(new_member)
-        
-        # Save updated classroom
-        with open(CLASSROOMS_FILE, 'w') as f:
-            json.dump(classrooms, f, indent=2)
+        # Re-checked under the directory lock, for concurrent joins
+        if not await executors.run_io(classroom_directory.add_member, target_classroom["classroom_id"], new_member):
+            raise HTTPException(status_code=400, detail="Student already enrolled in this classroom")
         
         return {
             "message": "Successfully joined classroom",
@@ -629,14 +789,11 @@ async def join_classroom(request: JoinClassroomRequest):
 async def get_classroom_members(classroom_id: str):
     """Get all members of a classroom."""
     try:
-        with open(CLASSROOMS_FILE, 'r') as f:
-            classrooms = json.load(f)
+        classroom = classroom_directory.get(classroom_id)
         
-        if classroom_id not in classrooms:
+        if not classroom:
             raise HTTPException(status_code=404, detail="Classroom not found")
         
-        classroom = classrooms[classroom_id]
-        
         return {
             "classroom_id": classroom_id,
             "classroom_name": classroom["name"],
@@ -653,25 +810,13 @@ async def get_classroom_members(classroom_id: str):
 async def remove_student_from_classroom(classroom_id: str, student_id: str):
     """Remove a student from a classroom."""
     try:
-        with open(CLASSROOMS_FILE, 'r') as f:
-            classrooms = json.load(f)
-        
-        if classroom_id not in classrooms:
+        if not classroom_directory.get(classroom_id):
             raise HTTPException(status_code=404, detail="Classroom not found")
         
-        classroom = classrooms[classroom_id]
-        
         # Find and remove student
-        original_count = len(classroom["members"])
-        classroom["members"] = [m for m in classroom["members"] if m["student_id"] != student_id]
-        
-        if len(classroom["members"]) == original_count:
+        if not await executors.run_io(classroom_directory.remove_member, classroom_id, student_id):
             raise HTTPException(status_code=404, detail="Student not found in classroom")
         
-        # Save updated classroom
-        with open(CLASSROOMS_FILE, 'w') as f:
-            json.dump(classrooms, f, indent=2)
-        
         return {"message": "Student removed from classroom"}
         
     except HTTPException:
@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class Repository(ABC):
+    """Storage interface shared by the API and the auth manager.
+
+    Records are plain dicts in the same shape the JSON files have always used,
+    so endpoints can return them as-is regardless of the backend.
+    """
+
+    # ---------- quiz responses & scores ----------
+
+    @abstractmethod
+    def append_responses(self, records: List[Dict[str, Any]]) -> None:
+        """Persist one or more quiz submissions."""
+
+    @abstractmethod
+    def append_scores(self, records: List[Dict[str, Any]]) -> None:
+        """Persist one or more learning gap results."""
+
+    def append_batch(self, responses: List[Dict[str, Any]], scores: List[Dict[str, Any]]) -> None:
+        """Durably persist a batch of submissions and results in one go."""
+        if responses:
+            self.append_responses(responses)
+        if scores:
+            self.append_scores(scores)
+
+    def append_response(self, record: Dict[str, Any]) -> None:
+        """Persist a single quiz submission."""
+        self.append_responses([record])
+
+    def append_score(self, record: Dict[str, Any]) -> None:
+        """Persist a single learning gap result."""
+        self.append_scores([record])
+
+    @abstractmethod
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        """Stream every stored submission in insertion order."""
+
+    @abstractmethod
+    def iter_scores(self) -> Iterator[Dict[str, Any]]:
+        """Stream every stored result in insertion order."""
+
+    @abstractmethod
+    def replace_scores(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Atomically swap every stored result for ``records``, returning how many were written.
+
+        Readers see either the old results or the complete new set.
+        """
+
+    @abstractmethod
+    def get_responses_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        """Get all submissions made by a student."""
+
+    @abstractmethod
+    def get_scores_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        """Get all results recorded for a student."""
+
+    @abstractmethod
+    def get_score_by_submission_key(self, submission_key: str) -> Optional[Dict[str, Any]]:
+        """Get the latest result stored with a ``submission_key``, if any."""
+
+    @abstractmethod
+    def clear_results(self) -> None:
+        """Delete all submissions and results."""
+
+    # ---------- questions ----------
+
+    @abstractmethod
+    def load_questions(self) -> List[Dict[str, Any]]:
+        """Load the question bank."""
+
+    @abstractmethod
+    def save_questions(self, questions: List[Dict[str, Any]]) -> None:
+        """Replace the question bank."""
+
+    # ---------- classrooms ----------
+
+    @abstractmethod
+    def list_classrooms(self) -> Dict[str, Dict[str, Any]]:
+        """Load every classroom keyed by classroom_id."""
+
+    @abstractmethod
+    def get_classroom(self, classroom_id: str) -> Optional[Dict[str, Any]]:
+        """Get a classroom by ID."""
+
+    @abstractmethod
+    def save_classroom(self, classroom: Dict[str, Any]) -> None:
+        """Insert or update a classroom, including its member list."""
+
+    def save_classrooms(self, classrooms: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update many classrooms, returning how many were saved."""
+        count = 0
+        for classroom in classrooms:
+            self.save_classroom(classroom)
+            count += 1
+        return count
+
+    @abstractmethod
+    def find_classroom_by_join_code(self, join_code: str) -> Optional[Dict[str, Any]]:
+        """Get the classroom that owns a join code."""
+
+    @abstractmethod
+    def get_classrooms_for_teacher(self, teacher_id: str) -> List[Dict[str, Any]]:
+        """Get all classrooms created by a teacher."""
+
+    @abstractmethod
+    def get_classrooms_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        """Get all classrooms a student is a member of."""
+
+    def join_code_exists(self, join_code: str) -> bool:
+        """Check if a join code is already taken."""
+        return self.find_classroom_by_join_code(join_code) is not None
+
+    # ---------- users ----------
+
+    @abstractmethod
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        """Stream every registered user."""
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get a user by email (case-insensitive)."""
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user by ID."""
+
+    @abstractmethod
+    def add_user(self, user: Dict[str, Any]) -> None:
+        """Register a new user."""
+
+    def add_users(self, users: Iterable[Dict[str, Any]]) -> int:
+        """Register many new users, returning how many were added."""
+        count = 0
+        for user in users:
+            self.add_user(user)
+            count += 1
+        return count
+
+    @abstractmethod
+    def update_user(self, user: Dict[str, Any]) -> None:
+        """Overwrite an existing user record."""
+
+    def update_users(self, users: List[Dict[str, Any]]) -> None:
+        """Overwrite several existing user records."""
+        for user in users:
+            self.update_user(user)
+
+    # ---------- sessions ----------
+
+    @abstractmethod
+    def load_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """Load all sessions keyed by token."""
+
+    @abstractmethod
+    def get_session(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get the session for a token."""
+
+    @abstractmethod
+    def save_session(self, token: str, session: Dict[str, Any]) -> None:
+        """Insert or update a session."""
+
+    @abstractmethod
+    def delete_session(self, token: str) -> bool:
+        """Delete a session, returning whether it existed."""
+
+    @abstractmethod
+    def replace_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """Replace every stored session with the given set."""
+
+    # ---------- revoked signed tokens ----------
+
+    @abstractmethod
+    def load_revoked_tokens(self) -> Dict[str, float]:
+        """Load revoked token IDs mapped to their expiry (epoch seconds)."""
+
+    @abstractmethod
+    def add_revoked_token(self, jti: str, expires_at: float) -> None:
+        """Record a revoked token ID."""
+
+    @abstractmethod
+    def prune_revoked_tokens(self, now: float) -> int:
+        """Delete revocations that expired by ``now``, returning how many were removed.
+
+        Other processes may add revocations at the same time; none of
+        theirs may be lost.
+        """
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
@@ -0,0 +1,14 @@
+from storage.base import Repository
+
+
+def create_repository(backend: str, data_dir: str, sqlite_path: str) -> Repository:
+    """Build the storage backend selected by configuration."""
+    if backend == "json":
+        from storage.json_store import JsonRepository
+        return JsonRepository(data_dir)
+
+    if backend == "sqlite":
+        from storage.sqlite_store import SqliteRepository
+        return SqliteRepository(sqlite_path)
+
+    raise ValueError(f"Unknown storage backend: {backend!r} (expected 'json' or 'sqlite')")
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage.base import Repository
+from utils.executors import BlockingExecutors
+from utils.metrics import Histogram, RequestUsage, current_usage, run_with_usage
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitWriter:
+    """Single writer task that batches concurrent response/score writes.
+
+    Callers await ``append_response``/``append_score``; the writer gathers
+    whatever arrives within a short window (or until ``max_batch`` records are
+    pending), persists the whole batch with one durable write, and only then
+    resolves every waiting caller. All writes go through this one task, so
+    concurrent submissions never interleave partial writes. Batches are
+    written in the shared I/O pool, so stop the writer before shutting the
+    pools down. The bytes a batch writes are shared evenly among the
+    requests whose records it held.
+    """
+
+    def __init__(self, repository: Repository, executors: BlockingExecutors, window_ms: float = 10.0,
+                 max_batch: int = 256, write_seconds: Optional[Histogram] = None):
+        self.repository = repository
+        self.executors = executors
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        # Optional histogram of how long each durable batch write takes
+        self.write_seconds = write_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the writer task."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything still pending and stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def append_response(self, record: Dict[str, Any]) -> None:
+        """Persist a quiz submission, returning once it is on disk."""
+        await self._submit("response", record)
+
+    async def append_score(self, record: Dict[str, Any]) -> None:
+        """Persist a learning gap result, returning once it is on disk."""
+        await self._submit("score", record)
+
+    async def _submit(self, kind: str, record: Dict[str, Any]) -> None:
+        if self._task is None:
+            raise RuntimeError("Group commit writer has not been started")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((kind, record, future, current_usage()))
+        await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Keep collecting until the window closes or the batch is full
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future, Optional[RequestUsage]]]) -> None:
+        responses = [record for kind, record, _, _ in batch if kind == "response"]
+        scores = [record for kind, record, _, _ in batch if kind == "score"]
+        usage = RequestUsage()
+        started = time.perf_counter()
+
+        try:
+            # The disk write and fsync happen in the I/O pool
+            await self.executors.run_io(run_with_usage, usage, self.repository.append_batch, responses, scores)
+        except Exception as e:
+            logger.exception("Error writing batch of %d records", len(batch))
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if self.write_seconds is not None:
+            self.write_seconds.observe(time.perf_counter() - started)
+        share = usage.bytes_written // len(batch)
+        for _, _, future, caller in batch:
+            if caller is not None:
+                caller.bytes_written += share
+                caller.storage_calls += 1
+            if not future.done():
+                future.set_result(None)
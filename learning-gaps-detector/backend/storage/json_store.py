@@ -0,0 +1,313 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set
+
+from storage.base import Repository
+from storage.maintenance_lock import MaintenanceLock
+from utils.jsonl import append_records, iter_records, truncate_log, migrate_json_array
+from utils.metrics import count_storage_read, count_storage_written
+from utils.serialization import dumps_bytes, loads
+
+logger = logging.getLogger(__name__)
+
+
+class JsonRepository(Repository):
+    """File-based storage under a data directory (the original dev setup).
+
+    Responses and scores live in append-only JSONL logs; users, sessions,
+    classrooms and questions are small JSON documents rewritten on change.
+    Lookups are linear scans, which is fine for local development.
+    """
+
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = data_dir
+        self.responses_file = os.path.join(data_dir, "responses.json")
+        self.scores_file = os.path.join(data_dir, "scores.json")
+        self.responses_log = os.path.join(data_dir, "responses.jsonl")
+        self.scores_log = os.path.join(data_dir, "scores.jsonl")
+        self.questions_file = os.path.join(data_dir, "questions.json")
+        self.classrooms_file = os.path.join(data_dir, "classrooms.json")
+        self.users_file = os.path.join(data_dir, "users.json")
+        self.sessions_file = os.path.join(data_dir, "sessions.json")
+        self.revoked_tokens_file = os.path.join(data_dir, "revoked_tokens.json")
+        self._lock = threading.RLock()
+        # Revocations are shared by every server process using this directory
+        self._revocations_lock = MaintenanceLock(data_dir, "revoked_tokens.lock")
+        # submission_key values present in the scores log, built on first lookup
+        self._submission_keys: Optional[Set[str]] = None
+
+        # Ensure data directory exists
+        os.makedirs(data_dir, exist_ok=True)
+
+        # Initialize files if they don't exist
+        for file_path, empty in [
+            (self.questions_file, []),
+            (self.classrooms_file, {}),
+            (self.users_file, []),
+            (self.sessions_file, {}),
+            (self.revoked_tokens_file, {}),
+        ]:
+            if not os.path.exists(file_path):
+                self._write_json(file_path, empty)
+
+        # Carry over existing history from the legacy array files on first start
+        migrate_json_array(self.responses_file, self.responses_log)
+        migrate_json_array(self.scores_file, self.scores_log)
+
+    def _read_json(self, file_path: str, default: Any) -> Any:
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            count_storage_read(len(data))
+            return loads(data)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            logger.exception("Error loading %s", file_path)
+            return default
+
+    def _write_json(self, file_path: str, data: Any) -> None:
+        # Compact (no indentation): these files are rewritten on every change
+        data = dumps_bytes(data)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        count_storage_written(len(data))
+
+    @contextmanager
+    def _atomic_writer(self, file_path: str) -> Iterator[BinaryIO]:
+        # Write beside the file, then rename over it once complete
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+            count_storage_written(f.tell())
+        os.replace(tmp_path, file_path)
+
+    # ---------- quiz responses & scores ----------
+
+    def append_responses(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            append_records(self.responses_log, records, fsync=True)
+
+    def append_scores(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            append_records(self.scores_log, records, fsync=True)
+            if self._submission_keys is not None:
+                self._submission_keys.update(r['submission_key'] for r in records if r.get('submission_key'))
+
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        return iter_records(self.responses_log)
+
+    def iter_scores(self) -> Iterator[Dict[str, Any]]:
+        return iter_records(self.scores_log)
+
+    def replace_scores(self, records: Iterable[Dict[str, Any]]) -> int:
+        # Write the new log beside the old one, then rename over it
+        tmp_path = self.scores_log + ".tmp"
+        count = 0
+        with open(tmp_path, 'wb') as f:
+            for record in records:
+                f.write(dumps_bytes(record) + b"\n")
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+            count_storage_written(f.tell())
+        with self._lock:
+            os.replace(tmp_path, self.scores_log)
+            self._submission_keys = None
+        return count
+
+    def get_responses_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        return [resp for resp in self.iter_responses() if resp['student_id'] == student_id]
+
+    def get_scores_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        return [score for score in self.iter_scores() if score['student_id'] == student_id]
+
+    def get_score_by_submission_key(self, submission_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._submission_keys is None:
+                self._submission_keys = {
+                    score['submission_key'] for score in self.iter_scores() if score.get('submission_key')
+                }
+            if submission_key not in self._submission_keys:
+                return None
+        # Only known keys pay for the scan
+        match = None
+        for score in self.iter_scores():
+            if score.get('submission_key') == submission_key:
+                match = score
+        return match
+
+    def clear_results(self) -> None:
+        with self._lock:
+            for log_path in [self.responses_log, self.scores_log]:
+                truncate_log(log_path)
+            self._submission_keys = None
+
+    # ---------- questions ----------
+
+    def load_questions(self) -> List[Dict[str, Any]]:
+        return self._read_json(self.questions_file, [])
+
+    def save_questions(self, questions: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._write_json(self.questions_file, questions)
+
+    # ---------- classrooms ----------
+
+    def list_classrooms(self) -> Dict[str, Dict[str, Any]]:
+        return self._read_json(self.classrooms_file, {})
+
+    def get_classroom(self, classroom_id: str) -> Optional[Dict[str, Any]]:
+        return self.list_classrooms().get(classroom_id)
+
+    def save_classroom(self, classroom: Dict[str, Any]) -> None:
+        with self._lock:
+            classrooms = self.list_classrooms()
+            classrooms[classroom['classroom_id']] = classroom
+            self._write_json(self.classrooms_file, classrooms)
+
+    def save_classrooms(self, classrooms: Iterable[Dict[str, Any]]) -> int:
+        # One streamed rewrite of classrooms.json: the new classrooms first,
+        # then the stored ones they do not replace
+        with self._lock:
+            stored = self.list_classrooms()
+            count = 0
+            with self._atomic_writer(self.classrooms_file) as f:
+                f.write(b"{")
+                for classroom in classrooms:
+                    classroom_id = classroom['classroom_id']
+                    stored.pop(classroom_id, None)
+                    f.write((b"," if count else b"") + dumps_bytes(classroom_id) + b":" + dumps_bytes(classroom))
+                    count += 1
+                for index, (classroom_id, classroom) in enumerate(stored.items()):
+                    f.write((b"," if count or index else b"") + dumps_bytes(classroom_id) + b":" + dumps_bytes(classroom))
+                f.write(b"}")
+        return count
+
+    def find_classroom_by_join_code(self, join_code: str) -> Optional[Dict[str, Any]]:
+        for classroom in self.list_classrooms().values():
+            if classroom['join_code'] == join_code:
+                return classroom
+        return None
+
+    def get_classrooms_for_teacher(self, teacher_id: str) -> List[Dict[str, Any]]:
+        return [c for c in self.list_classrooms().values() if c['teacher_id'] == teacher_id]
+
+    def get_classrooms_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        return [
+            c for c in self.list_classrooms().values()
+            if any(member['student_id'] == student_id for member in c['members'])
+        ]
+
+    # ---------- users ----------
+
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._read_json(self.users_file, []))
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        email = email.lower()
+        for user in self.iter_users():
+            if user['email'].lower() == email:
+                return user
+        return None
+
+    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        for user in self.iter_users():
+            if user['id'] == user_id:
+                return user
+        return None
+
+    def add_user(self, user: Dict[str, Any]) -> None:
+        with self._lock:
+            users = self._read_json(self.users_file, [])
+            users.append(user)
+            self._write_json(self.users_file, users)
+
+    def add_users(self, users: Iterable[Dict[str, Any]]) -> int:
+        # Streamed into a new users.json after the stored users instead of
+        # rewriting the file once per user
+        with self._lock:
+            stored = self._read_json(self.users_file, [])
+            count = 0
+            with self._atomic_writer(self.users_file) as f:
+                f.write(b"[")
+                for index, user in enumerate(chain(stored, users)):
+                    f.write((b"," if index else b"") + dumps_bytes(user))
+                    count += 1
+                f.write(b"]")
+        return count - len(stored)
+
+    def update_user(self, user: Dict[str, Any]) -> None:
+        self.update_users([user])
+
+    def update_users(self, users: List[Dict[str, Any]]) -> None:
+        # One rewrite of users.json for the whole batch
+        updated = {user['id']: user for user in users}
+        with self._lock:
+            stored = self._read_json(self.users_file, [])
+            stored = [updated.get(u['id'], u) for u in stored]
+            self._write_json(self.users_file, stored)
+
+    # ---------- sessions ----------
+
+    def load_sessions(self) -> Dict[str, Dict[str, Any]]:
+        return self._read_json(self.sessions_file, {})
+
+    def get_session(self, token: str) -> Optional[Dict[str, Any]]:
+        return self.load_sessions().get(token)
+
+    def save_session(self, token: str, session: Dict[str, Any]) -> None:
+        with self._lock:
+            sessions = self.load_sessions()
+            sessions[token] = session
+            self._write_json(self.sessions_file, sessions)
+
+    def delete_session(self, token: str) -> bool:
+        with self._lock:
+            sessions = self.load_sessions()
+            if token not in sessions:
+                return False
+            del sessions[token]
+            self._write_json(self.sessions_file, sessions)
+            return True
+
+    def replace_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._write_json(self.sessions_file, sessions)
+
+    # ---------- revoked signed tokens ----------
+
+    def load_revoked_tokens(self) -> Dict[str, float]:
+        return self._read_json(self.revoked_tokens_file, {})
+
+    def add_revoked_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revocations_lock.acquire(exclusive=True, wait=True)
+            try:
+                revoked = self.load_revoked_tokens()
+                revoked[jti] = expires_at
+                self._write_revoked(revoked)
+            finally:
+                self._revocations_lock.release()
+
+    def _write_revoked(self, revoked: Dict[str, float]) -> None:
+        # Replaced in one step, other processes read it without the lock
+        with self._atomic_writer(self.revoked_tokens_file) as f:
+            f.write(dumps_bytes(revoked))
+
+    def prune_revoked_tokens(self, now: float) -> int:
+        with self._lock:
+            self._revocations_lock.acquire(exclusive=True, wait=True)
+            try:
+                revoked = self.load_revoked_tokens()
+                live = {jti: expires_at for jti, expires_at in revoked.items() if expires_at > now}
+                if len(live) != len(revoked):
+                    self._write_revoked(live)
+                return len(revoked) - len(live)
+            finally:
+                self._revocations_lock.release()
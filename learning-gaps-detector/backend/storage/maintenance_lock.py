@@ -0,0 +1,52 @@
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+LOCK_FILE = "maintenance.lock"
+
+
+class MaintenanceLockError(Exception):
+    """Raised when the server and a maintenance tool would use the same data at once."""
+
+
+class MaintenanceLock:
+    """Advisory lock that keeps the server and offline maintenance tools apart.
+
+    The server holds it shared while it runs; a tool that rewrites stored
+    data wholesale, like tools/rescore.py, holds it exclusively. Whichever side comes second fails right away with
+    MaintenanceLockError instead of waiting. Uses flock on
+    DATA_DIR/maintenance.lock; where flock is unavailable (Windows) nothing
+    is enforced.
+
+    With another ``name`` and ``wait=True`` the same lock serializes short
+    read-modify-write cycles on a shared file between server processes
+    (see JsonRepository's revocation list).
+    """
+
+    def __init__(self, data_dir: str, name: str = LOCK_FILE):
+        self.path = os.path.join(data_dir, name)
+        self._fd: Optional[int] = None
+
+    def acquire(self, exclusive: bool = False, wait: bool = False) -> None:
+        """Take the lock (shared, or exclusive for a tool), failing right away unless ``wait``."""
+        if self._fd is not None or fcntl is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            os.close(fd)
+            if exclusive:
+                raise MaintenanceLockError(f"{self.path} is held: stop the server first")
+            raise MaintenanceLockError(f"{self.path} is held by a maintenance tool (rescore); wait for it to finish")
+        self._fd = fd
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
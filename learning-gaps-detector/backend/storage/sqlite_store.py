@@ -0,0 +1,374 @@
+import os
+import sqlite3
+import threading
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from storage.base import Repository
+from utils.metrics import count_storage_read, count_storage_written
+from utils.serialization import dumps, loads
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    quiz_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_student ON responses(student_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_responses_quiz ON responses(quiz_id);
+CREATE INDEX IF NOT EXISTS idx_responses_timestamp ON responses(timestamp);
+
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    quiz_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL,
+    submission_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scores_student ON scores(student_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_scores_quiz ON scores(quiz_id);
+CREATE INDEX IF NOT EXISTS idx_scores_timestamp ON scores(timestamp);
+
+CREATE TABLE IF NOT EXISTS questions (
+    position INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS classrooms (
+    classroom_id TEXT PRIMARY KEY,
+    teacher_id TEXT NOT NULL,
+    join_code TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_classrooms_teacher ON classrooms(teacher_id);
+
+CREATE TABLE IF NOT EXISTS classroom_members (
+    classroom_id TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    PRIMARY KEY (classroom_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS idx_classroom_members_student ON classroom_members(student_id);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id);
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Rows fetched per round-trip when streaming a whole table
+STREAM_PAGE_SIZE = 1000
+
+
+def _dumps(record: Any) -> str:
+    data = dumps(record)
+    count_storage_written(len(data))
+    return data
+
+
+def _loads_rows(rows: List[tuple], column: int = 0) -> List[Any]:
+    """Decode the JSON data column of fetched rows."""
+    count_storage_read(sum(len(row[column]) for row in rows))
+    return [loads(row[column]) for row in rows]
+
+
+class SqliteRepository(Repository):
+    """SQLite storage with indexes on the columns the API filters by.
+
+    Each record is kept whole in a JSON ``data`` column next to the indexed
+    lookup columns, so the API sees exactly the same dicts as with the JSON
+    backend. A single connection is shared behind a lock; WAL mode keeps
+    readers from blocking the writer, and synchronous=FULL makes every commit
+    durable (batch writes to amortize the fsync).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+        self._add_submission_key_column()
+        self._conn.commit()
+
+    def _add_submission_key_column(self) -> None:
+        # Databases created before duplicate detection lack the column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(scores)")}
+        if 'submission_key' not in columns:
+            self._conn.execute("ALTER TABLE scores ADD COLUMN submission_key TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_scores_submission_key ON scores(submission_key)"
+        )
+
+    def _fetch_one(self, query: str, params: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return _loads_rows([row])[0] if row else None
+
+    def _fetch_all(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return _loads_rows(rows)
+
+    def _stream_table(self, table: str) -> Iterator[Dict[str, Any]]:
+        """Stream a log table page by page so the lock is never held across a yield."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, data FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, STREAM_PAGE_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            yield from _loads_rows(rows, column=1)
+            last_id = rows[-1][0]
+
+    def _insert_log(self, table: str, records: List[Dict[str, Any]]) -> None:
+        rows = [
+            (r['student_id'], r['quiz_id'], str(r['timestamp']), _dumps(r))
+            for r in records
+        ]
+        self._conn.executemany(
+            f"INSERT INTO {table} (student_id, quiz_id, timestamp, data) VALUES (?, ?, ?, ?)",
+            rows
+        )
+
+    def _insert_scores(self, records: List[Dict[str, Any]]) -> None:
+        rows = [
+            (r['student_id'], r['quiz_id'], str(r['timestamp']), _dumps(r), r.get('submission_key'))
+            for r in records
+        ]
+        self._conn.executemany(
+            "INSERT INTO scores (student_id, quiz_id, timestamp, data, submission_key) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    # ---------- quiz responses & scores ----------
+
+    def append_responses(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._insert_log("responses", records)
+
+    def append_scores(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._insert_scores(records)
+
+    def append_batch(self, responses: List[Dict[str, Any]], scores: List[Dict[str, Any]]) -> None:
+        # One transaction (and one fsync) for the whole batch
+        with self._lock, self._conn:
+            if responses:
+                self._insert_log("responses", responses)
+            if scores:
+                self._insert_scores(scores)
+
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        return self._stream_table("responses")
+
+    def iter_scores(self) -> Iterator[Dict[str, Any]]:
+        return self._stream_table("scores")
+
+    def replace_scores(self, records: Iterable[Dict[str, Any]]) -> int:
+        # One transaction: other connections keep seeing the old rows until commit
+        records = iter(records)
+        count = 0
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scores")
+            while True:
+                batch = list(islice(records, STREAM_PAGE_SIZE))
+                if not batch:
+                    return count
+                self._insert_scores(batch)
+                count += len(batch)
+
+    def get_responses_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all("SELECT data FROM responses WHERE student_id = ? ORDER BY id", (student_id,))
+
+    def get_scores_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all("SELECT data FROM scores WHERE student_id = ? ORDER BY id", (student_id,))
+
+    def get_score_by_submission_key(self, submission_key: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one(
+            "SELECT data FROM scores WHERE submission_key = ? ORDER BY id DESC LIMIT 1", (submission_key,)
+        )
+
+    def clear_results(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM scores")
+
+    # ---------- questions ----------
+
+    def load_questions(self) -> List[Dict[str, Any]]:
+        return self._fetch_all("SELECT data FROM questions ORDER BY position")
+
+    def save_questions(self, questions: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM questions")
+            self._conn.executemany(
+                "INSERT INTO questions (position, data) VALUES (?, ?)",
+                [(position, _dumps(q)) for position, q in enumerate(questions)]
+            )
+
+    # ---------- classrooms ----------
+
+    def list_classrooms(self) -> Dict[str, Dict[str, Any]]:
+        classrooms = self._fetch_all("SELECT data FROM classrooms")
+        return {c['classroom_id']: c for c in classrooms}
+
+    def get_classroom(self, classroom_id: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT data FROM classrooms WHERE classroom_id = ?", (classroom_id,))
+
+    def _write_classroom(self, classroom: Dict[str, Any]) -> None:
+        classroom_id = classroom['classroom_id']
+        self._conn.execute(
+            "INSERT OR REPLACE INTO classrooms (classroom_id, teacher_id, join_code, data) VALUES (?, ?, ?, ?)",
+            (classroom_id, classroom['teacher_id'], classroom['join_code'], _dumps(classroom))
+        )
+        self._conn.execute("DELETE FROM classroom_members WHERE classroom_id = ?", (classroom_id,))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO classroom_members (classroom_id, student_id) VALUES (?, ?)",
+            [(classroom_id, m['student_id']) for m in classroom.get('members', [])]
+        )
+
+    def save_classroom(self, classroom: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._write_classroom(classroom)
+
+    def save_classrooms(self, classrooms: Iterable[Dict[str, Any]]) -> int:
+        # One transaction (and one fsync) for all of them
+        count = 0
+        with self._lock, self._conn:
+            for classroom in classrooms:
+                self._write_classroom(classroom)
+                count += 1
+        return count
+
+    def find_classroom_by_join_code(self, join_code: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT data FROM classrooms WHERE join_code = ?", (join_code,))
+
+    def get_classrooms_for_teacher(self, teacher_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all("SELECT data FROM classrooms WHERE teacher_id = ?", (teacher_id,))
+
+    def get_classrooms_for_student(self, student_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all(
+            "SELECT c.data FROM classroom_members m "
+            "JOIN classrooms c ON c.classroom_id = m.classroom_id "
+            "WHERE m.student_id = ?",
+            (student_id,)
+        )
+
+    # ---------- users ----------
+
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._fetch_all("SELECT data FROM users"))
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT data FROM users WHERE email = ?", (email.lower(),))
+
+    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT data FROM users WHERE id = ?", (user_id,))
+
+    def add_user(self, user: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO users (id, email, data) VALUES (?, ?, ?)",
+                (user['id'], user['email'].lower(), _dumps(user))
+            )
+
+    def add_users(self, users: Iterable[Dict[str, Any]]) -> int:
+        users = iter(users)
+        count = 0
+        with self._lock, self._conn:
+            while True:
+                batch = list(islice(users, STREAM_PAGE_SIZE))
+                if not batch:
+                    return count
+                self._conn.executemany(
+                    "INSERT INTO users (id, email, data) VALUES (?, ?, ?)",
+                    [(user['id'], user['email'].lower(), _dumps(user)) for user in batch]
+                )
+                count += len(batch)
+
+    def update_user(self, user: Dict[str, Any]) -> None:
+        self.update_users([user])
+
+    def update_users(self, users: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE users SET email = ?, data = ? WHERE id = ?",
+                [(user['email'].lower(), _dumps(user), user['id']) for user in users]
+            )
+
+    # ---------- sessions ----------
+
+    def load_sessions(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT token, data FROM sessions").fetchall()
+        return dict(zip((token for token, _ in rows), _loads_rows(rows, column=1)))
+
+    def get_session(self, token: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT data FROM sessions WHERE token = ?", (token,))
+
+    def save_session(self, token: str, session: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, user_id, data) VALUES (?, ?, ?)",
+                (token, session['user_id'], _dumps(session))
+            )
+
+    def delete_session(self, token: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+        return cursor.rowcount > 0
+
+    def replace_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions")
+            self._conn.executemany(
+                "INSERT INTO sessions (token, user_id, data) VALUES (?, ?, ?)",
+                [(token, session['user_id'], _dumps(session)) for token, session in sessions.items()]
+            )
+
+    # ---------- revoked signed tokens ----------
+
+    def load_revoked_tokens(self) -> Dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute("SELECT jti, expires_at FROM revoked_tokens").fetchall()
+        return dict(rows)
+
+    def add_revoked_token(self, jti: str, expires_at: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)",
+                (jti, expires_at)
+            )
+
+    def prune_revoked_tokens(self, now: float) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
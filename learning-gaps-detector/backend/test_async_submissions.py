@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Duplicate detection for the background scoring endpoint.
+
+/api/submit-quiz/async used to queue every request, so a retried
+submission was stored and scored twice. Duplicates (same attempts, or the
+same Idempotency-Key) now get the job already queued for them, or the
+stored analysis once it is scored, on both storage backends.
+
+Run from the backend directory:  python test_async_submissions.py
+"""
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+
+from utils.metrics import registry as metrics
+
+
+def submission(confidence: int = 4):
+    return {
+        "student_id": "s1",
+        "quiz_id": "quiz_1",
+        "attempts": [
+            {"question_id": 1, "selected_answer": 1, "time_taken": 12.5, "confidence": confidence, "is_correct": True},
+            {"question_id": 2, "selected_answer": 0, "time_taken": 30.0, "confidence": 2, "is_correct": False}
+        ]
+    }
+
+
+def load_main(data_dir: str, backend: str):
+    os.environ.update(DATA_DIR=data_dir, STORAGE_BACKEND=backend, LOG_LEVEL="ERROR",
+                      SQLITE_PATH=os.path.join(data_dir, "test.db"), PROFILE_SAMPLE_RATE="0")
+    sys.modules.pop("config", None)
+    sys.modules.pop("main", None)
+    # main registers its metrics on import; loaded once per backend here
+    metrics._metrics.clear()
+    return importlib.import_module("main")
+
+
+async def wait_for_job(client, job_id: str):
+    for _ in range(200):
+        job = (await client.get(f"/api/scoring-jobs/{job_id}")).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_duplicate_async_submissions_are_queued_once():
+    import httpx
+
+    for backend in ("json", "sqlite"):
+        with tempfile.TemporaryDirectory() as data_dir:
+            main = load_main(data_dir, backend)
+
+            async def scenario():
+                await main.app.router.startup()
+                try:
+                    transport = httpx.ASGITransport(app=main.app)
+                    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                        first = await asyncio.gather(*(
+                            client.post("/api/submit-quiz/async", json=submission()) for _ in range(3)
+                        ))
+                        job = await wait_for_job(client, first[0].json()["job_id"])
+                        after = await client.post("/api/submit-quiz/async", json=submission())
+                        sync = await client.post("/api/submit-quiz", json=submission())
+
+                        keyed = {"Idempotency-Key": "retry-1"}
+                        queued = await client.post("/api/submit-quiz/async", json=submission(5), headers=keyed)
+                        reused = await client.post("/api/submit-quiz/async", json=submission(3), headers=keyed)
+                        await wait_for_job(client, queued.json()["job_id"])
+                    responses = list(main.repository.iter_responses())
+                    scores = list(main.repository.iter_scores())
+                    return first, job, after, sync, reused, responses, scores
+                finally:
+                    await main.app.router.shutdown()
+
+            first, job, after, sync, reused, responses, scores = asyncio.run(scenario())
+
+            assert [r.status_code for r in first] == [202] * 3, [r.text for r in first]
+            assert len({r.json()["job_id"] for r in first}) == 1, (backend, [r.json() for r in first])
+            assert [r.headers.get("Idempotent-Replayed") for r in first].count("true") == 2, backend
+            assert job["status"] == "done", job
+
+            assert after.status_code == 200, after.text
+            assert after.headers.get("Idempotent-Replayed") == "true"
+            assert after.json()["analysis"]["job_id"] == job["job_id"]
+            assert sync.headers.get("Idempotent-Replayed") == "true", backend
+
+            assert reused.status_code == 422, reused.text
+            assert len(responses) == 2, (backend, len(responses))
+            assert len(scores) == 2, (backend, len(scores))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ASYNC SUBMISSION DEDUPLICATION - REGRESSION TEST")
+    print("=" * 60)
+    try:
+        test_duplicate_async_submissions_are_queued_once()
+    except AssertionError as e:
+        print(f"❌ FAILED\n{e}")
+        exit(1)
+    print("✅ Duplicate background submissions are stored and scored once")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for classroom creation and joining.
+
+Checks and writes run on different threads (the endpoints check on the
+event loop, then write in the I/O executor), so two concurrent requests
+can both pass a check. ClassroomDirectory re-checks under its lock: a
+student joining twice at once is enrolled once, and two classrooms
+created at once never share a join code, on both storage backends.
+
+Run from the backend directory:  python test_classroom_concurrency.py
+"""
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from logic.classrooms import ClassroomDirectory
+from storage.factory import create_repository
+
+THREADS = 8
+
+
+class SlowWrites:
+    """Repository wrapper that holds every classroom write open for a moment."""
+
+    def __init__(self, repository, delay: float = 0.05):
+        self._repository = repository
+        self._delay = delay
+
+    def save_classroom(self, classroom: Dict[str, Any]) -> None:
+        time.sleep(self._delay)
+        self._repository.save_classroom(classroom)
+
+    def __getattr__(self, name):
+        return getattr(self._repository, name)
+
+
+def new_classroom(classroom_id: str, join_code: str) -> Dict[str, Any]:
+    return {
+        "classroom_id": classroom_id,
+        "teacher_id": "teacher_1",
+        "teacher_name": "Teacher 1",
+        "name": f"Class {classroom_id}",
+        "description": "",
+        "subject": "Math",
+        "join_code": join_code,
+        "created_at": datetime.now().isoformat(),
+        "members": [],
+        "quiz_ids": []
+    }
+
+
+def run_together(calls: List) -> List[Any]:
+    """Run the calls on separate threads, released at the same moment."""
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def run(index, call):
+        barrier.wait()
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def directories(data_dir: str):
+    for backend in ("json", "sqlite"):
+        repository = create_repository(backend, os.path.join(data_dir, backend), os.path.join(data_dir, "test.db"))
+        yield backend, repository
+
+
+def test_concurrent_joins_enroll_once():
+    with tempfile.TemporaryDirectory() as data_dir:
+        for backend, repository in directories(data_dir):
+            directory = ClassroomDirectory(SlowWrites(repository))
+            assert directory.create(new_classroom("c1", "JOIN01"))
+            member = {"student_id": "s1", "student_name": "Student 1", "joined_at": datetime.now().isoformat()}
+
+            results = run_together([lambda: directory.add_member("c1", dict(member))] * THREADS)
+
+            assert results.count(True) == 1, (backend, results)
+            assert len(directory.get("c1")["members"]) == 1, backend
+            stored = ClassroomDirectory(repository).get("c1")
+            assert [m["student_id"] for m in stored["members"]] == ["s1"], backend
+            repository.close()
+
+
+def test_concurrent_creates_keep_join_codes_unique():
+    with tempfile.TemporaryDirectory() as data_dir:
+        for backend, repository in directories(data_dir):
+            directory = ClassroomDirectory(SlowWrites(repository))
+
+            results = run_together([
+                lambda i=i: directory.create(new_classroom(f"c{i}", "SAME01")) for i in range(THREADS)
+            ])
+
+            assert results.count(True) == 1, (backend, results)
+            stored = ClassroomDirectory(repository)
+            assert len(stored.classrooms) == 1, backend
+            assert stored.find_by_join_code("SAME01")["classroom_id"] == directory.find_by_join_code("SAME01")["classroom_id"]
+            repository.close()
+
+
+def test_concurrent_requests():
+    """The same races through the endpoints: double-clicked join, simultaneous creates."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ.update(DATA_DIR=data_dir, STORAGE_BACKEND="sqlite", LOG_LEVEL="ERROR",
+                          SQLITE_PATH=os.path.join(data_dir, "test.db"), PROFILE_SAMPLE_RATE="0")
+        sys.modules.pop("config", None)
+        sys.modules.pop("main", None)
+        main = importlib.import_module("main")
+        import httpx
+        from models.classroom import Classroom
+
+        main.classroom_directory.repository = SlowWrites(main.classroom_directory.repository)
+        # Every classroom first draws the same code; retries draw fresh ones
+        codes = iter(["SAME01"] * THREADS + [f"NEW{i:03d}" for i in range(100)])
+        generate_join_code = Classroom.generate_join_code
+        Classroom.generate_join_code = staticmethod(lambda: next(codes))
+
+        async def scenario():
+            await main.app.router.startup()
+            try:
+                transport = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    created = await asyncio.gather(*(
+                        client.post("/api/classrooms", json={"name": f"Class {i}", "subject": "Math"},
+                                    params={"teacher_id": "teacher_1", "teacher_name": "Teacher 1"})
+                        for i in range(THREADS)
+                    ))
+                    join = {"join_code": created[0].json()["join_code"], "student_id": "s1", "student_name": "Student 1"}
+                    joined = await asyncio.gather(*(client.post("/api/classrooms/join", json=join) for _ in range(2)))
+                    members = await client.get(f"/api/classrooms/{created[0].json()['classroom_id']}/members")
+                return created, joined, members
+            finally:
+                await main.app.router.shutdown()
+
+        try:
+            created, joined, members = asyncio.run(scenario())
+        finally:
+            Classroom.generate_join_code = generate_join_code
+            main.repository.close()
+
+        assert [r.status_code for r in created] == [200] * THREADS, [r.text for r in created]
+        join_codes = [r.json()["join_code"] for r in created]
+        assert len(set(join_codes)) == THREADS, join_codes
+        assert sorted(r.status_code for r in joined) == [200, 400], [r.text for r in joined]
+        assert members.json()["member_count"] == 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CLASSROOM CONCURRENCY - REGRESSION TEST")
+    print("=" * 60)
+    try:
+        test_concurrent_joins_enroll_once()
+        test_concurrent_creates_keep_join_codes_unique()
+        test_concurrent_requests()
+    except AssertionError as e:
+        print(f"❌ FAILED\n{e}")
+        exit(1)
+    print("✅ Concurrent joins and creates stay consistent")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Regression test for the single-pass FeatureExtractor.
+
+Checks that every feature matches the original multi-pass implementation
+(kept below as the reference, with its concept lookup switched to the
+ConceptIndex) on the recorded submissions in backend/data/responses.json(l)
+plus generated edge cases.
+
+Run from the backend directory:  python test_feature_extraction.py
+"""
+import json
+import math
+import os
+import random
+import statistics
+from typing import Dict, List, Any
+
+from models.quiz import StudentSubmission, QuizAttempt
+from logic.features import FeatureExtractor
+from logic.concepts import ConceptIndex
+from utils.jsonl import iter_records
+from utils.time_utils import calculate_time_stats
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+REL_TOL = 1e-9
+ABS_TOL = 1e-9
+
+
+def sample_concepts() -> ConceptIndex:
+    """Concepts for question ids 1-30 (ids above that are unknown, so "General")."""
+    names = ["Linear Functions", "Functions", "Quadratic Functions", "Exponents"]
+    return ConceptIndex({"id": question_id, "concept": names[question_id % 7 % 4]} for question_id in range(1, 31))
+
+
+class ReferenceFeatureExtractor:
+    """The original multi-pass implementation, kept verbatim as the oracle."""
+
+    def __init__(self, concepts: ConceptIndex):
+        self.concepts = concepts
+
+    def extract_features(self, submission: StudentSubmission) -> Dict[str, Any]:
+        attempts = submission.attempts
+        features = {
+            'student_id': submission.student_id,
+            'quiz_id': submission.quiz_id,
+            'timestamp': submission.timestamp,
+        }
+        features.update(self._extract_time_features(attempts))
+        features.update(self._extract_confidence_features(attempts))
+        features.update(self._extract_accuracy_features(attempts))
+        features.update(self._extract_consistency_features(attempts))
+        features.update(self._extract_rule_inputs(attempts, features))
+        return features
+
+    def _extract_rule_inputs(self, attempts: List[QuizAttempt], features: Dict[str, Any]) -> Dict[str, float]:
+        # Derived features the rule tables compare against (added with them)
+        return {
+            'confidence_calibration_gap': features['avg_confidence_when_correct'] - features['avg_confidence_when_incorrect'],
+            'confidence_accuracy_gap': features['avg_confidence'] / 5.0 - features['accuracy'],
+        }
+
+    def _extract_time_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
+        times = [attempt.time_taken for attempt in attempts]
+        correct_times = [attempt.time_taken for attempt in attempts if attempt.is_correct]
+        incorrect_times = [attempt.time_taken for attempt in attempts if not attempt.is_correct]
+        features = {}
+        time_stats = calculate_time_stats(times)
+        features['avg_time'] = time_stats['avg']
+        features['median_time'] = time_stats['median']
+        features['time_std'] = time_stats['std']
+        features['very_fast_responses'] = sum(1 for t in times if t < 5) / len(times)
+        features['very_slow_responses'] = sum(1 for t in times if t > 60) / len(times)
+        features['avg_correct_time'] = statistics.mean(correct_times) if correct_times else 0
+        features['avg_incorrect_time'] = statistics.mean(incorrect_times) if incorrect_times else 0
+        features['time_variance'] = statistics.variance(times) if len(times) > 1 else 0
+        return features
+
+    def _extract_confidence_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
+        confidences = [attempt.confidence for attempt in attempts]
+        correct_confidences = [attempt.confidence for attempt in attempts if attempt.is_correct]
+        incorrect_confidences = [attempt.confidence for attempt in attempts if not attempt.is_correct]
+        features = {}
+        features['avg_confidence'] = statistics.mean(confidences)
+        features['confidence_std'] = statistics.stdev(confidences) if len(confidences) > 1 else 0
+        features['high_confidence_rate'] = sum(1 for c in confidences if c >= 4) / len(confidences)
+        features['low_confidence_rate'] = sum(1 for c in confidences if c <= 2) / len(confidences)
+        features['avg_confidence_when_correct'] = statistics.mean(correct_confidences) if correct_confidences else 0
+        features['avg_confidence_when_incorrect'] = statistics.mean(incorrect_confidences) if incorrect_confidences else 0
+        features['overconfidence_score'] = features['avg_confidence_when_incorrect'] - 2.5
+        return features
+
+    def _extract_accuracy_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
+        total_attempts = len(attempts)
+        correct_attempts = sum(1 for attempt in attempts if attempt.is_correct)
+        return {
+            'accuracy': correct_attempts / total_attempts if total_attempts > 0 else 0,
+            'total_questions': total_attempts,
+            'correct_answers': correct_attempts,
+            'incorrect_answers': total_attempts - correct_attempts,
+        }
+
+    def _extract_consistency_features(self, attempts: List[QuizAttempt]) -> Dict[str, float]:
+        features = {}
+        concept_attempts = {}
+        for attempt in attempts:
+            concept = self.concepts.concept_for(attempt.question_id)
+            concept_attempts.setdefault(concept, []).append(attempt)
+        concept_accuracies = []
+        for concept, concept_attempts_list in concept_attempts.items():
+            if len(concept_attempts_list) > 0:
+                accuracy = sum(1 for a in concept_attempts_list if a.is_correct) / len(concept_attempts_list)
+                concept_accuracies.append(accuracy)
+        if concept_accuracies:
+            features['concept_consistency'] = 1 - statistics.stdev(concept_accuracies) if len(concept_accuracies) > 1 else 1
+            features['weakest_concept_score'] = min(concept_accuracies)
+            features['strongest_concept_score'] = max(concept_accuracies)
+            features['concept_gap'] = max(concept_accuracies) - min(concept_accuracies)
+        else:
+            features['concept_consistency'] = 0
+            features['weakest_concept_score'] = 0
+            features['strongest_concept_score'] = 0
+            features['concept_gap'] = 0
+        return features
+
+
+def recorded_submissions() -> List[StudentSubmission]:
+    """Submissions from the data directory (legacy array and JSONL log)."""
+    records = []
+    legacy_path = os.path.join(DATA_DIR, "responses.json")
+    if os.path.exists(legacy_path):
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            records.extend(json.load(f))
+    records.extend(iter_records(os.path.join(DATA_DIR, "responses.jsonl")))
+    return [StudentSubmission(**record) for record in records if record.get('attempts')]
+
+
+def generated_submissions(count: int = 500, seed: int = 42) -> List[StudentSubmission]:
+    """Random submissions, plus edge cases: one attempt, all right/wrong, equal or rushed times."""
+    rng = random.Random(seed)
+    submissions = []
+    for i in range(count):
+        size = rng.choice([1, 2, 3, 5, 10, 25, 60])
+        all_same_time = rng.random() < 0.1
+        forced_correct = rng.choice([None, None, None, True, False])
+        max_time = 10 if rng.random() < 0.1 else 180
+        submissions.append(StudentSubmission(
+            student_id=f"generated_{i}",
+            quiz_id="regression",
+            attempts=[
+                {
+                    "question_id": rng.randint(1, 40),
+                    "selected_answer": rng.randint(0, 3),
+                    "time_taken": 12.5 if all_same_time else round(rng.uniform(0.5, max_time), 3),
+                    "confidence": rng.randint(1, 5),
+                    "is_correct": forced_correct if forced_correct is not None else rng.random() < 0.6
+                }
+                for _ in range(size)
+            ]
+        ))
+    return submissions
+
+
+def compare(expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    """Describe every feature that differs between the two outputs."""
+    problems = []
+    if set(expected) != set(actual):
+        problems.append(f"feature names differ: {sorted(set(expected) ^ set(actual))}")
+    for name, value in expected.items():
+        other = actual.get(name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if not math.isclose(value, other, rel_tol=REL_TOL, abs_tol=ABS_TOL):
+                problems.append(f"{name}: expected {value!r}, got {other!r}")
+        elif value != other:
+            problems.append(f"{name}: expected {value!r}, got {other!r}")
+    return problems
+
+
+def test_fused_features_match_reference():
+    concepts = sample_concepts()
+    reference = ReferenceFeatureExtractor(concepts)
+    fused = FeatureExtractor(concepts)
+    submissions = recorded_submissions() + generated_submissions()
+    assert submissions
+
+    failures = []
+    for submission in submissions:
+        actual = fused.extract_features(submission)
+        # Per-concept totals are handed on to scoring, not a feature of their own
+        actual.pop('concepts')
+        problems = compare(reference.extract_features(submission), actual)
+        if problems:
+            failures.append(f"{submission.student_id}/{submission.quiz_id}: {'; '.join(problems)}")
+    assert not failures, "\n".join(failures[:20])
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("FEATURE EXTRACTION - REGRESSION TEST")
+    print("=" * 60)
+    recorded = recorded_submissions()
+    print(f"Recorded submissions: {len(recorded)}, generated: 500")
+    try:
+        test_fused_features_match_reference()
+    except AssertionError as e:
+        print(f"❌ FAILED\n{e}")
+        exit(1)
+    print("✅ Single-pass features match the reference implementation")
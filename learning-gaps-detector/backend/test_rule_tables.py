@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+Regression test for the declarative rule tables.
+
+Checks that LearningGapRules and AuthenticityDetector, now driven by the
+compiled rule tables in backend/rules/, give exactly the analysis of the
+original if-chain implementations (kept below as the reference) on the
+features of the recorded submissions plus generated edge cases, that the
+vectorized evaluation over feature arrays agrees with it, that edited
+table files take effect, that broken tables are rejected, and that a pickled scorer (as sent to scoring
+processes) still scores the same and returns its stage timings.
+
+Run from the backend directory:  python test_rule_tables.py
+"""
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Dict, List, Any
+
+import numpy as np
+
+from logic.authenticity import AuthenticityDetector
+from logic.features import FeatureExtractor
+from logic.rules import LearningGapRules
+from logic.rule_engine import CompiledRules, DEFAULT_RULES_DIR
+from logic.scoring import LearningGapScorer
+from utils.metrics import Histogram
+from test_feature_extraction import recorded_submissions, generated_submissions, sample_concepts
+
+
+class ReferenceLearningGapRules:
+    """The original if-chain LearningGapRules, kept verbatim as the oracle."""
+    
+    def __init__(self):
+        # Thresholds for different indicators
+        self.thresholds = {
+            'very_fast_threshold': 5.0,  # seconds
+            'high_confidence_threshold': 4,
+            'low_confidence_threshold': 2,
+            'overconfidence_threshold': 1.0,
+            'time_inconsistency_threshold': 0.7,
+            'concept_gap_threshold': 0.3,
+            'accuracy_threshold_high': 0.8,
+            'accuracy_threshold_low': 0.6
+        }
+    
+    def analyze_learning_gaps(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply rule-based analysis to detect learning gaps."""
+        
+        analysis = {
+            'gap_indicators': [],
+            'strengths': [],
+            'risk_factors': [],
+            'authenticity_score': 0.0,
+            'gap_severity': 0.0
+        }
+        
+        # Analyze different aspects
+        analysis.update(self._analyze_speed_patterns(features))
+        analysis.update(self._analyze_confidence_patterns(features))
+        analysis.update(self._analyze_consistency_patterns(features))
+        analysis.update(self._analyze_ai_usage_indicators(features))
+        
+        # Calculate final scores
+        analysis['gap_severity'] = self._calculate_gap_severity(analysis['gap_indicators'])
+        analysis['authenticity_score'] = self._calculate_authenticity_score(features, analysis)
+        analysis['risk_level'] = self._determine_risk_level(analysis['gap_severity'])
+        
+        return analysis
+    
+    def _analyze_speed_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze timing patterns for learning gaps."""
+        patterns = {'speed_analysis': {}}
+        
+        avg_time = features.get('avg_time', 0)
+        very_fast_rate = features.get('very_fast_responses', 0)
+        time_variance = features.get('time_variance', 0)
+        
+        # Suspiciously fast responses
+        if very_fast_rate > 0.3:  # More than 30% very fast
+            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
+            patterns['gap_indicators'].append({
+                'type': 'speed_anomaly',
+                'description': f'High rate of very fast responses ({very_fast_rate:.1%})',
+                'severity': 'medium' if very_fast_rate < 0.5 else 'high'
+            })
+        
+        # Extremely consistent timing (might indicate copy-paste)
+        if time_variance < 2.0 and avg_time < 10:
+            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
+            patterns['gap_indicators'].append({
+                'type': 'timing_consistency',
+                'description': 'Unusually consistent response times',
+                'severity': 'medium'
+            })
+        
+        # Good pacing
+        if 10 <= avg_time <= 30 and very_fast_rate < 0.1:
+            patterns['strengths'] = patterns.get('strengths', [])
+            patterns['strengths'].append('Thoughtful pacing on questions')
+        
+        return patterns
+    
+    def _analyze_confidence_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze confidence patterns for learning gaps."""
+        patterns = {'confidence_analysis': {}}
+        
+        avg_confidence = features.get('avg_confidence', 0)
+        overconfidence_score = features.get('overconfidence_score', 0)
+        confidence_when_correct = features.get('avg_confidence_when_correct', 0)
+        confidence_when_incorrect = features.get('avg_confidence_when_incorrect', 0)
+        accuracy = features.get('accuracy', 0)
+        
+        # Overconfidence on wrong answers
+        if overconfidence_score > self.thresholds['overconfidence_threshold']:
+            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
+            patterns['gap_indicators'].append({
+                'type': 'overconfidence',
+                'description': f'High confidence on incorrect answers (score: {overconfidence_score:.1f})',
+                'severity': 'high'
+            })
+        
+        # High confidence with low accuracy
+        if avg_confidence > 4.0 and accuracy < 0.6:
+            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
+            patterns['gap_indicators'].append({
+                'type': 'confidence_accuracy_mismatch',
+                'description': f'High confidence ({avg_confidence:.1f}) but low accuracy ({accuracy:.1%})',
+                'severity': 'high'
+            })
+        
+        # Appropriate confidence calibration
+        confidence_gap = abs(confidence_when_correct - confidence_when_incorrect)
+        if confidence_gap > 1.0 and confidence_when_correct > confidence_when_incorrect:
+            patterns['strengths'] = patterns.get('strengths', [])
+            patterns['strengths'].append('Well-calibrated confidence levels')
+        
+        return patterns
+    
+    def _analyze_consistency_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze consistency across concepts."""
+        patterns = {'consistency_analysis': {}}
+        
+        concept_gap = features.get('concept_gap', 0)
+        concept_consistency = features.get('concept_consistency', 0)
+        weakest_score = features.get('weakest_concept_score', 0)
+        
+        # Large gaps between concepts
+        if concept_gap > self.thresholds['concept_gap_threshold']:
+            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
+            patterns['gap_indicators'].append({
+                'type': 'concept_inconsistency',
+                'description': f'Large performance gap across concepts ({concept_gap:.1%})',
+                'severity': 'medium'
+            })
+        
+        # Very weak performance on some concepts
+        if weakest_score < 0.3:
+            patterns['gap_indicators'] = patterns.get('gap_indicators', [])
+            patterns['gap_indicators'].append({
+                'type': 'concept_weakness',
+                'description': f'Very poor performance on some concepts ({weakest_score:.1%})',
+                'severity': 'high'
+            })
+        
+        # Good consistency
+        if concept_consistency > 0.8 and weakest_score > 0.6:
+            patterns['strengths'] = patterns.get('strengths', [])
+            patterns['strengths'].append('Consistent understanding across concepts')
+        
+        return patterns
+    
+    def _analyze_ai_usage_indicators(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze patterns that might indicate AI assistance."""
+        patterns = {'ai_analysis': {}}
+        
+        very_fast_rate = features.get('very_fast_responses', 0)
+        accuracy = features.get('accuracy', 0)
+        avg_confidence = features.get('avg_confidence', 0)
+        time_variance = features.get('time_variance', 0)
+        
+        # High accuracy with fast responses and high confidence (classic AI pattern)
+        if accuracy > 0.85 and very_fast_rate > 0.4 and avg_confidence > 4.0:
+            patterns['risk_factors'] = patterns.get('risk_factors', [])
+            patterns['risk_factors'].append({
+                'type': 'potential_ai_assistance',
+                'description': 'Pattern suggests possible AI assistance (high accuracy + speed + confidence)',
+                'severity': 'high',
+                'confidence': 0.8
+            })
+        
+        # Unnatural timing consistency
+        if time_variance < 1.0 and len(features.get('attempts', [])) > 5:
+            patterns['risk_factors'] = patterns.get('risk_factors', [])
+            patterns['risk_factors'].append({
+                'type': 'unnatural_timing',
+                'description': 'Unusually consistent response times across questions',
+                'severity': 'medium',
+                'confidence': 0.6
+            })
+        
+        return patterns
+    
+    def _calculate_gap_severity(self, gap_indicators: List[Dict]) -> float:
+        """Calculate overall gap severity score."""
+        if not gap_indicators:
+            return 0.0
+        
+        severity_weights = {'low': 0.2, 'medium': 0.5, 'high': 1.0}
+        total_score = sum(severity_weights.get(indicator.get('severity', 'low'), 0.2) 
+                         for indicator in gap_indicators)
+        
+        # Normalize to 0-1 scale
+        max_possible = len(gap_indicators) * 1.0
+        return min(total_score / max_possible, 1.0) if max_possible > 0 else 0.0
+    
+    def _calculate_authenticity_score(self, features: Dict[str, Any], analysis: Dict[str, Any]) -> float:
+        """Calculate how authentic the learning appears to be."""
+        risk_factors = analysis.get('risk_factors', [])
+        
+        if not risk_factors:
+            return 1.0  # Highly authentic if no risk factors
+        
+        # Reduce authenticity based on risk factors
+        authenticity = 1.0
+        for factor in risk_factors:
+            severity = factor.get('severity', 'low')
+            confidence = factor.get('confidence', 0.5)
+            
+            if severity == 'high':
+                authenticity -= 0.3 * confidence
+            elif severity == 'medium':
+                authenticity -= 0.2 * confidence
+            else:
+                authenticity -= 0.1 * confidence
+        
+        return max(authenticity, 0.0)
+    
+    def _determine_risk_level(self, gap_severity: float) -> str:
+        """Determine risk level based on gap severity."""
+        if gap_severity < 0.3:
+            return 'safe'
+        elif gap_severity < 0.6:
+            return 'watch'
+        else:
+            return 'at_risk'
+
+
+class ReferenceAuthenticityDetector:
+    """The original if-chain AuthenticityDetector, kept verbatim as the oracle."""
+    
+    def __init__(self):
+        self.ai_patterns = {
+            # Common AI response patterns
+            'response_speed_patterns': {
+                'too_consistent': {'min_variance': 0.5, 'weight': 0.3},
+                'too_fast': {'max_avg_time': 8.0, 'weight': 0.4},
+                'burst_pattern': {'consecutive_fast': 3, 'weight': 0.3}
+            },
+            'confidence_patterns': {
+                'overconfident_incorrect': {'threshold': 3.5, 'weight': 0.5},
+                'uniform_high_confidence': {'min_avg': 4.0, 'min_rate': 0.7, 'weight': 0.4}
+            },
+            'accuracy_patterns': {
+                'perfect_with_speed': {'min_accuracy': 0.9, 'max_avg_time': 15, 'weight': 0.6},
+                'no_learning_curve': {'consistency_threshold': 0.9, 'weight': 0.3}
+            }
+        }
+    
+    def detect_ai_usage_probability(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Calculate probability of AI assistance based on behavioral patterns."""
+        
+        detection_result = {
+            'ai_probability': 0.0,
+            'confidence_level': 0.0,
+            'detected_patterns': [],
+            'authenticity_indicators': [],
+            'recommendation': ''
+        }
+        
+        # Analyze different pattern categories
+        speed_score = self._analyze_speed_patterns(features)
+        confidence_score = self._analyze_confidence_authenticity(features)
+        accuracy_score = self._analyze_accuracy_patterns(features)
+        behavioral_score = self._analyze_behavioral_consistency(features)
+        
+        # Combine scores with weights
+        ai_probability = (
+            speed_score['score'] * 0.3 +
+            confidence_score['score'] * 0.25 +
+            accuracy_score['score'] * 0.25 +
+            behavioral_score['score'] * 0.2
+        )
+        
+        detection_result['ai_probability'] = min(ai_probability, 1.0)
+        detection_result['detected_patterns'] = (
+            speed_score['patterns'] +
+            confidence_score['patterns'] +
+            accuracy_score['patterns'] +
+            behavioral_score['patterns']
+        )
+        
+        # Calculate confidence in detection
+        detection_result['confidence_level'] = self._calculate_detection_confidence(
+            detection_result['detected_patterns']
+        )
+        
+        # Generate recommendations
+        detection_result['recommendation'] = self._generate_recommendation(
+            detection_result['ai_probability'],
+            detection_result['confidence_level']
+        )
+        
+        return detection_result
+    
+    def _analyze_speed_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze response speed for AI usage indicators."""
+        result = {'score': 0.0, 'patterns': []}
+        
+        avg_time = features.get('avg_time', 30)
+        very_fast_rate = features.get('very_fast_responses', 0)
+        time_variance = features.get('time_variance', 10)
+        accuracy = features.get('accuracy', 0)
+        
+        # Pattern 1: Too fast with high accuracy
+        if avg_time < 10 and accuracy > 0.8:
+            result['score'] += 0.4
+            result['patterns'].append({
+                'pattern': 'fast_accurate_responses',
+                'description': f'Very fast responses ({avg_time:.1f}s avg) with high accuracy ({accuracy:.1%})',
+                'strength': 'strong'
+            })
+        
+        # Pattern 2: Consistent very fast responses
+        if very_fast_rate > 0.5:
+            result['score'] += 0.3
+            result['patterns'].append({
+                'pattern': 'consistent_speed',
+                'description': f'{very_fast_rate:.1%} of responses were very fast (<5s)',
+                'strength': 'medium'
+            })
+        
+        # Pattern 3: Unnaturally low time variance
+        if time_variance < 2 and avg_time < 15:
+            result['score'] += 0.3
+            result['patterns'].append({
+                'pattern': 'robotic_timing',
+                'description': f'Very low timing variance ({time_variance:.1f}s)',
+                'strength': 'medium'
+            })
+        
+        return result
+    
+    def _analyze_confidence_authenticity(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze confidence patterns for authenticity."""
+        result = {'score': 0.0, 'patterns': []}
+        
+        avg_confidence = features.get('avg_confidence', 3)
+        confidence_when_incorrect = features.get('avg_confidence_when_incorrect', 2)
+        high_confidence_rate = features.get('high_confidence_rate', 0)
+        accuracy = features.get('accuracy', 0)
+        
+        # Pattern 1: High confidence on wrong answers
+        if confidence_when_incorrect > 3.5:
+            result['score'] += 0.5
+            result['patterns'].append({
+                'pattern': 'overconfident_errors',
+                'description': f'High confidence ({confidence_when_incorrect:.1f}) on incorrect answers',
+                'strength': 'strong'
+            })
+        
+        # Pattern 2: Uniformly high confidence with mixed accuracy
+        if high_confidence_rate > 0.7 and accuracy < 0.9:
+            result['score'] += 0.3
+            result['patterns'].append({
+                'pattern': 'uniform_overconfidence',
+                'description': f'{high_confidence_rate:.1%} high confidence responses despite {accuracy:.1%} accuracy',
+                'strength': 'medium'
+            })
+        
+        # Pattern 3: Perfect confidence-accuracy mismatch
+        confidence_accuracy_gap = avg_confidence / 5.0 - accuracy
+        if confidence_accuracy_gap > 0.3:
+            result['score'] += 0.2
+            result['patterns'].append({
+                'pattern': 'confidence_accuracy_mismatch',
+                'description': f'Large gap between confidence and actual performance',
+                'strength': 'weak'
+            })
+        
+        return result
+    
+    def _analyze_accuracy_patterns(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze accuracy patterns for AI indicators."""
+        result = {'score': 0.0, 'patterns': []}
+        
+        accuracy = features.get('accuracy', 0)
+        avg_time = features.get('avg_time', 30)
+        concept_gap = features.get('concept_gap', 0)
+        
+        # Pattern 1: High accuracy with very fast responses
+        if accuracy > 0.85 and avg_time < 12:
+            result['score'] += 0.6
+            result['patterns'].append({
+                'pattern': 'superhuman_performance',
+                'description': f'{accuracy:.1%} accuracy with {avg_time:.1f}s average time',
+                'strength': 'strong'
+            })
+        
+        # Pattern 2: Suspiciously uniform performance across concepts
+        if concept_gap < 0.1 and accuracy > 0.8:
+            result['score'] += 0.3
+            result['patterns'].append({
+                'pattern': 'uniform_concept_mastery',
+                'description': f'Extremely consistent performance across all concepts',
+                'strength': 'medium'
+            })
+        
+        # Pattern 3: Perfect or near-perfect scores
+        if accuracy >= 0.95:
+            result['score'] += 0.2
+            result['patterns'].append({
+                'pattern': 'near_perfect_accuracy',
+                'description': f'Near-perfect accuracy ({accuracy:.1%}) is statistically rare',
+                'strength': 'weak'
+            })
+        
+        return result
+    
+    def _analyze_behavioral_consistency(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze behavioral consistency for human-like patterns."""
+        result = {'score': 0.0, 'patterns': []}
+        
+        concept_consistency = features.get('concept_consistency', 0)
+        time_variance = features.get('time_variance', 10)
+        confidence_std = features.get('confidence_std', 1)
+        
+        # Pattern 1: Too perfect consistency
+        if concept_consistency > 0.95 and time_variance < 3:
+            result['score'] += 0.4
+            result['patterns'].append({
+                'pattern': 'perfect_consistency',
+                'description': 'Unnaturally consistent performance patterns',
+                'strength': 'medium'
+            })
+        
+        # Pattern 2: No natural learning variations
+        if confidence_std < 0.5:
+            result['score'] += 0.2
+            result['patterns'].append({
+                'pattern': 'no_confidence_variation',
+                'description': 'Extremely stable confidence levels throughout quiz',
+                'strength': 'weak'
+            })
+        
+        return result
+    
+    def _calculate_detection_confidence(self, patterns: List[Dict]) -> float:
+        """Calculate confidence in AI detection based on pattern strength."""
+        if not patterns:
+            return 0.0
+        
+        strength_weights = {'strong': 0.8, 'medium': 0.5, 'weak': 0.2}
+        total_confidence = sum(strength_weights.get(p.get('strength', 'weak'), 0.2) for p in patterns)
+        
+        return min(total_confidence / len(patterns), 1.0)
+    
+    def _generate_recommendation(self, ai_probability: float, confidence: float) -> str:
+        """Generate actionable recommendations based on detection results."""
+        if ai_probability < 0.3:
+            return "Performance appears authentic. Continue monitoring."
+        elif ai_probability < 0.6:
+            if confidence > 0.6:
+                return "Moderate AI usage suspected. Consider follow-up assessment."
+            else:
+                return "Some unusual patterns detected. Recommend closer observation."
+        else:
+            if confidence > 0.7:
+                return "High probability of AI assistance. Immediate intervention recommended."
+            else:
+                return "Strong AI usage indicators. Further investigation needed."
+
+
+def all_features() -> List[Dict[str, Any]]:
+    extractor = FeatureExtractor(sample_concepts())
+    submissions = recorded_submissions() + generated_submissions(3000, seed=13)
+    return [extractor.extract_features(submission) for submission in submissions]
+
+
+def test_gap_rules_match_reference():
+    rules, reference = LearningGapRules(), ReferenceLearningGapRules()
+    failures = []
+    for features in all_features():
+        expected = reference.analyze_learning_gaps(features)
+        actual = rules.analyze_learning_gaps(features)
+        if actual != expected:
+            failures.append(f"{features['student_id']}: expected {expected}, got {actual}")
+    assert not failures, "\n".join(failures[:5])
+
+
+def test_authenticity_rules_match_reference():
+    detector, reference = AuthenticityDetector(), ReferenceAuthenticityDetector()
+    failures = []
+    for features in all_features():
+        expected = reference.detect_ai_usage_probability(features)
+        actual = detector.detect_ai_usage_probability(features)
+        if actual != expected:
+            failures.append(f"{features['student_id']}: expected {expected}, got {actual}")
+    assert not failures, "\n".join(failures[:5])
+
+
+def test_vectorized_rules_match_scalar():
+    features = all_features()
+    arrays = {
+        name: np.array([row[name] for row in features], dtype=np.float64)
+        for name, value in features[0].items() if isinstance(value, (int, float))
+    }
+    rules, detector = LearningGapRules(), AuthenticityDetector()
+    batch = rules.analyze_batch(arrays)
+    ai_probability = detector.ai_probability_batch(arrays)
+    for row, values in enumerate(features):
+        analysis = rules.analyze_learning_gaps(values)
+        assert batch['gap_severity'][row] == analysis['gap_severity'], values['student_id']
+        found = {indicator['type'] for indicator in analysis['gap_indicators']}
+        assert {name for name, flags in batch['indicators'].items() if flags[row]} == found, values['student_id']
+        assert ai_probability[row] == detector.detect_ai_usage_probability(values)['ai_probability'], values['student_id']
+
+
+def test_rules_dir_overrides_tables():
+    """Edited copies of the table files change the rules without code changes."""
+    features = all_features()[:200]
+    with tempfile.TemporaryDirectory() as rules_dir:
+        for name in ("learning_gaps", "authenticity"):
+            shutil.copy(os.path.join(DEFAULT_RULES_DIR, f"{name}.json"), rules_dir)
+        path = os.path.join(rules_dir, "learning_gaps.json")
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+        table["thresholds"]["concept_gap_threshold"] = 2.0  # concept_gap never exceeds 1
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(table, f)
+
+        rules = LearningGapRules(rules_dir=rules_dir)
+        detector = AuthenticityDetector(rules_dir=rules_dir)
+        assert detector.detect_ai_usage_probability(features[0]) == AuthenticityDetector().detect_ai_usage_probability(features[0])
+        for row in features:
+            indicators = rules.analyze_learning_gaps(row)['gap_indicators']
+            assert 'concept_inconsistency' not in [indicator['type'] for indicator in indicators]
+        assert any(
+            indicator['type'] == 'concept_inconsistency'
+            for row in features for indicator in LearningGapRules().analyze_learning_gaps(row)['gap_indicators']
+        )
+
+
+def test_broken_tables_rejected():
+    rule = {'name': 'fast', 'when': [('avg_time', '<', 'fast_time')], 'message': 'Fast ({avg_time:.1f}s)'}
+    CompiledRules([rule], {'fast_time': 10})
+    broken = [
+        ([dict(rule, when=[('avg_time', '<', 'slow_time')])], {'fast_time': 10}),  # unknown threshold
+        ([rule], {'fast_time': 10, 'slow_time': 60}),                              # unused threshold
+        ([dict(rule, message='Fast ({accuracy:.1%})')], {'fast_time': 10}),          # feature not compared
+        ([dict(rule, message='Fast ({avg_time:.1z})')], {'fast_time': 10}),          # bad format spec
+        ([dict(rule, message='Fast ({avg_time')], {'fast_time': 10}),                # malformed template
+    ]
+    for rules, thresholds in broken:
+        try:
+            CompiledRules(rules, thresholds)
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {rules} with {thresholds}")
+
+
+def test_pickled_scorer_matches():
+    # CPU_EXECUTOR=process sends the scorer (and its compiled rules) to workers;
+    # their stage timings come back with the result and are recorded by the server
+    stage_seconds = Histogram("stage_seconds", "Scoring stages", ["stage"])
+    scorer = LearningGapScorer(sample_concepts(), stage_seconds=stage_seconds)
+    copy = pickle.loads(pickle.dumps(scorer))
+    assert copy.stage_seconds is None
+    submissions = generated_submissions(200, seed=5)
+    for submission in submissions:
+        expected = LearningGapScorer(sample_concepts()).score_submission(submission).model_dump(exclude={'timestamp'})
+        result, timings = copy.score_submission_timed(submission)
+        assert result.model_dump(exclude={'timestamp'}) == expected
+        scorer.record_stage_timings(timings)
+    for stage in LearningGapScorer.STAGES:
+        assert stage_seconds.count(stage) == len(submissions), stage
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RULE TABLES - REGRESSION TEST")
+    print("=" * 60)
+    try:
+        test_gap_rules_match_reference()
+        test_authenticity_rules_match_reference()
+        test_vectorized_rules_match_scalar()
+        test_rules_dir_overrides_tables()
+        test_broken_tables_rejected()
+        test_pickled_scorer_matches()
+    except AssertionError as e:
+        print(f"❌ FAILED\n{e}")
+        exit(1)
+    print("✅ Rule tables match the original if-chains score for score")
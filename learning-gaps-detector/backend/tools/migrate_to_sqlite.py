@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+One-shot migration of the JSON data files into a SQLite database.
+
+Usage (from the backend directory):
+    python -m tools.migrate_to_sqlite [--data-dir data] [--db data/learning_gaps.db]
+
+Afterwards start the server with STORAGE_BACKEND=sqlite.
+"""
+import argparse
+import os
+import sys
+from itertools import islice
+
+from storage.json_store import JsonRepository
+from storage.sqlite_store import SqliteRepository
+
+# Records inserted per transaction when copying the response/score logs
+BATCH_SIZE = 5000
+
+
+def _copy_log(records, append_batch) -> int:
+    total = 0
+    while True:
+        batch = list(islice(records, BATCH_SIZE))
+        if not batch:
+            return total
+        append_batch(batch)
+        total += len(batch)
+
+
+def migrate(data_dir: str, db_path: str) -> dict:
+    """Copy every record from the JSON files into the SQLite database."""
+    source = JsonRepository(data_dir)
+    target = SqliteRepository(db_path)
+
+    try:
+        counts = {}
+
+        counts['users'] = target.add_users(source.iter_users())
+
+        sessions = source.load_sessions()
+        for token, session in sessions.items():
+            target.save_session(token, session)
+        counts['sessions'] = len(sessions)
+
+        counts['classrooms'] = target.save_classrooms(source.list_classrooms().values())
+
+        questions = source.load_questions()
+        if questions:
+            target.save_questions(questions)
+        counts['questions'] = len(questions)
+
+        counts['responses'] = _copy_log(source.iter_responses(), target.append_responses)
+        counts['scores'] = _copy_log(source.iter_scores(), target.append_scores)
+
+        return counts
+    finally:
+        target.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Migrate data/*.json files into SQLite")
+    parser.add_argument("--data-dir", default="data", help="Directory with the JSON data files")
+    parser.add_argument("--db", default=None, help="Target database (default: <data-dir>/learning_gaps.db)")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(args.data_dir, "learning_gaps.db")
+    if os.path.exists(db_path):
+        print(f"❌ {db_path} already exists - refusing to migrate twice")
+        return 1
+
+    counts = migrate(args.data_dir, db_path)
+
+    print(f"✅ Migrated {args.data_dir} -> {db_path}")
+    for table, count in counts.items():
+        print(f"   {table}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
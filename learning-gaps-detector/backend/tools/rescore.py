@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Recompute every stored score with the current rules (backfill).
+
+Streams all stored submissions, scores them in chunks across a process
+pool and swaps the complete new set in for the old scores in one step.
+Progress is checkpointed, so an interrupted run picks up where it left
+off when started again.
+
+Usage (from the backend directory, with the server stopped):
+    python -m tools.rescore [--workers N] [--chunk-size 2000] [--restart]
+
+Scores the server writes meanwhile would be lost in the swap, so the
+server and this tool exclude each other through DATA_DIR/maintenance.lock:
+the tool refuses to start while the server runs, and the server refuses to
+start during a backfill.
+
+Uses the same STORAGE_BACKEND / DATA_DIR / SQLITE_PATH / RULES_DIR
+settings as the server. Rescored results keep the submission's
+timestamp, job_id and submission key.
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import config
+from models.quiz import StudentSubmission
+from logic.scoring import LearningGapScorer
+from logic.concepts import ConceptIndex
+from logic.question_bank import QuestionBank
+from storage.base import Repository
+from storage.factory import create_repository
+from storage.maintenance_lock import MaintenanceLock, MaintenanceLockError
+from utils.jsonl import iter_records
+from utils.serialization import dumps_bytes, loads
+
+# Submissions handed to a worker at a time
+DEFAULT_CHUNK_SIZE = 2000
+# Seconds between progress lines
+PROGRESS_INTERVAL = 2.0
+
+# Submission fields copied onto its score (job recovery, duplicate detection)
+CARRIED_FIELDS = ('job_id', 'submission_hash', 'submission_key')
+
+_scorer: Optional[LearningGapScorer] = None
+
+
+def _use_questions(questions: List[Dict[str, Any]]) -> None:
+    global _scorer
+    _scorer = LearningGapScorer(ConceptIndex(questions), rules_dir=config.RULES_DIR)
+
+
+def _init_worker(questions: List[Dict[str, Any]]) -> None:
+    # Ctrl+C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _use_questions(questions)
+
+
+def score_chunk(records: List[Dict[str, Any]]) -> Tuple[bytes, int, int]:
+    """Score a chunk of stored submissions.
+
+    Returns the results as JSONL bytes, the number scored and the number
+    skipped (submissions without attempts cannot be scored).
+    """
+    if _scorer is None:
+        _use_questions([])
+    scorable = [record for record in records if record.get('attempts')]
+    results = _scorer.batch_score_submissions([StudentSubmission(**record) for record in scorable])
+
+    lines = []
+    for record, result in zip(scorable, results):
+        result_dict = result.model_dump(mode="json")
+        # A backfill re-evaluates history, it does not move it to today
+        result_dict['timestamp'] = record.get('timestamp', result_dict['timestamp'])
+        for field in CARRIED_FIELDS:
+            if record.get(field):
+                result_dict[field] = record[field]
+        lines.append(dumps_bytes(result_dict) + b"\n")
+    return b"".join(lines), len(scorable), len(records) - len(scorable)
+
+
+class Checkpoint:
+    """Progress of a backfill, persisted next to its staging file.
+
+    ``staging_bytes`` is the size of the staging file when the checkpoint
+    was taken; anything written past it belongs to unfinished chunks and is
+    cut off on resume.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.chunk_size = 0
+        self.consumed = 0
+        self.scored = 0
+        self.skipped = 0
+        self.staging_bytes = 0
+
+    def load(self) -> bool:
+        """Read the checkpoint, returning whether there was one."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'rb') as f:
+            state = loads(f.read())
+        for name in ('chunk_size', 'consumed', 'scored', 'skipped', 'staging_bytes'):
+            setattr(self, name, state[name])
+        return True
+
+    def save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps_bytes({
+                'chunk_size': self.chunk_size,
+                'consumed': self.consumed,
+                'scored': self.scored,
+                'skipped': self.skipped,
+                'staging_bytes': self.staging_bytes
+            }))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _chunks(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered_results(chunks: Iterator[List[Dict[str, Any]]], workers: int,
+                     questions: List[Dict[str, Any]]) -> Iterator[Tuple[int, Tuple[bytes, int, int]]]:
+    """Yield (chunk length, score_chunk result) in input order.
+
+    At most two chunks per worker are in flight, so memory stays flat no
+    matter how many submissions are stored.
+    """
+    if workers <= 1:
+        _use_questions(questions)
+        for chunk in chunks:
+            yield len(chunk), score_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(questions,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), pool.submit(score_chunk, chunk)))
+            if len(pending) >= workers * 2:
+                size, future = pending.popleft()
+                yield size, future.result()
+        while pending:
+            size, future = pending.popleft()
+            yield size, future.result()
+
+
+def rescore(repository: Repository, work_dir: str, workers: int,
+            chunk_size: int = DEFAULT_CHUNK_SIZE, restart: bool = False) -> Checkpoint:
+    """Rescore every stored submission and replace the stored scores."""
+    os.makedirs(work_dir, exist_ok=True)
+    staging_path = os.path.join(work_dir, "scores.staging.jsonl")
+    checkpoint = Checkpoint(os.path.join(work_dir, "rescore.checkpoint.json"))
+
+    if restart or not checkpoint.load():
+        checkpoint = Checkpoint(checkpoint.path)
+        checkpoint.chunk_size = chunk_size
+        with open(staging_path, 'wb'):
+            pass
+    else:
+        print(f"↻ Resuming after {checkpoint.consumed:,} submissions")
+
+    # Concepts come from the same questions the server would use
+    question_bank = QuestionBank(repository)
+    question_bank.load()
+    questions = question_bank.questions()
+
+    started = time.monotonic()
+    resumed_from = checkpoint.consumed
+    last_report = started
+
+    with open(staging_path, 'r+b') as staging:
+        staging.truncate(checkpoint.staging_bytes)
+        staging.seek(checkpoint.staging_bytes)
+
+        responses = islice(repository.iter_responses(), checkpoint.consumed, None)
+        results = _ordered_results(_chunks(responses, checkpoint.chunk_size), workers, questions)
+        for size, (lines, scored, skipped) in results:
+            staging.write(lines)
+            staging.flush()
+            os.fsync(staging.fileno())
+
+            checkpoint.consumed += size
+            checkpoint.scored += scored
+            checkpoint.skipped += skipped
+            checkpoint.staging_bytes = staging.tell()
+            checkpoint.save()
+
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL:
+                rate = (checkpoint.consumed - resumed_from) / (now - started)
+                print(f"   {checkpoint.consumed:,} submissions rescored ({rate:,.0f}/s)")
+                last_report = now
+
+    written = repository.replace_scores(iter_records(staging_path))
+    if written != checkpoint.scored:
+        raise RuntimeError(f"Staged {checkpoint.scored} scores but wrote {written}")
+
+    checkpoint.clear()
+    os.remove(staging_path)
+    return checkpoint
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute every stored score with the current rules")
+    parser.add_argument("--workers", type=int, default=config.CPU_WORKERS,
+                        help="Scoring processes (1 scores in this process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Submissions per work unit (ignored when resuming)")
+    parser.add_argument("--work-dir", default=os.path.join(config.DATA_DIR, "rescore"),
+                        help="Where the staging file and checkpoint are kept")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore an existing checkpoint and start over")
+    args = parser.parse_args()
+
+    lock = MaintenanceLock(config.DATA_DIR)
+    try:
+        lock.acquire(exclusive=True)
+    except MaintenanceLockError as e:
+        print(f"❌ {e}")
+        return 1
+
+    repository = create_repository(config.STORAGE_BACKEND, config.DATA_DIR, config.SQLITE_PATH)
+    started = time.monotonic()
+    try:
+        result = rescore(repository, args.work_dir, args.workers, args.chunk_size, args.restart)
+    except KeyboardInterrupt:
+        print("\n⏸ Interrupted - run again to resume from the last checkpoint")
+        return 1
+    finally:
+        repository.close()
+        lock.release()
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Rescored {result.scored:,} submissions in {elapsed:.1f}s")
+    if result.skipped:
+        print(f"   skipped {result.skipped:,} without attempts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
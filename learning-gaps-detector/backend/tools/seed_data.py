@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Seed storage with a large synthetic dataset for scale testing.
+
+Writes teachers and students, classrooms with their members, the
+synthetic question bank, and submissions together with their scores, in
+the storage format the server uses. Output is streamed: users and
+classrooms are written as they are generated, and submissions are scored
+and appended chunk by chunk, so memory use does not grow with the number
+of submissions. The same seed always produces the same data.
+
+Usage (from the backend directory):
+    python -m tools.seed_data --data-dir /tmp/district [--storage sqlite]
+        [--users 100000] [--classrooms 5000] [--responses 2000000] [--seed 42]
+
+Seeded accounts are teacher<N>@seed.example and student<N>@seed.example,
+all with the --password password. Refuses to write into storage that
+already holds users or submissions.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from models.quiz import StudentSubmission
+from logic.auth import AuthManager
+from logic.concepts import ConceptIndex
+from logic.dedup import submission_hash, submission_key
+from logic.scoring import LearningGapScorer
+from storage.base import Repository
+from storage.factory import create_repository
+from benchmarks.synthetic import CONCEPTS, iter_submission_dicts, synthetic_questions
+
+# Submissions scored and written per transaction / log append
+DEFAULT_CHUNK_SIZE = 2000
+# Seconds between progress lines
+PROGRESS_INTERVAL = 2.0
+# Submission fields copied onto its score, as the submit endpoint does
+CARRIED_FIELDS = ('submission_hash', 'submission_key')
+
+JOIN_CODE_CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+class SeedPlan:
+    """Who exists in the seeded dataset and which classrooms they are in.
+
+    User ids are drawn from the seed up front (one short string each); the
+    records themselves are generated on demand. The first ``teachers`` ids
+    are teachers, the rest students. Students are spread over the
+    classrooms arithmetically, so membership needs no lookup table.
+    """
+
+    def __init__(self, seed: int, users: int, classrooms: int, teachers: int,
+                 classrooms_per_student: int, start: datetime):
+        if not 0 < teachers < users:
+            raise ValueError("Need at least one teacher and one student")
+        if classrooms < 1:
+            raise ValueError("Need at least one classroom")
+        self.rng = random.Random(seed)
+        self.user_ids = [str(uuid.UUID(int=self.rng.getrandbits(128), version=4)) for _ in range(users)]
+        self.teachers = teachers
+        self.classrooms = classrooms
+        self.classrooms_per_student = min(classrooms_per_student, classrooms)
+        self.start = start
+
+    @property
+    def student_ids(self) -> Sequence[str]:
+        return self.user_ids[self.teachers:]
+
+    def iter_users(self, password_hash: str) -> Iterator[Dict[str, Any]]:
+        """User records as AuthManager.register_user stores them."""
+        for index, user_id in enumerate(self.user_ids):
+            teacher = index < self.teachers
+            number = index if teacher else index - self.teachers
+            role = "teacher" if teacher else "student"
+            yield {
+                "id": user_id,
+                "name": f"{role.title()} {number}",
+                "email": f"{role}{number}@seed.example",
+                "password_hash": password_hash,
+                "role": role,
+                "subject": CONCEPTS[number % len(CONCEPTS)] if teacher else None,
+                "created_at": self.start.isoformat(),
+                "last_login": None
+            }
+
+    def members(self, classroom: int) -> Iterator[int]:
+        """Student numbers enrolled in a classroom.
+
+        A student's k-th classroom is (student + k * stride) % classrooms.
+        """
+        students = len(self.user_ids) - self.teachers
+        stride = max(1, self.classrooms // self.classrooms_per_student)
+        offsets = set()
+        for k in range(self.classrooms_per_student):
+            offset = (classroom - k * stride) % self.classrooms
+            if offset in offsets:
+                continue
+            offsets.add(offset)
+            yield from range(offset, students, self.classrooms)
+
+    def iter_classrooms(self) -> Iterator[Dict[str, Any]]:
+        """Classroom records as the create/join endpoints store them."""
+        join_codes = set()
+        students = self.student_ids
+        for number in range(self.classrooms):
+            teacher = number % self.teachers
+            join_code = ''.join(self.rng.choices(JOIN_CODE_CHARACTERS, k=6))
+            while join_code in join_codes:
+                join_code = ''.join(self.rng.choices(JOIN_CODE_CHARACTERS, k=6))
+            join_codes.add(join_code)
+            created_at = (self.start + timedelta(minutes=number)).isoformat()
+            subject = CONCEPTS[teacher % len(CONCEPTS)]
+            yield {
+                "classroom_id": f"seed{number:06d}",
+                "teacher_id": self.user_ids[teacher],
+                "teacher_name": f"Teacher {teacher}",
+                "name": f"{subject} {number}",
+                "description": "Seeded classroom",
+                "subject": subject,
+                "join_code": join_code,
+                "created_at": created_at,
+                "members": [
+                    {"student_id": students[student], "student_name": f"Student {student}", "joined_at": created_at}
+                    for student in self.members(number)
+                ],
+                "quiz_ids": []
+            }
+
+
+def scored_chunks(submissions: Iterator[Dict[str, Any]], scorer: LearningGapScorer,
+                  chunk_size: int) -> Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Yield (submission records, score records) a chunk at a time."""
+    while True:
+        records = list(islice(submissions, chunk_size))
+        if not records:
+            return
+        models = [StudentSubmission(**record) for record in records]
+        results = scorer.batch_score_submissions(models)
+        scores = []
+        for record, model, result in zip(records, models, results):
+            content_hash = submission_hash(model)
+            record['submission_hash'] = content_hash
+            record['submission_key'] = submission_key(content_hash, model.student_id)
+            result_dict = result.model_dump(mode="json")
+            # Scored when it was submitted, not today
+            result_dict['timestamp'] = record['timestamp']
+            for field in CARRIED_FIELDS:
+                result_dict[field] = record[field]
+            scores.append(result_dict)
+        yield records, scores
+
+
+def seed(repository: Repository, plan: SeedPlan, responses: int, seed_value: int, questions: int,
+         password: str, span: timedelta, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """Write the whole dataset, returning how many records of each kind were written."""
+    counts = {}
+    started = time.monotonic()
+
+    question_bank = synthetic_questions(questions)
+    repository.save_questions(question_bank)
+    counts['questions'] = len(question_bank)
+
+    counts['users'] = repository.add_users(plan.iter_users(AuthManager.hash_password(password)))
+    print(f"   {counts['users']:,} users ({time.monotonic() - started:.1f}s)")
+
+    counts['classrooms'] = repository.save_classrooms(plan.iter_classrooms())
+    print(f"   {counts['classrooms']:,} classrooms ({time.monotonic() - started:.1f}s)")
+
+    scorer = LearningGapScorer(ConceptIndex(question_bank))
+    submissions = iter_submission_dicts(
+        responses, seed_value, question_bank, start=plan.start,
+        student_ids=plan.student_ids, spacing=span / max(responses, 1)
+    )
+    counts['responses'] = 0
+    scoring_started = last_report = time.monotonic()
+    for records, scores in scored_chunks(submissions, scorer, chunk_size):
+        repository.append_batch(records, scores)
+        counts['responses'] += len(records)
+
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL:
+            rate = counts['responses'] / (now - scoring_started)
+            print(f"   {counts['responses']:,} submissions scored and written ({rate:,.0f}/s)")
+            last_report = now
+    counts['scores'] = counts['responses']
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seed storage with a large synthetic dataset")
+    parser.add_argument("--data-dir", required=True, help="Directory to seed (created if missing)")
+    parser.add_argument("--storage", choices=("json", "sqlite"), default="json", help="Storage backend to write")
+    parser.add_argument("--db", default=None, help="SQLite database (default: <data-dir>/learning_gaps.db)")
+    parser.add_argument("--users", type=int, default=100_000, help="Teachers and students in total")
+    parser.add_argument("--teachers", type=int, default=None, help="How many users are teachers (default: classrooms / 2)")
+    parser.add_argument("--classrooms", type=int, default=5_000)
+    parser.add_argument("--classrooms-per-student", type=int, default=2)
+    parser.add_argument("--responses", type=int, default=2_000_000, help="Submissions (each gets a score)")
+    parser.add_argument("--questions", type=int, default=60, help="Size of the synthetic question bank")
+    parser.add_argument("--days", type=float, default=120, help="Submissions are spread over this many days")
+    parser.add_argument("--start", default="2024-01-01", help="Date of the first record (ISO format)")
+    parser.add_argument("--password", default="password123", help="Password of every seeded account")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Submissions written per batch")
+    parser.add_argument("--seed", type=int, default=42, help="Same seed, same data")
+    args = parser.parse_args()
+
+    teachers = args.teachers if args.teachers is not None else max(1, args.classrooms // 2)
+    try:
+        plan = SeedPlan(args.seed, args.users, args.classrooms, teachers,
+                        args.classrooms_per_student, datetime.fromisoformat(args.start))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    db_path = args.db or os.path.join(args.data_dir, "learning_gaps.db")
+    repository = create_repository(args.storage, args.data_dir, db_path)
+    try:
+        if next(repository.iter_users(), None) is not None or next(repository.iter_responses(), None) is not None:
+            print(f"❌ {args.data_dir} ({args.storage}) already holds data - seed an empty directory")
+            return 1
+
+        print(f"🌱 Seeding {args.data_dir} ({args.storage}, seed {args.seed})")
+        started = time.monotonic()
+        counts = seed(repository, plan, args.responses, args.seed, args.questions,
+                      args.password, timedelta(days=args.days), args.chunk_size)
+    except KeyboardInterrupt:
+        print("\n⏸ Interrupted - the directory is partially seeded, start over in an empty one")
+        return 1
+    finally:
+        repository.close()
+
+    print(f"✅ Seeded {args.data_dir} in {time.monotonic() - started:.1f}s")
+    for kind, count in counts.items():
+        print(f"   {kind}: {count:,}")
+    if args.storage == "sqlite":
+        print(f"   database: {db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
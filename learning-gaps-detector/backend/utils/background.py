@@ -0,0 +1,21 @@
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(interval_seconds: float, func: Callable[[], object], name: str) -> None:
+    """Call ``func`` every ``interval_seconds`` until the task is cancelled.
+
+    Errors are reported and the loop keeps going, so one bad run does not
+    stop the maintenance job for the lifetime of the process.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            result = func()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            logger.exception("Error in background task %s", name)
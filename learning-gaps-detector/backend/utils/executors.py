@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from utils.metrics import current_usage
+from utils.profiling import profiled
+
+
+class BlockingExecutors:
+    """Pools that keep blocking work off the event loop.
+
+    ``run_io`` is for storage calls (file reads/writes, SQLite queries) and
+    uses a thread pool. ``run_cpu`` is for scoring; it uses a thread pool by
+    default, or a process pool (``cpu_mode="process"``) so scoring runs in
+    parallel across cores. Functions sent to the process pool and their
+    arguments must be picklable.
+    """
+
+    def __init__(self, io_workers: int = 8, cpu_workers: int = 2, cpu_mode: str = "thread"):
+        if cpu_mode not in ("thread", "process"):
+            raise ValueError(f"Unknown CPU executor mode: {cpu_mode}")
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.cpu_mode = cpu_mode
+
+        self._io: Optional[Executor] = None
+        self._cpu: Optional[Executor] = None
+
+    def start(self) -> None:
+        """Create the pools."""
+        self._io = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="io")
+        if self.cpu_mode == "process":
+            self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        else:
+            self._cpu = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix="cpu")
+
+    def shutdown(self) -> None:
+        """Wait for running work and close the pools."""
+        for pool in (self._io, self._cpu):
+            if pool:
+                pool.shutdown(wait=True)
+        self._io = self._cpu = None
+
+    async def _run(self, pool: Optional[Executor], func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if pool is None:
+            # Not started (e.g. during startup/shutdown): run inline
+            return func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        if isinstance(pool, ThreadPoolExecutor):
+            # Like asyncio.to_thread: the call sees the caller's context
+            # variables (per-request storage accounting)
+            call = functools.partial(contextvars.copy_context().run, profiled(call))
+        return await loop.run_in_executor(pool, call)
+
+    async def run_io(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking storage call in the I/O pool."""
+        usage = current_usage()
+        if usage is not None:
+            usage.storage_calls += 1
+        return await self._run(self._io, func, *args, **kwargs)
+
+    async def run_cpu(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run CPU-bound work in the CPU pool."""
+        return await self._run(self._cpu, func, *args, **kwargs)
+
+    def stats(self) -> dict:
+        """Pool configuration, for diagnostics."""
+        return {
+            "io_workers": self.io_workers,
+            "cpu_workers": self.cpu_workers,
+            "cpu_mode": self.cpu_mode,
+        }
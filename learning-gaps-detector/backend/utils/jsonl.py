@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, Iterator
+
+from utils.metrics import count_storage_read, count_storage_written
+from utils.serialization import dumps_bytes, loads, JSONDecodeError
+
+logger = logging.getLogger(__name__)
+
+
+def append_record(path: str, record: Dict[str, Any]) -> None:
+    """Append a single record to a newline-delimited JSON log."""
+    append_records(path, [record])
+
+
+def append_records(path: str, records: Iterable[Dict[str, Any]], fsync: bool = False) -> None:
+    """Append several records to a newline-delimited JSON log in one write.
+
+    With ``fsync`` the call only returns once the data has reached the disk.
+    """
+    data = b"".join(dumps_bytes(record) + b"\n" for record in records)
+    if not data:
+        return
+    with open(path, 'ab') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    count_storage_written(len(data))
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream records from a newline-delimited JSON log, one at a time."""
+    if not os.path.exists(path):
+        return
+
+    size = 0
+    try:
+        with open(path, 'rb') as f:
+            for line_number, line in enumerate(f, start=1):
+                size += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield loads(line)
+                except JSONDecodeError:
+                    # A torn trailing write should not make the whole log unreadable
+                    logger.warning("Skipping malformed record in %s at line %d", path, line_number)
+    finally:
+        count_storage_read(size)
+
+
+def truncate_log(path: str) -> None:
+    """Remove every record from a log, keeping the file in place."""
+    with open(path, 'w', encoding='utf-8'):
+        pass
+
+
+def migrate_json_array(legacy_path: str, log_path: str) -> bool:
+    """Convert a legacy JSON array file into a newline-delimited log.
+
+    Only runs when the log does not exist yet, so it is safe to call on every
+    startup. The legacy file is left untouched.
+    """
+    if os.path.exists(log_path):
+        return False
+
+    records = []
+    if os.path.exists(legacy_path):
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error("Error reading legacy file %s: %s", legacy_path, e)
+            records = []
+
+    tmp_path = log_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        for record in records:
+            f.write(dumps_bytes(record) + b"\n")
+    os.replace(tmp_path, log_path)
+    return bool(records)
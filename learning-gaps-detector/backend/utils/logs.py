@@ -0,0 +1,32 @@
+import logging
+
+try:
+    from pythonjsonlogger import jsonlogger
+except ImportError:  # pragma: no cover
+    jsonlogger = None
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json") -> None:
+    """Send application logs to stderr, one JSON object per line (or plain text).
+
+    Fields passed with ``extra=`` become keys of the JSON object. Calling
+    this again replaces the handler installed by the previous call.
+    """
+    handler = logging.StreamHandler()
+    handler.set_name("app")
+    if fmt == "json" and jsonlogger is not None:
+        handler.setFormatter(jsonlogger.JsonFormatter(
+            "%(asctime)s %(levelname)s %(name)s %(message)s",
+            rename_fields={"asctime": "time", "levelname": "level", "name": "logger"}
+        ))
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if existing.get_name() == "app":
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
@@ -0,0 +1,44 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict
+
+
+class EventLoopMonitor:
+    """Measures event loop lag: how late a timer fires compared to schedule.
+
+    Every ``interval`` seconds the monitor sleeps and records how much longer
+    than requested the sleep took. A responsive loop stays in the low
+    milliseconds; sustained lag means something is blocking the loop.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 120):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=window)
+        self._max_lag = 0.0
+
+    async def run(self) -> None:
+        """Sample lag until the task is cancelled."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self._samples.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lag statistics over the recent window, in milliseconds."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "interval_ms": self.interval * 1000}
+
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return {
+            "samples": len(samples),
+            "interval_ms": self.interval * 1000,
+            "last_ms": round(self._samples[-1] * 1000, 3),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+            "p95_ms": round(p95 * 1000, 3),
+            "max_recent_ms": round(samples[-1] * 1000, 3),
+            "max_ms": round(self._max_lag * 1000, 3),
+        }
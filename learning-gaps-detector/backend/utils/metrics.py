@@ -0,0 +1,229 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the size buckets, in bytes
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Prometheus text exposition format (Starlette adds the charset)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+
+
+class Histogram:
+    """Observations counted into cumulative buckets per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (the last is +Inf)..., sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_number(values[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """The metrics exposed on /metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry; the storage layer reports into it directly
+registry = MetricsRegistry()
+
+STORAGE_BYTES = registry.counter(
+    "storage_bytes_total", "Bytes read from and written to storage", ("direction",)
+)
+
+
+class RequestUsage:
+    """Storage activity one request caused, collected while it runs."""
+
+    __slots__ = ("bytes_read", "bytes_written", "storage_calls")
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.bytes_written = 0
+        # Blocking storage calls made (run_io calls and group-committed writes)
+        self.storage_calls = 0
+
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+
+
+def current_usage() -> Optional[RequestUsage]:
+    """Usage of the request being handled, if any."""
+    return _request_usage.get()
+
+
+def count_storage_read(size: int) -> None:
+    """Record bytes read from storage (globally and for the current request)."""
+    STORAGE_BYTES.inc(size, "read")
+    usage = _request_usage.get()
+    if usage is not None:
+        usage.bytes_read += size
+
+
+def count_storage_written(size: int) -> None:
+    """Record bytes written to storage (globally and for the current request)."""
+    STORAGE_BYTES.inc(size, "written")
+    usage = _request_usage.get()
+    if usage is not None:
+        usage.bytes_written += size
+
+
+def run_with_usage(usage: RequestUsage, func: Callable[..., Any], *args: Any) -> Any:
+    """Call ``func``, accounting its storage bytes to ``usage`` instead of the current request."""
+    token = _request_usage.set(usage)
+    try:
+        return func(*args)
+    finally:
+        _request_usage.reset(token)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and records the storage bytes it caused.
+
+    Requests are labelled with the route template (``/api/student-detail/{student_id}``)
+    rather than the raw path, so the number of series stays bounded. Paths
+    starting with ``exclude_paths`` (long-lived event streams) are not timed.
+    """
+
+    def __init__(self, app: ASGIApp, duration: Histogram, storage_bytes: Histogram,
+                 exclude_paths: Tuple[str, ...] = ()) -> None:
+        self.app = app
+        self.duration = duration
+        self.storage_bytes = storage_bytes
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        usage = RequestUsage()
+        token = _request_usage.set(usage)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_usage.reset(token)
+            route = self.route_name(scope)
+            self.duration.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            self.storage_bytes.observe(usage.bytes_read, route, "read")
+            self.storage_bytes.observe(usage.bytes_written, route, "written")
+
+    @staticmethod
+    def route_name(scope: Scope) -> str:
+        """The template of the route that handled the request."""
+        route = scope.get("route")
+        path = getattr(route, "path", None)
+        if path is None:
+            return "unmatched"
+        return path or "/"
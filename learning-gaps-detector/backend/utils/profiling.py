@@ -0,0 +1,238 @@
+import asyncio
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import MetricsMiddleware, RequestUsage, current_usage
+
+logger = logging.getLogger("api.requests")
+
+# Orders a profile summary can be sorted by (value of the X-Profile header)
+SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls", "time", "name")
+
+
+class RequestProfile:
+    """cProfile data for one request.
+
+    Covers the event loop thread while the request runs (including any other
+    request the loop served meanwhile) plus the thread pool calls the
+    request itself made, which is where storage and scoring run.
+    """
+
+    def __init__(self):
+        self.loop = cProfile.Profile()
+        self._threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def run_in_thread(self, func: Callable[[], Any]) -> Any:
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func)
+        finally:
+            with self._lock:
+                self._threads.append(profile)
+
+    def stats(self, stream: Optional[io.StringIO] = None) -> pstats.Stats:
+        stats = pstats.Stats(self.loop, stream=stream)
+        with self._lock:
+            for profile in self._threads:
+                stats.add(profile)
+        return stats
+
+    def summary(self, sort: str = "cumulative", limit: int = 25) -> str:
+        """The ``limit`` top functions as printed by pstats."""
+        stream = io.StringIO()
+        self.stats(stream).strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def profiled(call: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a thread pool call so it is profiled with the current request, if that is profiled."""
+    profile = _current_profile.get()
+    if profile is None:
+        return call
+    return functools.partial(profile.run_in_thread, call)
+
+
+class RequestLogMiddleware:
+    """Logs every HTTP request as one structured record and profiles some of them.
+
+    The record has the method, route template, status, duration, request and
+    response body bytes, and the storage calls and bytes the request caused
+    (collected by MetricsMiddleware, which must wrap this middleware).
+    Requests slower than ``slow_ms`` are logged as warnings.
+
+    Profiling, with cProfile:
+    - a ``sample_rate`` share of requests runs under the profiler, and the
+      profile summary is logged when such a request turns out to be slow
+      (also saved as a ``.prof`` file under ``profile_dir``, if set);
+    - a request with an ``X-Profile`` header (when ``profile_header`` is on
+      and ``may_profile(scope)`` allows it, otherwise 403) is answered with
+      the profile summary instead of its response. The header value may
+      name the sort order (``tottime``, ``calls``, ...). The request itself
+      runs for real, writes included; only its response is replaced.
+
+    The event loop thread can only run one profiler, so one request is
+    profiled at a time: sampling skips requests while a profile is running
+    and an X-Profile request is turned away with 429 instead of waiting.
+    """
+
+    def __init__(self, app: ASGIApp, slow_ms: float = 500.0, sample_rate: float = 0.0,
+                 profile_header: bool = False, profile_dir: str = "", top: int = 25,
+                 exclude_paths: Tuple[str, ...] = (),
+                 may_profile: Optional[Callable[[Scope], bool]] = None) -> None:
+        self.app = app
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.profile_header = profile_header
+        self.may_profile = may_profile
+        self.profile_dir = profile_dir
+        self.top = top
+        self.exclude_paths = exclude_paths
+        self._profiling = asyncio.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        sort = self._requested_sort(scope)
+        profile = None
+        if sort is not None:
+            if self.may_profile is not None and not self.may_profile(scope):
+                await self._refuse(scope, send, 403, "X-Profile is not allowed for this request")
+                return
+            if self._profiling.locked():
+                await self._refuse(scope, send, 429, "Another request is being profiled, retry shortly")
+                return
+            await self._profiling.acquire()
+            profile = RequestProfile()
+        elif self.sample_rate and random.random() < self.sample_rate and not self._profiling.locked():
+            await self._profiling.acquire()
+            profile = RequestProfile()
+
+        usage = current_usage() or RequestUsage()
+        status = 500
+        bytes_in = bytes_out = 0
+        held: List[Message] = []
+
+        async def receive_wrapper() -> Message:
+            nonlocal bytes_in
+            message = await receive()
+            if message["type"] == "http.request":
+                bytes_in += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, bytes_out
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                bytes_out += len(message.get("body", b""))
+            if sort is not None:
+                # Replaced by the profile summary
+                held.append(message)
+                return
+            await send(message)
+
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        if profile is not None:
+            profile.loop.enable()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if profile is not None:
+                profile.loop.disable()
+                self._profiling.release()
+            _current_profile.reset(token)
+            self._log(scope, status, duration_ms, bytes_in, bytes_out, usage, profile, sort)
+
+        if sort is not None:
+            await self._send_summary(send, profile, sort, status, duration_ms)
+
+    def _requested_sort(self, scope: Scope) -> Optional[str]:
+        """The sort order asked for with X-Profile, or None if no profile was asked for."""
+        if not self.profile_header:
+            return None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                value = value.decode("latin-1").strip().lower()
+                return value if value in SORT_KEYS else "cumulative"
+        return None
+
+    async def _refuse(self, scope: Scope, send: Send, status: int, reason: str) -> None:
+        """Answer an X-Profile request without running it."""
+        body = reason.encode("utf-8")
+        headers = [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if status == 429:
+            headers.append((b"retry-after", b"1"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+        self._log(scope, status, 0.0, 0, len(body), current_usage() or RequestUsage(), None, None)
+
+    def _log(self, scope: Scope, status: int, duration_ms: float, bytes_in: int, bytes_out: int,
+             usage: RequestUsage, profile: Optional[RequestProfile], sort: Optional[str]) -> None:
+        route = MetricsMiddleware.route_name(scope)
+        fields = {
+            "method": scope["method"],
+            "route": route,
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "storage_calls": usage.storage_calls,
+            "storage_bytes_read": usage.bytes_read,
+            "storage_bytes_written": usage.bytes_written,
+        }
+        if duration_ms < self.slow_ms:
+            logger.info("request", extra=fields)
+            return
+
+        if profile is not None and sort is None:
+            fields["profile"] = profile.summary(limit=self.top)
+            if self.profile_dir:
+                fields["profile_file"] = self._save(profile, scope["method"], route)
+        logger.warning("slow request", extra=fields)
+
+    def _save(self, profile: RequestProfile, method: str, route: str) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(self.profile_dir, f"{datetime.now():%Y%m%dT%H%M%S.%f}-{method}-{name}.prof")
+        profile.stats().dump_stats(path)
+        return path
+
+    async def _send_summary(self, send: Send, profile: RequestProfile, sort: str,
+                            status: int, duration_ms: float) -> None:
+        body = profile.summary(sort, self.top).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profile-status", str(status).encode()),
+                (b"x-profile-duration-ms", f"{duration_ms:.3f}".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,39 @@
+"""Compact JSON encoding: orjson when installed, the standard library otherwise."""
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+else:
+    FastJSONResponse = JSONResponse
+
+# orjson's decode error subclasses this one
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode to compact UTF-8 JSON; unknown types are written with str()."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """Encode to a compact JSON string."""
+    return dumps_bytes(obj).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
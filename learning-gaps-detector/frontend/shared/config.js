@@ -9,7 +9,8 @@ const CONFIG = {
         STUDENT_RESULTS: '/student-results',
         TEACHER_DASHBOARD: '/teacher-dashboard',
         STUDENT_DETAIL: '/student-detail',
-        RESET_DATA: '/reset-data'
+        RESET_DATA: '/reset-data',
+        DASHBOARD_EVENTS: '/events/dashboard'
     },
     
     // UI Configuration
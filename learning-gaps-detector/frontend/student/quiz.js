@@ -199,21 +199,25 @@ class QuizApp {
         this.showSection('completion-section');
         
         try {
-            // Prepare submission
-            const submission = {
-                student_id: this.studentId,
-                quiz_id: `quiz_${Date.now()}`,
-                attempts: this.attempts,
-                timestamp: new Date().toISOString()
-            };
-
-            // Submit to backend
+            // Prepare submission once, so a retry resends the same one
+            if (!this.submission) {
+                this.submission = {
+                    student_id: this.studentId,
+                    quiz_id: `quiz_${Date.now()}`,
+                    attempts: this.attempts,
+                    timestamp: new Date().toISOString()
+                };
+                this.idempotencyKey = `${this.studentId}-${this.submission.quiz_id}`;
+            }
+
+            // Submit to backend (the key lets the server answer a retry with the original analysis)
             const response = await fetch(`${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.SUBMIT_QUIZ}`, {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': this.idempotencyKey
                 },
-                body: JSON.stringify(submission)
+                body: JSON.stringify(this.submission)
             });
 
             if (!response.ok) {
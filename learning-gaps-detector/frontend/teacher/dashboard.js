@@ -4,9 +4,63 @@ class TeacherDashboard {
         this.dashboardData = null;
         this.filteredStudents = [];
         this.currentRiskFilter = 'all';
+        this.liveUpdates = false;
+        this.renderPending = false;
         
         this.initializeEventListeners();
         this.loadDashboardData();
+        this.connectLiveUpdates();
+    }
+
+    connectLiveUpdates() {
+        if (!window.EventSource) {
+            return;
+        }
+        
+        // Server-sent events; EventSource reconnects by itself after errors
+        const events = new EventSource(`${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.DASHBOARD_EVENTS}`);
+        
+        events.addEventListener('hello', (e) => {
+            this.liveUpdates = true;
+            // After a reconnect, catch up on anything missed meanwhile
+            const { version } = JSON.parse(e.data);
+            if (this.dashboardData && this.dashboardData.version !== version) {
+                this.refreshData();
+            }
+        });
+        
+        events.addEventListener('score', (e) => {
+            if (!this.dashboardData) {
+                return;
+            }
+            const update = JSON.parse(e.data);
+            this.dashboardData = this.mergeDashboardDelta({
+                summary: update.summary,
+                students: [update.student],
+                concept_analysis: update.concept_analysis,
+                version: update.version
+            });
+            this.scheduleRender();
+        });
+        
+        events.addEventListener('reset', () => this.refreshData());
+        
+        events.onerror = () => {
+            // Fall back to polling until the stream is back
+            this.liveUpdates = false;
+        };
+    }
+
+    scheduleRender() {
+        // Coalesce bursts of events (e.g. a whole class submitting) into one render
+        if (this.renderPending) {
+            return;
+        }
+        this.renderPending = true;
+        setTimeout(() => {
+            this.renderPending = false;
+            this.renderDashboard();
+        }, 250);
     }
 
     initializeEventListeners() {
@@ -450,7 +504,52 @@ class TeacherDashboard {
     }
 
     async refreshData() {
-        await this.loadDashboardData();
+        if (!this.dashboardData || !this.dashboardData.version) {
+            await this.loadDashboardData();
+            return;
+        }
+        
+        try {
+            // Only ask for what changed since the version we already have
+            const since = encodeURIComponent(this.dashboardData.version);
+            const response = await fetch(`${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.TEACHER_DASHBOARD}?since=${since}`);
+            if (response.status === 304) {
+                return;
+            }
+            if (!response.ok) {
+                throw new Error('Failed to fetch dashboard data');
+            }
+            
+            const data = await response.json();
+            this.dashboardData = data.delta ? this.mergeDashboardDelta(data) : data;
+            this.renderDashboard();
+            this.hideLoading();
+            
+        } catch (error) {
+            console.error('Error refreshing dashboard:', error);
+            this.showError('Failed to load dashboard data. Please check if the backend is running.');
+        }
+    }
+
+    mergeDashboardDelta(delta) {
+        const changedIds = new Set(delta.students.map(student => student.student_id));
+        const students = this.dashboardData.students
+            .filter(student => !changedIds.has(student.student_id))
+            .concat(delta.students);
+        
+        // Same order as the server: at_risk first, then highest gap score
+        const riskPriority = { 'at_risk': 0, 'watch': 1, 'safe': 2 };
+        students.sort((a, b) =>
+            ((riskPriority[a.overall_risk] ?? 2) - (riskPriority[b.overall_risk] ?? 2)) ||
+            (b.overall_score - a.overall_score)
+        );
+        
+        return {
+            summary: delta.summary,
+            students: students,
+            concept_analysis: delta.concept_analysis,
+            version: delta.version
+        };
     }
 
     async resetData() {
@@ -507,9 +606,9 @@ document.addEventListener('DOMContentLoaded', () => {
     dashboard = new TeacherDashboard();
 });
 
-// Add auto-refresh every 30 seconds
+// Add auto-refresh every 30 seconds (only while live updates are unavailable)
 setInterval(() => {
-    if (dashboard && !document.getElementById('student-modal').classList.contains('hidden') === false) {
+    if (dashboard && !dashboard.liveUpdates && !document.getElementById('student-modal').classList.contains('hidden') === false) {
         dashboard.refreshData();
     }
 }, 30000);